@@ -0,0 +1,16 @@
+"""
+Meal Planner backend.
+Loads backend/.env before any module reads its settings from the environment.
+"""
+import os
+import time
+
+# Start of the import phase reported by app_startup_seconds
+IMPORT_STARTED = time.perf_counter()
+
+_ENV_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env")
+
+# Deployments configure the environment directly; only import python-dotenv when there is a file to load
+if os.path.exists(_ENV_FILE):
+    from dotenv import load_dotenv
+    load_dotenv(_ENV_FILE)
@@ -0,0 +1,40 @@
+"""
+One-shot backfill of the normalized ingredient tables from existing recipes.
+
+Usage:
+    python -m app.backfill_ingredients [--batch-size 1000]
+"""
+import argparse
+from .database_client import DatabaseClient
+
+
+def backfill(db_client: DatabaseClient, batch_size: int = 1000) -> int:
+    """Sync every recipe in id order, committing once per batch; returns the number of batches"""
+    last_id = 0
+    batches = 0
+    while True:
+        last_id = db_client.sync_recipe_ingredients_batch(last_id, batch_size)
+        if last_id is None:
+            return batches
+        batches += 1
+        print(f"Synced recipes up to id {last_id}")
+
+
+def main():
+    """Command line entry point for the backfill"""
+    parser = argparse.ArgumentParser(description="Backfill ingredients and recipe_ingredients")
+    parser.add_argument("--batch-size", type=int, default=1000, help="recipes per transaction")
+    args = parser.parse_args()
+
+    db_client = DatabaseClient()
+    if not db_client.connect():
+        raise SystemExit("Failed to connect to database")
+    try:
+        batches = backfill(db_client, args.batch_size)
+        print(f"Backfill complete ({batches} batches)")
+    finally:
+        db_client.disconnect()
+
+
+if __name__ == "__main__":
+    main()
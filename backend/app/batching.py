@@ -0,0 +1,139 @@
+"""
+Group-commit batching for recipe inserts.
+Concurrent POST /recipes requests are queued and written in one multi-row INSERT per transaction,
+so a burst of creates pays for one commit instead of one per row. A batch that fails is retried row
+by row, so only the offending recipe fails.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import List, Dict, Any, Callable
+from .database_client import DatabaseClient
+
+
+class RecipeInsertBatcher:
+    """Queue recipe inserts and flush them every max_batch_size items or max_delay_ms milliseconds"""
+
+    def __init__(self, max_batch_size: int, max_delay_ms: float,
+                 client_factory: Callable[[], DatabaseClient] = DatabaseClient):
+        """Initialize an idle batcher; the flusher thread starts on the first submit"""
+        self.max_batch_size = max_batch_size
+        self.max_delay_ms = max_delay_ms
+        self._client_factory = client_factory
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._db_client = None
+
+    def submit(self, recipe: Dict[str, Any], timeout: float = 30.0) -> Dict[str, Any]:
+        """Queue a recipe and block until its batch is committed; returns the inserted row.
+
+        A recipe still queued after `timeout` seconds is withdrawn and never written. Once its batch is
+        being written the outcome is awaited, so an error always means the recipe was not stored.
+        """
+        future = Future()
+        self._ensure_started()
+        self._queue.put((recipe, future))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            if future.cancel():
+                raise
+            return future.result()
+
+    def close(self):
+        """Flush queued recipes and stop the flusher thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread:
+            self._queue.put(None)
+            thread.join()
+        if self._db_client:
+            self._db_client.disconnect()
+            self._db_client = None
+
+    def _ensure_started(self):
+        """Start the flusher thread if it is not running"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="recipe-insert-batcher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Collect batches until close() enqueues the stop marker"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+            deadline = time.monotonic() + self.max_delay_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stopping:
+                return
+
+    def _flush(self, batch: List[Any]):
+        """Insert a batch in one transaction and resolve each caller only after the commit"""
+        # Skip recipes whose caller gave up; the rest can no longer be withdrawn
+        batch = [(recipe, future) for recipe, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            self._ensure_connected()
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        try:
+            rows = self._db_client.add_recipes([recipe for recipe, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # The failed INSERT was rolled back; one bad row must not fail the recipes batched with it
+            for recipe, future in batch:
+                try:
+                    # The failure may have been the connection itself; each row gets a live one
+                    self._ensure_connected()
+                    future.set_result(self._db_client.add_recipes([recipe])[0])
+                except Exception as row_error:
+                    future.set_exception(row_error)
+            return
+        for (_, future), row in zip(batch, rows):
+            future.set_result(row)
+
+    def _ensure_connected(self):
+        """Keep the batcher's client connected, releasing a dead connection to its pool before replacing it"""
+        if self._db_client is not None and self._db_client.is_connected():
+            return
+        if self._db_client is not None:
+            try:
+                self._db_client.disconnect()
+            except Exception as e:
+                print(f"Error releasing the batcher's database connection: {e}")
+        self._db_client = self._client_factory()
+        if not self._db_client.connect():
+            raise Exception("Failed to connect to database")
+
+
+# Opt-in; the defaults trade at most 5 ms of added latency for up to 50 rows per commit
+RECIPE_INSERT_BATCHING = os.getenv("RECIPE_INSERT_BATCHING", "false").lower() == "true"
+recipe_insert_batcher = RecipeInsertBatcher(
+    max_batch_size=int(os.getenv("RECIPE_INSERT_BATCH_SIZE", "50")),
+    max_delay_ms=float(os.getenv("RECIPE_INSERT_BATCH_DELAY_MS", "5"))
+)
@@ -0,0 +1,56 @@
+"""
+In-process caches for aggregate queries.
+Entries expire after a TTL and are invalidated by the write paths in DatabaseClient.
+"""
+import os
+import threading
+import time
+from typing import Any, Optional
+
+
+class TTLCache:
+    """Single-value cache with time-based expiry and explicit invalidation"""
+
+    def __init__(self, ttl_seconds: float):
+        """Initialize an empty cache holding values for ttl_seconds"""
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._value = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Number of invalidations so far; read it before loading a value to pass to set"""
+        with self._lock:
+            return self._generation
+
+    def get(self) -> Optional[Any]:
+        """Return the cached value, or None if it is missing or expired"""
+        with self._lock:
+            if self._value is not None and time.monotonic() < self._expires_at:
+                self.hits += 1
+                return self._value
+            self.misses += 1
+            return None
+
+    def set(self, value: Any, generation: Optional[int] = None):
+        """Store a value and restart the expiry clock; skipped if invalidated since `generation` was read"""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._value = value
+            self._expires_at = time.monotonic() + self.ttl_seconds
+
+    def invalidate(self):
+        """Drop the cached value so the next read goes to the database"""
+        with self._lock:
+            self._value = None
+            self._expires_at = 0.0
+            self._generation += 1
+
+
+# Per-category counts; other worker processes only see writes after the TTL
+category_stats_cache = TTLCache(float(os.getenv("CATEGORY_STATS_CACHE_TTL", "30")))
@@ -4,12 +4,80 @@ Handles all database connections and operations.
 """
 import os
 import json
+import threading
+import time
 import psycopg2
-from typing import Optional, List, Dict, Any
-from dotenv import load_dotenv
+from psycopg2.extras import execute_values
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+from typing import Optional, List, Dict, Any, Tuple
+from .cache import category_stats_cache
+from .metrics import db_connect_duration, db_errors, instrument_methods
+from .query_log import TimedCursor
+from .tracing import record_span
+from .units import normalize_ingredients, strip_canonical
 
-# Load environment variables from .env file
-load_dotenv()
+# Facet bucket labels, in display order; must match the CASE expressions in search_recipes
+PREP_TIME_BUCKETS = ('0-15', '15-30', '30-60', '60+')
+PORTIONS_BUCKETS = ('1-2', '3-4', '5+')
+
+# Updatable recipe columns and the SQL types their VALUES entries are cast to in bulk updates
+RECIPE_UPDATE_COLUMNS = {
+    'name': 'varchar',
+    'category': 'varchar',
+    'main_ingredients': 'jsonb',
+    'common_ingredients': 'text[]',
+    'instructions': 'text',
+    'prep_time': 'integer',
+    'portions': 'integer',
+}
+
+# GROUPING(category, prep_bucket, portions_bucket) bitmask -> (facet name, column holding its value)
+FACET_GROUPING_SETS = {0b011: ('category', 0), 0b101: ('prep_time', 1), 0b110: ('portions', 2)}
+
+# Connections each process keeps open and reuses across requests; requests beyond it open and close their own.
+# 0 disables the pool
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+
+# (host, port, database, user, password) -> pool of connections to that database
+_pools: Dict[Tuple, ThreadedConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _connection_pool(params: Dict[str, Any]) -> Optional[ThreadedConnectionPool]:
+    """The pool for these connection parameters, opening its DB_POOL_SIZE connections on first use"""
+    if DB_POOL_SIZE <= 0:
+        return None
+    key = tuple(params[name] for name in ('host', 'port', 'database', 'user', 'password'))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ThreadedConnectionPool(DB_POOL_SIZE, DB_POOL_SIZE, cursor_factory=TimedCursor, **params)
+            _pools[key] = pool
+        return pool
+
+
+def open_pool() -> int:
+    """Open the pool for the configured database ahead of traffic; returns the number of pooled connections"""
+    _connection_pool(DatabaseClient()._connect_params())
+    return DB_POOL_SIZE
+
+
+def pool_usage() -> Tuple[int, int]:
+    """Pooled connections checked out and the pools' capacity; past capacity connect() opens unpooled ones"""
+    with _pools_lock:
+        return sum(len(pool._used) for pool in _pools.values()), sum(pool.maxconn for pool in _pools.values())
+
+
+def close_pools():
+    """Close every pooled connection, e.g. at shutdown"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.closeall()
+        _pools.clear()
+
+
+class VersionConflictError(Exception):
+    """Raised when a conditional write finds the row at a different version than expected"""
 
 
 class DatabaseClient:
@@ -25,27 +93,70 @@ class DatabaseClient:
         self.user = user or os.getenv("POSTGRES_USER")
         self.password = password or os.getenv("POSTGRES_PASSWORD")
         self._connection = None
+        # Pool the connection was checked out from; None for a connection this client opened itself
+        self._pool = None
+        # A write left uncommitted for the caller changed recipes; see _recipes_written
+        self._stats_changed = False
+    
+    def _connect_params(self) -> Dict[str, Any]:
+        """Keyword arguments for psycopg2.connect"""
+        return {'host': self.host, 'port': self.port, 'database': self.database,
+                'user': self.user, 'password': self.password}
     
     def connect(self):
-        """Establish connection to the database"""
+        """Check out a pooled connection to the database, or open one when the pool is used up"""
+        started = time.perf_counter()
         try:
-            self._connection = psycopg2.connect(
-                host=self.host,
-                port=self.port,
-                database=self.database,
-                user=self.user,
-                password=self.password
-            )
+            params = self._connect_params()
+            pool = _connection_pool(params)
+            if pool is not None:
+                try:
+                    connection = pool.getconn()
+                except PoolError:
+                    pass  # every pooled connection is in use
+                else:
+                    if not connection.closed:
+                        self._connection, self._pool = connection, pool
+                        return True
+                    pool.putconn(connection, close=True)
+            self._connection = psycopg2.connect(cursor_factory=TimedCursor, **params)
             return True
         except Exception as e:
+            db_errors.labels("connect").inc()
             print(f"Error connecting to database: {e}")
             return False
+        finally:
+            elapsed = time.perf_counter() - started
+            db_connect_duration.observe(elapsed)
+            record_span("db.connect", elapsed)
     
     def disconnect(self):
-        """Close database connection"""
+        """Return the connection to its pool (rolling back an open transaction), or close it"""
         if self._connection:
-            self._connection.close()
+            if self._pool is not None:
+                try:
+                    # A connection switched to autocommit is not in the state the next request expects
+                    self._pool.putconn(self._connection, close=self._connection.autocommit)
+                except PoolError:
+                    self._connection.close()  # the pool was closed meanwhile
+            else:
+                self._connection.close()
             self._connection = None
+            self._pool = None
+    
+    def rollback(self):
+        """Roll back the current transaction, e.g. after a failed statement"""
+        if self._connection:
+            self._connection.rollback()
+        self._stats_changed = False
+    
+    def _recipes_written(self, committed: bool):
+        """Invalidate the category stats cache after a committed write, or remember to once the caller commits"""
+        if committed:
+            self._stats_changed = False
+            category_stats_cache.invalidate()
+        else:
+            self._stats_changed = True
     
     def is_connected(self) -> bool:
         """Check if database connection is active"""
@@ -71,13 +182,14 @@ class DatabaseClient:
             ORDER BY id
         """)
         
+        # Canonical quantities are stored for SQL aggregation only; recipe reads return ingredients as clients sent them
         recipes = []
         for row in cursor.fetchall():
             recipe = {
                 'id': row[0],
                 'name': row[1],
                 'category': row[2],
-                'main_ingredients': row[3],
+                'main_ingredients': strip_canonical(row[3]),
                 'common_ingredients': row[4],
                 'instructions': row[5],
                 'prep_time': row[6],
@@ -95,7 +207,7 @@ class DatabaseClient:
         
         cursor = self._connection.cursor()
         cursor.execute("""
-            SELECT id, name, category, main_ingredients, common_ingredients, instructions, prep_time, portions
+            SELECT id, name, category, main_ingredients, common_ingredients, instructions, prep_time, portions, version
             FROM recipes
             WHERE id = %s
         """, (recipe_id,))
@@ -110,29 +222,31 @@ class DatabaseClient:
             'id': row[0],
             'name': row[1],
             'category': row[2],
-            'main_ingredients': row[3],
+            'main_ingredients': strip_canonical(row[3]),
             'common_ingredients': row[4],
             'instructions': row[5],
             'prep_time': row[6],
-            'portions': row[7]
+            'portions': row[7],
+            'version': row[8]
         }
         
         return recipe
     
     def add_recipe(self, name: str, category: str, main_ingredients: List[Dict[str, Any]], 
-                   common_ingredients: List[str], instructions: str, prep_time: int, portions: int) -> Dict[str, Any]:
-        """Add a new recipe to the database"""
+                   common_ingredients: List[str], instructions: str, prep_time: int, portions: int,
+                   commit: bool = True) -> Dict[str, Any]:
+        """Add a new recipe to the database; with commit=False the caller finishes the transaction"""
         if not self.is_connected():
             raise Exception("Not connected to database")
         
-        # Convert main_ingredients list of dicts to JSON
-        main_ingredients_json = json.dumps(main_ingredients)
+        # Convert main_ingredients list of dicts to JSON, keeping canonical quantities next to the originals
+        main_ingredients_json = json.dumps(normalize_ingredients(main_ingredients))
         
         cursor = self._connection.cursor()
         cursor.execute("""
             INSERT INTO recipes (name, category, main_ingredients, common_ingredients, instructions, prep_time, portions)
             VALUES (%s, %s, %s, %s, %s, %s, %s)
-            RETURNING id, name, category, main_ingredients, common_ingredients, instructions, prep_time, portions
+            RETURNING id, name, category, main_ingredients, common_ingredients, instructions, prep_time, portions, version
         """, (name, category, main_ingredients_json, common_ingredients, instructions, prep_time, portions))
         
         # Fetch the inserted recipe
@@ -141,20 +255,64 @@ class DatabaseClient:
             'id': row[0],
             'name': row[1],
             'category': row[2],
-            'main_ingredients': row[3],
+            'main_ingredients': strip_canonical(row[3]),
             'common_ingredients': row[4],
             'instructions': row[5],
             'prep_time': row[6],
-            'portions': row[7]
+            'portions': row[7],
+            'version': row[8]
         }
         
         # Commit the transaction
-        self._connection.commit()
+        if commit:
+            self._connection.commit()
         cursor.close()
+        self._recipes_written(commit)
         return recipe
     
-    def delete_recipe(self, recipe_id: int) -> bool:
-        """Delete a recipe from the database by ID"""
+    def add_recipes(self, recipes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add many recipes in one multi-row INSERT and one commit; rows come back in input order"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        try:
+            rows = execute_values(cursor, """
+                INSERT INTO recipes (name, category, main_ingredients, common_ingredients, instructions, prep_time, portions)
+                VALUES %s
+                RETURNING id, name, category, main_ingredients, common_ingredients, instructions, prep_time, portions, version
+            """, [
+                (recipe['name'], recipe['category'], json.dumps(normalize_ingredients(recipe['main_ingredients'])),
+                 recipe['common_ingredients'], recipe['instructions'], recipe['prep_time'], recipe['portions'])
+                for recipe in recipes
+            ], page_size=len(recipes), fetch=True)
+            
+            # Commit the transaction
+            self._connection.commit()
+        except Exception:
+            self._connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        
+        category_stats_cache.invalidate()
+        return [
+            {
+                'id': row[0],
+                'name': row[1],
+                'category': row[2],
+                'main_ingredients': strip_canonical(row[3]),
+                'common_ingredients': row[4],
+                'instructions': row[5],
+                'prep_time': row[6],
+                'portions': row[7],
+                'version': row[8]
+            }
+            for row in rows
+        ]
+    
+    def delete_recipe(self, recipe_id: int, expected_version: Optional[int] = None) -> bool:
+        """Delete a recipe from the database by ID, optionally only at the expected version"""
         if not self.is_connected():
             raise Exception("Not connected to database")
         
@@ -166,18 +324,27 @@ class DatabaseClient:
             cursor.close()
             return False
         
-        # Delete the recipe
-        cursor.execute("DELETE FROM recipes WHERE id = %s", (recipe_id,))
+        # Delete the recipe, guarded by its version when the caller holds one
+        if expected_version is None:
+            cursor.execute("DELETE FROM recipes WHERE id = %s", (recipe_id,))
+        else:
+            cursor.execute("DELETE FROM recipes WHERE id = %s AND version = %s", (recipe_id, expected_version))
+            if cursor.rowcount == 0:
+                self._connection.rollback()
+                cursor.close()
+                raise VersionConflictError(f"Recipe with ID {recipe_id} is not at version {expected_version}")
         
         # Commit the transaction
         self._connection.commit()
         rows_affected = cursor.rowcount
         cursor.close()
+        category_stats_cache.invalidate()
         
         return rows_affected > 0
 
-    def update_recipe(self, recipe_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Update a recipe in the database with partial data"""
+    def update_recipe(self, recipe_id: int, updates: Dict[str, Any],
+                      expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Update a recipe in the database with partial data, optionally only at the expected version"""
         if not self.is_connected():
             raise Exception("Not connected to database")
         
@@ -198,9 +365,9 @@ class DatabaseClient:
                 set_clauses.append(f"{field} = %s")
                 values.append(value)
             elif field == 'main_ingredients':
-                # main_ingredients is stored as JSON
+                # main_ingredients is stored as JSON with canonical quantities
                 set_clauses.append(f"{field} = %s")
-                values.append(json.dumps(value))
+                values.append(json.dumps(normalize_ingredients(value)))
             elif field == 'common_ingredients':
                 # common_ingredients is stored as PostgreSQL array
                 set_clauses.append(f"{field} = %s")
@@ -210,37 +377,990 @@ class DatabaseClient:
             cursor.close()
             return None
         
-        # Add recipe_id to values for WHERE clause
+        # Every write path bumps updated_at for the recent recipes feed and the version for If-Match
+        set_clauses.append("updated_at = now()")
+        set_clauses.append("version = version + 1")
+        
+        # Add recipe_id (and the expected version) to values for WHERE clause
+        where = "id = %s"
         values.append(recipe_id)
+        if expected_version is not None:
+            where += " AND version = %s"
+            values.append(expected_version)
         
-        # Execute update query
-        update_query = f"UPDATE recipes SET {', '.join(set_clauses)} WHERE id = %s"
+        # Execute update query; the version check and the write are one atomic statement
+        update_query = f"""
+            UPDATE recipes SET {', '.join(set_clauses)} WHERE {where}
+            RETURNING id, name, category, main_ingredients, common_ingredients,
+                      instructions, prep_time, portions, version
+        """
         cursor.execute(update_query, values)
         
-        # Get the updated recipe
-        cursor.execute("""
-            SELECT id, name, category, main_ingredients, common_ingredients, 
-                   instructions, prep_time, portions 
-            FROM recipes WHERE id = %s
-        """, (recipe_id,))
-        
         row = cursor.fetchone()
         if not row:
+            self._connection.rollback()
             cursor.close()
+            if expected_version is not None:
+                raise VersionConflictError(f"Recipe with ID {recipe_id} is not at version {expected_version}")
             return None
         
         recipe = {
             'id': row[0],
             'name': row[1],
             'category': row[2],
-            'main_ingredients': row[3],
+            'main_ingredients': strip_canonical(row[3]),
             'common_ingredients': row[4],
             'instructions': row[5],
             'prep_time': row[6],
-            'portions': row[7]
+            'portions': row[7],
+            'version': row[8]
         }
         
         # Commit the transaction
         self._connection.commit()
         cursor.close()
+        category_stats_cache.invalidate()
         return recipe
+
+    def bulk_update_recipes(self, items: List[Dict[str, Any]], commit: bool = True) -> List[Dict[str, Any]]:
+        """Apply many partial updates in one transaction; returns per-id status and new version"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        # Items that set the same fields (and do or do not check a version) share one statement
+        groups = {}
+        for item in items:
+            fields = tuple(field for field in RECIPE_UPDATE_COLUMNS if field in item)
+            groups.setdefault((fields, item.get('version') is not None), []).append(item)
+        
+        cursor = self._connection.cursor()
+        updated = {}
+        try:
+            for (fields, check_version), group in groups.items():
+                columns = ['id'] + list(fields) + (['expected_version'] if check_version else [])
+                casts = ['integer'] + [RECIPE_UPDATE_COLUMNS[field] for field in fields] + (['integer'] if check_version else [])
+                set_clauses = [f"{field} = v.{field}" for field in fields]
+                set_clauses += ["updated_at = now()", "version = recipes.version + 1"]
+                where = "recipes.id = v.id" + (" AND recipes.version = v.expected_version" if check_version else "")
+                
+                rows = execute_values(cursor, f"""
+                    UPDATE recipes SET {', '.join(set_clauses)}
+                    FROM (VALUES %s) AS v({', '.join(columns)})
+                    WHERE {where}
+                    RETURNING recipes.id, recipes.version
+                """, [
+                    tuple(
+                        [item['id']]
+                        + [json.dumps(normalize_ingredients(item[field])) if field == 'main_ingredients' else item[field]
+                           for field in fields]
+                        + ([item['version']] if check_version else [])
+                    )
+                    for item in group
+                ], template="(" + ", ".join(f"%s::{cast}" for cast in casts) + ")", page_size=len(group), fetch=True)
+                updated.update(dict(rows))
+            
+            # Tell missing rows apart from version conflicts in one lookup
+            skipped = [item['id'] for item in items if item['id'] not in updated]
+            existing = set()
+            if skipped:
+                cursor.execute("SELECT id FROM recipes WHERE id = ANY(%s)", (skipped,))
+                existing = {row[0] for row in cursor.fetchall()}
+            
+            # Commit the transaction
+            if commit:
+                self._connection.commit()
+        except Exception:
+            self._connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        
+        self._recipes_written(commit)
+        results = []
+        for item in items:
+            if item['id'] in updated:
+                results.append({'id': item['id'], 'status': 'updated', 'version': updated[item['id']]})
+            elif item['id'] in existing:
+                results.append({'id': item['id'], 'status': 'conflict', 'version': None})
+            else:
+                results.append({'id': item['id'], 'status': 'not_found', 'version': None})
+        return results
+
+    def get_category_stats(self) -> List[Dict[str, Any]]:
+        """Get recipe count and average prep time per category"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            SELECT category, COUNT(*), AVG(prep_time)
+            FROM recipes
+            GROUP BY category
+            ORDER BY category
+        """)
+        
+        stats = []
+        for row in cursor.fetchall():
+            stats.append({
+                'category': row[0],
+                'count': row[1],
+                'avg_prep_time': float(row[2]) if row[2] is not None else None
+            })
+        
+        cursor.close()
+        return stats
+
+    def get_recent_recipes(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the most recently created or updated recipes as lightweight cards"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        # ORDER BY matches idx_recipes_updated_at so this is an index scan with a LIMIT
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            SELECT id, name, category, prep_time, updated_at
+            FROM recipes
+            ORDER BY updated_at DESC, id DESC
+            LIMIT %s
+        """, (limit,))
+        
+        recipes = []
+        for row in cursor.fetchall():
+            recipes.append({
+                'id': row[0],
+                'name': row[1],
+                'category': row[2],
+                'prep_time': row[3],
+                'updated_at': row[4]
+            })
+        
+        cursor.close()
+        return recipes
+
+    def _build_search_filters(self, query: Optional[str], category: Optional[str],
+                              max_prep_time: Optional[int], min_portions: Optional[int]):
+        """Build the WHERE clause and parameters shared by the search queries"""
+        conditions = []
+        params = []
+        
+        if query:
+            conditions.append("name ILIKE %s")
+            params.append(f"%{query}%")
+        if category:
+            conditions.append("category = %s")
+            params.append(category)
+        if max_prep_time is not None:
+            conditions.append("prep_time <= %s")
+            params.append(max_prep_time)
+        if min_portions is not None:
+            conditions.append("portions >= %s")
+            params.append(min_portions)
+        
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where_clause, params
+    
+    def search_recipes(self, query: Optional[str] = None, category: Optional[str] = None,
+                       max_prep_time: Optional[int] = None, min_portions: Optional[int] = None,
+                       limit: int = 20, offset: int = 0, include_facets: bool = True) -> Dict[str, Any]:
+        """Search recipes and return a page of results with optional facet counts"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        where_clause, params = self._build_search_filters(query, category, max_prep_time, min_portions)
+        
+        cursor = self._connection.cursor()
+        
+        # Result page; the window count gives the total without a second scan
+        cursor.execute(f"""
+            SELECT id, name, category, main_ingredients, common_ingredients, instructions, prep_time, portions,
+                   version, COUNT(*) OVER ()
+            FROM recipes
+            {where_clause}
+            ORDER BY id
+            LIMIT %s OFFSET %s
+        """, params + [limit, offset])
+        
+        rows = cursor.fetchall()
+        recipes = []
+        for row in rows:
+            recipe = {
+                'id': row[0],
+                'name': row[1],
+                'category': row[2],
+                'main_ingredients': strip_canonical(row[3]),
+                'common_ingredients': row[4],
+                'instructions': row[5],
+                'prep_time': row[6],
+                'portions': row[7],
+                'version': row[8]
+            }
+            recipes.append(recipe)
+        total = rows[0][9] if rows else 0
+        
+        facets = None
+        if include_facets:
+            facets = {
+                'category': {},
+                'prep_time': {bucket: 0 for bucket in PREP_TIME_BUCKETS},
+                'portions': {bucket: 0 for bucket in PORTIONS_BUCKETS}
+            }
+            
+            # All facet counts in a single pass over the filtered rows
+            cursor.execute(f"""
+                SELECT category, prep_bucket, portions_bucket,
+                       GROUPING(category, prep_bucket, portions_bucket), COUNT(*)
+                FROM (
+                    SELECT category,
+                           CASE WHEN prep_time < 15 THEN '0-15'
+                                WHEN prep_time < 30 THEN '15-30'
+                                WHEN prep_time < 60 THEN '30-60'
+                                WHEN prep_time >= 60 THEN '60+'
+                           END AS prep_bucket,
+                           CASE WHEN portions <= 2 THEN '1-2'
+                                WHEN portions <= 4 THEN '3-4'
+                                WHEN portions >= 5 THEN '5+'
+                           END AS portions_bucket
+                    FROM recipes
+                    {where_clause}
+                ) filtered
+                GROUP BY GROUPING SETS ((category), (prep_bucket), (portions_bucket))
+            """, params)
+            
+            for row in cursor.fetchall():
+                facet, column = FACET_GROUPING_SETS[row[3]]
+                if row[column] is not None:
+                    facets[facet][row[column]] = row[4]
+        
+        cursor.close()
+        return {'total': total, 'recipes': recipes, 'facets': facets}
+
+    def get_plan_candidates(self, categories: List[str], max_prep_time: Optional[int] = None,
+                            excluded_ingredients: Optional[List[str]] = None,
+                            per_category_limit: int = 500) -> List[Dict[str, Any]]:
+        """Get lightweight candidate recipes for meal planning, pre-filtered by the plan constraints"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        conditions = []
+        params = []
+        
+        if max_prep_time is not None:
+            conditions.append("prep_time <= %s")
+            params.append(max_prep_time)
+        if excluded_ingredients:
+            # Normalized ingredient rows cover both main and common ingredients
+            conditions.append("""NOT EXISTS (
+                    SELECT 1 FROM recipe_ingredients
+                    JOIN ingredients ON ingredients.id = recipe_ingredients.ingredient_id
+                    WHERE recipe_ingredients.recipe_id = recipes.id AND ingredients.name = ANY(%s))""")
+            params.append([name.strip().lower() for name in excluded_ingredients])
+        
+        filters = "".join(f" AND {condition}" for condition in conditions)
+        
+        # Each category walks idx_recipes_category from a random id, wrapping around to the lowest ids, and stops
+        # after per_category_limit matches, so the cost is bounded by the limit rather than the table size.
+        # The start is a live row from a ~1000-row page sample, so gaps in the id sequence do not skew it
+        cursor = self._connection.cursor()
+        cursor.execute(f"""
+            WITH start AS (
+                SELECT COALESCE((
+                    SELECT id FROM recipes
+                    TABLESAMPLE SYSTEM ((SELECT LEAST(100, 100 * 1000 / GREATEST(reltuples, 1))
+                                         FROM pg_class WHERE oid = 'recipes'::regclass))
+                    ORDER BY random() LIMIT 1), 0) AS id
+            )
+            SELECT picked.id, picked.name, picked.category, picked.prep_time, picked.portions
+            FROM unnest(%s::text[]) AS wanted(category)
+            CROSS JOIN start
+            CROSS JOIN LATERAL (
+                (SELECT id, name, category, prep_time, portions FROM recipes
+                 WHERE category = wanted.category AND id >= start.id{filters}
+                 ORDER BY id LIMIT %s)
+                UNION ALL
+                (SELECT id, name, category, prep_time, portions FROM recipes
+                 WHERE category = wanted.category AND id < start.id{filters}
+                 ORDER BY id LIMIT %s)
+                LIMIT %s
+            ) picked
+        """, [categories] + params + [per_category_limit] + params + [per_category_limit, per_category_limit])
+        
+        candidates = []
+        for row in cursor.fetchall():
+            candidates.append({
+                'id': row[0],
+                'name': row[1],
+                'category': row[2],
+                'prep_time': row[3],
+                'portions': row[4]
+            })
+        
+        cursor.close()
+        return candidates
+
+    def get_shopping_list(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Aggregate the ingredients of many recipes, scaled to the requested portions, in one query"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        recipe_ids = [item['recipe_id'] for item in items]
+        portions = [item.get('portions') for item in items]
+        
+        # One round trip: scaled main ingredients, distinct common ingredients and the recipes found.
+        # Quantities are summed in canonical units so "500 g" and "0.5 kg" merge. Unnamed ingredients are
+        # dropped; a name whose rows have no quantity sums to NULL and is listed without one.
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            WITH requested AS (
+                SELECT * FROM unnest(%s::int[], %s::int[]) AS r(recipe_id, portions)
+            ), selected AS (
+                SELECT recipes.id, recipes.main_ingredients, recipes.common_ingredients,
+                       COALESCE(requested.portions::float / NULLIF(recipes.portions, 0), 1) AS scale
+                FROM requested
+                JOIN recipes ON recipes.id = requested.recipe_id
+            )
+            SELECT 'main', lower(trim(ingredient->>'name')),
+                   COALESCE(ingredient->>'canonical_unit', ingredient->>'unit'),
+                   SUM(COALESCE(ingredient->>'canonical_quantity', ingredient->>'quantity')::float * scale)
+            FROM selected
+            CROSS JOIN LATERAL jsonb_array_elements(selected.main_ingredients) AS ingredient
+            WHERE ingredient->>'name' IS NOT NULL
+            GROUP BY 2, 3
+            UNION ALL
+            SELECT DISTINCT 'common', lower(trim(ingredient)), NULL::text, NULL::float
+            FROM selected
+            CROSS JOIN LATERAL unnest(selected.common_ingredients) AS ingredient
+            WHERE ingredient IS NOT NULL
+            UNION ALL
+            SELECT DISTINCT 'recipe', id::text, NULL::text, NULL::float
+            FROM selected
+            ORDER BY 1, 2, 3
+        """, (recipe_ids, portions))
+        
+        main_ingredients = []
+        common_ingredients = []
+        found_ids = set()
+        for row in cursor.fetchall():
+            if row[0] == 'main':
+                quantity = round(row[3], 3) if row[3] is not None else None
+                main_ingredients.append({'name': row[1], 'unit': row[2], 'quantity': quantity})
+            elif row[0] == 'common':
+                common_ingredients.append(row[1])
+            else:
+                found_ids.add(int(row[1]))
+        
+        cursor.close()
+        return {
+            'main_ingredients': main_ingredients,
+            'common_ingredients': common_ingredients,
+            'missing_recipe_ids': sorted(set(recipe_ids) - found_ids)
+        }
+
+    def get_recipe_ingredients(self, recipe_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get the portions and main ingredients of many recipes in one query"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            SELECT id, name, portions, main_ingredients
+            FROM recipes
+            WHERE id = ANY(%s)
+        """, (list(recipe_ids),))
+        
+        recipes = []
+        for row in cursor.fetchall():
+            recipes.append({
+                'id': row[0],
+                'name': row[1],
+                'portions': row[2],
+                'main_ingredients': row[3]
+            })
+        
+        cursor.close()
+        return recipes
+
+    def get_similar_recipes(self, recipe_id: int, k: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """Get the precomputed most similar recipes, or None if the recipe does not exist"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        # Served by the (recipe_id, rank) primary key of recipe_neighbors
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            SELECT recipes.id, recipes.name, recipes.category, recipes.prep_time, recipe_neighbors.score
+            FROM recipe_neighbors
+            JOIN recipes ON recipes.id = recipe_neighbors.neighbor_id
+            WHERE recipe_neighbors.recipe_id = %s
+            ORDER BY recipe_neighbors.rank
+            LIMIT %s
+        """, (recipe_id, k))
+        rows = cursor.fetchall()
+        
+        # No neighbours yet; tell a missing recipe apart from one not indexed
+        if not rows:
+            cursor.execute("SELECT id FROM recipes WHERE id = %s", (recipe_id,))
+            exists = cursor.fetchone() is not None
+            cursor.close()
+            return [] if exists else None
+        
+        cursor.close()
+        return [
+            {'id': row[0], 'name': row[1], 'category': row[2], 'prep_time': row[3], 'score': row[4]}
+            for row in rows
+        ]
+    
+    def get_similarity_features(self) -> List[Dict[str, Any]]:
+        """Get the category and ingredients of every recipe for the similarity index"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            SELECT id, category, main_ingredients, common_ingredients
+            FROM recipes
+            ORDER BY id
+        """)
+        
+        recipes = []
+        for row in cursor.fetchall():
+            recipes.append({
+                'id': row[0],
+                'category': row[1],
+                'main_ingredients': row[2],
+                'common_ingredients': row[3]
+            })
+        
+        cursor.close()
+        return recipes
+    
+    def get_dirty_similarity_markers(self) -> List[Tuple[int, Any]]:
+        """Get (recipe_id, marked_at) for recipes whose neighbours are out of date"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        cursor.execute("SELECT recipe_id, marked_at FROM recipe_similarity_dirty")
+        markers = [(row[0], row[1]) for row in cursor.fetchall()]
+        cursor.close()
+        return markers
+    
+    def get_neighbor_thresholds(self, k: int) -> Dict[int, float]:
+        """Get the weakest stored neighbour score of every recipe that has a full top-k list"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            SELECT recipe_id, MIN(score)
+            FROM recipe_neighbors
+            GROUP BY recipe_id
+            HAVING COUNT(*) >= %s
+        """, (k,))
+        thresholds = {row[0]: row[1] for row in cursor.fetchall()}
+        cursor.close()
+        return thresholds
+    
+    def get_neighbor_referrers(self, neighbor_ids: List[int]) -> List[int]:
+        """Get the recipes that store any of the given recipes as a neighbour"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        # Served by idx_recipe_neighbors_neighbor_id
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            SELECT DISTINCT recipe_id FROM recipe_neighbors WHERE neighbor_id = ANY(%s)
+        """, (neighbor_ids,))
+        recipe_ids = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        return recipe_ids
+    
+    def replace_neighbors(self, recipe_ids: List[int], neighbors: List[Tuple[int, int, int, float]],
+                          markers: List[Tuple[int, Any]]):
+        """Replace the stored neighbours of the given recipes and clear the processed markers"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute("DELETE FROM recipe_neighbors WHERE recipe_id = ANY(%s)", (recipe_ids,))
+            execute_values(cursor, """
+                INSERT INTO recipe_neighbors (recipe_id, neighbor_id, rank, score) VALUES %s
+            """, neighbors, page_size=1000)
+            
+            # Only clear markers that were not re-marked while the job was running
+            if markers:
+                cursor.execute("""
+                    DELETE FROM recipe_similarity_dirty AS dirty
+                    USING unnest(%s::int[], %s::timestamptz[]) AS done(recipe_id, marked_at)
+                    WHERE dirty.recipe_id = done.recipe_id AND dirty.marked_at = done.marked_at
+                """, ([m[0] for m in markers], [m[1] for m in markers]))
+            
+            self._connection.commit()
+        except Exception:
+            self._connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def sync_recipe_ingredients_batch(self, after_id: int, batch_size: int = 1000) -> Optional[int]:
+        """Rebuild normalized ingredient rows for the next batch of recipes; returns the last id or None when done"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute("""
+                SELECT id, sync_recipe_ingredients(id, main_ingredients, common_ingredients)
+                FROM (
+                    SELECT id, main_ingredients, common_ingredients
+                    FROM recipes
+                    WHERE id > %s
+                    ORDER BY id
+                    LIMIT %s
+                ) batch
+            """, (after_id, batch_size))
+            rows = cursor.fetchall()
+            self._connection.commit()
+        except Exception:
+            self._connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        
+        return max(row[0] for row in rows) if rows else None
+
+    def _insert_meal_plan_entries(self, cursor, plan_id: int, entries: List[Dict[str, Any]]):
+        """Insert all entries of a plan in one statement"""
+        if not entries:
+            return
+        execute_values(cursor, """
+            INSERT INTO meal_plan_entries (plan_id, day, category, recipe_id, portions)
+            VALUES %s
+        """, [
+            (plan_id, entry['day'], entry['category'], entry['recipe_id'], entry.get('portions'))
+            for entry in entries
+        ])
+
+    def create_meal_plan(self, name: str, start_date: Optional[Any] = None,
+                         entries: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Save a meal plan and its entries in one transaction"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO meal_plans (name, start_date)
+                VALUES (%s, %s)
+                RETURNING id
+            """, (name, start_date))
+            plan_id = cursor.fetchone()[0]
+            self._insert_meal_plan_entries(cursor, plan_id, entries or [])
+            self._connection.commit()
+        except Exception:
+            self._connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        
+        return self.get_meal_plan(plan_id)
+
+    def get_meal_plan(self, plan_id: int, include_shopping_list: bool = False) -> Optional[Dict[str, Any]]:
+        """Load a plan with its entries and recipes in a fixed number of queries, or None if it does not exist"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            SELECT id, name, start_date, created_at, updated_at
+            FROM meal_plans
+            WHERE id = %s
+        """, (plan_id,))
+        
+        row = cursor.fetchone()
+        if not row:
+            cursor.close()
+            return None
+        
+        plan = {
+            'id': row[0],
+            'name': row[1],
+            'start_date': row[2],
+            'created_at': row[3],
+            'updated_at': row[4],
+            'entries': []
+        }
+        
+        # Entries and their recipes come back together, in (plan_id, day) index order
+        cursor.execute("""
+            SELECT meal_plan_entries.id, meal_plan_entries.day, meal_plan_entries.category,
+                   meal_plan_entries.recipe_id, meal_plan_entries.portions,
+                   recipes.name, recipes.prep_time, recipes.portions
+            FROM meal_plan_entries
+            JOIN recipes ON recipes.id = meal_plan_entries.recipe_id
+            WHERE meal_plan_entries.plan_id = %s
+            ORDER BY meal_plan_entries.day, meal_plan_entries.id
+        """, (plan_id,))
+        
+        for row in cursor.fetchall():
+            plan['entries'].append({
+                'id': row[0],
+                'day': row[1],
+                'category': row[2],
+                'recipe_id': row[3],
+                'portions': row[4],
+                'recipe': {'id': row[3], 'name': row[5], 'prep_time': row[6], 'portions': row[7]}
+            })
+        
+        cursor.close()
+        
+        if include_shopping_list:
+            shopping_list = self.get_shopping_list([
+                {'recipe_id': entry['recipe_id'], 'portions': entry['portions']}
+                for entry in plan['entries']
+            ]) if plan['entries'] else {'main_ingredients': [], 'common_ingredients': []}
+            plan['shopping_list'] = {
+                'main_ingredients': shopping_list['main_ingredients'],
+                'common_ingredients': shopping_list['common_ingredients']
+            }
+        
+        return plan
+
+    def list_meal_plans(self, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """List saved plans with their entry counts, most recently updated first"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            SELECT meal_plans.id, meal_plans.name, meal_plans.start_date,
+                   COUNT(meal_plan_entries.id), meal_plans.updated_at
+            FROM meal_plans
+            LEFT JOIN meal_plan_entries ON meal_plan_entries.plan_id = meal_plans.id
+            GROUP BY meal_plans.id
+            ORDER BY meal_plans.updated_at DESC, meal_plans.id DESC
+            LIMIT %s OFFSET %s
+        """, (limit, offset))
+        
+        plans = []
+        for row in cursor.fetchall():
+            plans.append({
+                'id': row[0],
+                'name': row[1],
+                'start_date': row[2],
+                'entry_count': row[3],
+                'updated_at': row[4]
+            })
+        
+        cursor.close()
+        return plans
+
+    def update_meal_plan(self, plan_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update a plan's fields; entries, when given, replace the existing ones"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        set_clauses = ["updated_at = now()"]
+        values = []
+        for field in ['name', 'start_date']:
+            if field in updates:
+                set_clauses.append(f"{field} = %s")
+                values.append(updates[field])
+        values.append(plan_id)
+        
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute(f"UPDATE meal_plans SET {', '.join(set_clauses)} WHERE id = %s RETURNING id", values)
+            if not cursor.fetchone():
+                self._connection.rollback()
+                return None
+            
+            if updates.get('entries') is not None:
+                cursor.execute("DELETE FROM meal_plan_entries WHERE plan_id = %s", (plan_id,))
+                self._insert_meal_plan_entries(cursor, plan_id, updates['entries'])
+            
+            self._connection.commit()
+        except Exception:
+            self._connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        
+        return self.get_meal_plan(plan_id)
+
+    def delete_meal_plan(self, plan_id: int) -> bool:
+        """Delete a plan; its entries are removed by the foreign key cascade"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        cursor.execute("DELETE FROM meal_plans WHERE id = %s", (plan_id,))
+        
+        # Commit the transaction
+        self._connection.commit()
+        rows_affected = cursor.rowcount
+        cursor.close()
+        
+        return rows_affected > 0
+
+    def claim_idempotency_key(self, key: str, request_hash: str, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+        """Claim an idempotency key and return None, or return the response already stored for it"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        # A claim leaves the transaction open with the new key row locked, so the caller's write and
+        # complete_idempotency_key commit together. A concurrent duplicate blocks on the insert until
+        # then and reads the stored response; if the claimant rolls back, the duplicate gets the key.
+        cursor = self._connection.cursor()
+        try:
+            # An expired key is free to be reused
+            cursor.execute("DELETE FROM idempotency_keys WHERE key = %s AND expires_at < now()", (key,))
+            cursor.execute("""
+                INSERT INTO idempotency_keys (key, request_hash, expires_at)
+                VALUES (%s, %s, now() + make_interval(secs => %s))
+                ON CONFLICT (key) DO NOTHING
+                RETURNING key
+            """, (key, request_hash, ttl_seconds))
+            if cursor.fetchone():
+                return None
+            
+            cursor.execute("""
+                SELECT request_hash, status_code, response_body, response_headers
+                FROM idempotency_keys
+                WHERE key = %s
+            """, (key,))
+            row = cursor.fetchone()
+            self._connection.commit()
+        except Exception:
+            self._connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        
+        return {
+            'request_hash': row[0],
+            'status_code': row[1],
+            'response_body': row[2],
+            'response_headers': row[3] or {}
+        }
+
+    def complete_idempotency_key(self, key: str, status_code: int, response_body: Dict[str, Any],
+                                 response_headers: Optional[Dict[str, str]] = None):
+        """Store the response for a claimed key and commit it together with the caller's write"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute("""
+                UPDATE idempotency_keys
+                SET status_code = %s, response_body = %s, response_headers = %s
+                WHERE key = %s
+            """, (status_code, json.dumps(response_body), json.dumps(response_headers or {}), key))
+            self._connection.commit()
+        except Exception:
+            self.rollback()
+            raise
+        finally:
+            cursor.close()
+        
+        # The caller's recipe write committed with the key
+        if self._stats_changed:
+            self._recipes_written(True)
+
+    def purge_expired_idempotency_keys(self) -> int:
+        """Delete expired idempotency keys and return how many were removed"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        cursor.execute("DELETE FROM idempotency_keys WHERE expires_at < now()")
+        
+        # Commit the transaction
+        self._connection.commit()
+        rows_affected = cursor.rowcount
+        cursor.close()
+        
+        return rows_affected
+
+    def _job_from_row(self, row: Tuple) -> Dict[str, Any]:
+        """Map a jobs row selected with the standard column list to a dict"""
+        return {
+            'id': row[0],
+            'kind': row[1],
+            'params': row[2],
+            'status': row[3],
+            'attempts': row[4],
+            'max_attempts': row[5],
+            'run_at': row[6],
+            'result': row[7],
+            'error': row[8],
+            'created_at': row[9],
+            'updated_at': row[10]
+        }
+
+    def enqueue_job(self, kind: str, params: Dict[str, Any], max_attempts: int = 3) -> Dict[str, Any]:
+        """Queue a background job and return it"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            INSERT INTO jobs (kind, params, max_attempts)
+            VALUES (%s, %s, %s)
+            RETURNING id, kind, params, status, attempts, max_attempts, run_at, result, error, created_at, updated_at
+        """, (kind, json.dumps(params), max_attempts))
+        
+        job = self._job_from_row(cursor.fetchone())
+        
+        # Commit the transaction
+        self._connection.commit()
+        cursor.close()
+        return job
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Get a job with its status and result, or None if it does not exist"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            SELECT id, kind, params, status, attempts, max_attempts, run_at, result, error, created_at, updated_at
+            FROM jobs
+            WHERE id = %s
+        """, (job_id,))
+        
+        row = cursor.fetchone()
+        cursor.close()
+        return self._job_from_row(row) if row else None
+
+    def dequeue_job(self) -> Optional[Dict[str, Any]]:
+        """Claim the next ready job for this worker, skipping jobs other workers hold"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            UPDATE jobs
+            SET status = 'running', attempts = attempts + 1, locked_at = now(), updated_at = now()
+            WHERE id = (
+                SELECT id FROM jobs
+                WHERE status = 'queued' AND run_at <= now()
+                ORDER BY run_at, id
+                FOR UPDATE SKIP LOCKED
+                LIMIT 1
+            )
+            RETURNING id, kind, params, status, attempts, max_attempts, run_at, result, error, created_at, updated_at
+        """)
+        
+        row = cursor.fetchone()
+        
+        # Commit the transaction
+        self._connection.commit()
+        cursor.close()
+        return self._job_from_row(row) if row else None
+
+    def complete_job(self, job_id: int, result: Any):
+        """Mark a running job as succeeded and store its result"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            UPDATE jobs
+            SET status = 'succeeded', result = %s, error = NULL, locked_at = NULL, updated_at = now()
+            WHERE id = %s
+        """, (json.dumps(result, default=str), job_id))
+        
+        # Commit the transaction
+        self._connection.commit()
+        cursor.close()
+
+    def fail_job(self, job_id: int, error: str, retry_delay_seconds: Optional[float] = None):
+        """Record a failed attempt; the job is requeued after the delay, or marked failed when None"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        if retry_delay_seconds is None:
+            cursor.execute("""
+                UPDATE jobs
+                SET status = 'failed', error = %s, locked_at = NULL, updated_at = now()
+                WHERE id = %s
+            """, (error, job_id))
+        else:
+            cursor.execute("""
+                UPDATE jobs
+                SET status = 'queued', error = %s, locked_at = NULL, updated_at = now(),
+                    run_at = now() + make_interval(secs => %s)
+                WHERE id = %s
+            """, (error, retry_delay_seconds, job_id))
+        
+        # Commit the transaction
+        self._connection.commit()
+        cursor.close()
+
+    def requeue_stale_jobs(self, timeout_seconds: float) -> int:
+        """Requeue running jobs whose worker has held them longer than the timeout, e.g. after a crash"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            UPDATE jobs
+            SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                error = 'Worker timed out', locked_at = NULL, updated_at = now()
+            WHERE status = 'running' AND locked_at < now() - make_interval(secs => %s)
+        """, (timeout_seconds,))
+        
+        # Commit the transaction
+        self._connection.commit()
+        rows_affected = cursor.rowcount
+        cursor.close()
+        return rows_affected
+
+    def get_meal_plan_items(self, plan_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get the recipe and portions of every entry of many plans in one query"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            SELECT recipe_id, portions
+            FROM meal_plan_entries
+            WHERE plan_id = ANY(%s)
+        """, (list(plan_ids),))
+        
+        items = [{'recipe_id': row[0], 'portions': row[1]} for row in cursor.fetchall()]
+        cursor.close()
+        return items
+    
+    def get_readiness_stats(self) -> Dict[str, Any]:
+        """Get replication lag and server connection usage for the readiness probe"""
+        if not self.is_connected():
+            raise Exception("Not connected to database")
+        
+        # Lag is NULL on a primary, and on a replica that has not replayed anything yet
+        cursor = self._connection.cursor()
+        cursor.execute("""
+            SELECT pg_is_in_recovery(),
+                   CASE WHEN pg_is_in_recovery()
+                        THEN EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+                   END,
+                   (SELECT COUNT(*) FROM pg_stat_activity),
+                   current_setting('max_connections')::integer
+        """)
+        row = cursor.fetchone()
+        self._connection.rollback()
+        cursor.close()
+        
+        return {
+            'in_recovery': row[0],
+            'replica_lag_seconds': float(row[1]) if row[1] is not None else None,
+            'connections': row[2],
+            'max_connections': row[3]
+        }
+
+
+# Per-method query duration and error metrics; connect has its own histogram
+instrument_methods(DatabaseClient, skip=("connect", "disconnect", "is_connected", "rollback"))
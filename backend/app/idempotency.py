@@ -0,0 +1,37 @@
+"""
+Idempotency-Key support for write endpoints.
+Retried requests with the same key get the stored response instead of repeating the write.
+
+Expired keys are reused on demand; to purge them in bulk:
+    python -m app.idempotency
+"""
+import hashlib
+import json
+import os
+from typing import Any
+from .database_client import DatabaseClient
+
+# Seconds a stored response is replayed for
+IDEMPOTENCY_KEY_TTL = float(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+
+
+def request_fingerprint(endpoint: str, payload: Any) -> str:
+    """Hash an endpoint and request body so a key reused for a different request can be rejected"""
+    body = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(f"{endpoint}\n{body}".encode()).hexdigest()
+
+
+def main():
+    """Command line entry point for purging expired keys"""
+    db_client = DatabaseClient()
+    if not db_client.connect():
+        raise SystemExit("Failed to connect to database")
+    try:
+        purged = db_client.purge_expired_idempotency_keys()
+        print(f"Purged {purged} expired idempotency keys")
+    finally:
+        db_client.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Background job runner backed by the jobs table.
+Workers claim jobs with FOR UPDATE SKIP LOCKED, so any number of threads or processes can share the
+queue without an external broker. Failed attempts are retried with exponential backoff.
+
+Run dedicated workers with:
+    python -m app.jobs --workers 4
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, Tuple, Type
+from pydantic import BaseModel
+from .database_client import DatabaseClient
+from .models import MealPlanRequest, ShoppingListJobParams, RecipeExportJobParams
+from .planner import MAX_CANDIDATES_PER_CATEGORY, generate_plan
+
+# Retry delay is RETRY_BASE_SECONDS * 2 ** (attempt - 1), capped at RETRY_MAX_SECONDS
+RETRY_BASE_SECONDS = 2.0
+RETRY_MAX_SECONDS = 300.0
+
+# Running jobs not finished within this many seconds are assumed abandoned and requeued
+JOB_TIMEOUT_SECONDS = float(os.getenv("JOB_TIMEOUT_SECONDS", "600"))
+
+# Directory that recipe exports are written to
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+
+
+def retry_delay(attempt: int) -> float:
+    """Seconds to wait before retrying after the given failed attempt"""
+    return min(RETRY_BASE_SECONDS * 2 ** (attempt - 1), RETRY_MAX_SECONDS)
+
+
+def run_meal_plan(db_client: DatabaseClient, params: MealPlanRequest, job_id: int) -> Dict[str, Any]:
+    """Generate a (possibly month-long) meal plan"""
+    candidates = db_client.get_plan_candidates(
+        categories=list(set(params.categories)),
+        max_prep_time=params.max_prep_time,
+        excluded_ingredients=params.excluded_ingredients,
+        per_category_limit=MAX_CANDIDATES_PER_CATEGORY
+    )
+    plan = generate_plan(
+        candidates,
+        days=params.days,
+        categories=params.categories,
+        no_repeat_days=params.no_repeat_days,
+        target_portions=params.portions,
+        seed=params.seed
+    )
+    return {'days': plan}
+
+
+def run_shopping_list(db_client: DatabaseClient, params: ShoppingListJobParams, job_id: int) -> Dict[str, Any]:
+    """Aggregate one shopping list over all entries of many saved plans"""
+    items = db_client.get_meal_plan_items(params.plan_ids)
+    if not items:
+        return {'main_ingredients': [], 'common_ingredients': [], 'missing_recipe_ids': []}
+    return db_client.get_shopping_list(items)
+
+
+def run_recipe_export(db_client: DatabaseClient, params: RecipeExportJobParams, job_id: int) -> Dict[str, Any]:
+    """Write every recipe to an NDJSON file and return its path"""
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    path = os.path.join(EXPORT_DIR, f"recipes-{job_id}.ndjson")
+    recipes = db_client.get_all_recipes()
+    with open(path, "w") as export_file:
+        for recipe in recipes:
+            export_file.write(json.dumps(recipe, default=str) + "\n")
+    return {'path': path, 'count': len(recipes)}
+
+
+# kind -> (params model, handler)
+JOB_KINDS: Dict[str, Tuple[Type[BaseModel], Callable[..., Any]]] = {
+    'meal_plan': (MealPlanRequest, run_meal_plan),
+    'shopping_list': (ShoppingListJobParams, run_shopping_list),
+    'recipe_export': (RecipeExportJobParams, run_recipe_export),
+}
+
+
+def run_job(db_client: DatabaseClient, job: Dict[str, Any]):
+    """Run one claimed job and record its result, a retry or a final failure"""
+    try:
+        params_model, handler = JOB_KINDS[job['kind']]
+        result = handler(db_client, params_model(**job['params']), job['id'])
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+        db_client.rollback()
+        delay = retry_delay(job['attempts']) if job['attempts'] < job['max_attempts'] else None
+        db_client.fail_job(job['id'], error, delay)
+        return
+    db_client.complete_job(job['id'], result)
+
+
+class JobWorkerPool:
+    """Threads that each hold a database connection and run jobs until stopped"""
+
+    def __init__(self, workers: int, poll_interval: float = 1.0,
+                 client_factory: Callable[[], DatabaseClient] = DatabaseClient):
+        """Initialize a stopped pool"""
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._client_factory = client_factory
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start the worker threads"""
+        self._stop.clear()
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Ask workers to stop after their current job and wait for them"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _work(self):
+        """Claim and run jobs, sleeping between polls while the queue is empty"""
+        db_client = self._client_factory()
+        last_requeue = 0.0
+        try:
+            while not self._stop.is_set():
+                if not db_client.is_connected() and not db_client.connect():
+                    self._stop.wait(self.poll_interval)
+                    continue
+                try:
+                    if time.monotonic() - last_requeue > JOB_TIMEOUT_SECONDS / 2:
+                        db_client.requeue_stale_jobs(JOB_TIMEOUT_SECONDS)
+                        last_requeue = time.monotonic()
+                    job = db_client.dequeue_job()
+                    if job is None:
+                        self._stop.wait(self.poll_interval)
+                        continue
+                    run_job(db_client, job)
+                except Exception as e:
+                    print(f"Job worker error: {e}")
+                    db_client.disconnect()
+                    self._stop.wait(self.poll_interval)
+        finally:
+            db_client.disconnect()
+
+
+# In-process workers started by the app; 0 leaves the queue to dedicated `python -m app.jobs` workers
+job_worker_pool = JobWorkerPool(int(os.getenv("JOB_WORKERS", "0")))
+
+
+def main():
+    """Command line entry point for a dedicated worker process"""
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--workers", type=int, default=2, help="worker threads in this process")
+    args = parser.parse_args()
+
+    pool = JobWorkerPool(args.workers)
+    pool.start()
+    print(f"Running {args.workers} job workers")
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,35 @@
 import os
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .routes import health, recipes
+from . import IMPORT_STARTED
+from .batching import recipe_insert_batcher
+from .cache import category_stats_cache
+from .database_client import close_pools
+from .jobs import job_worker_pool
+from .metrics import MetricsMiddleware, register_cache, startup_duration
+from .profiling import ProfilingMiddleware, install_profiling
+from .tracing import TracingMiddleware, exporter, install_tracing
+from .routes import health, recipes, meal_plans, shopping_list, jobs, metrics, admin
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background job workers and warm up; on shutdown stop them, flush queued writes and spans, close the pool"""
+    job_worker_pool.start()
+    started = time.perf_counter()
+    await health.warm_up()
+    startup_duration.labels("warmup").set(time.perf_counter() - started)
+    yield
+    job_worker_pool.stop()
+    recipe_insert_batcher.close()
+    exporter.close()
+    close_pools()
+
 
 # Create FastAPI app instance
-app = FastAPI(title="Meal Planner API", version="1.0.0")
+app = FastAPI(title="Meal Planner API", version="1.0.0", lifespan=lifespan)
 
 # Get frontend URL from environment variable
 frontend_url = os.getenv("REACT_APP_FRONTEND_URL", "http://localhost:3000")
@@ -18,6 +43,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Honour X-Profile on requests from admins
+app.add_middleware(ProfilingMiddleware)
+
+# Record request latency and status per route
+app.add_middleware(MetricsMiddleware)
+register_cache("category_stats", category_stats_cache)
+
+# Sample requests for tracing and propagate traceparent
+app.add_middleware(TracingMiddleware)
+
 # Include routers
 app.include_router(health.router)
 app.include_router(recipes.router)
+app.include_router(meal_plans.router)
+app.include_router(shopping_list.router)
+app.include_router(jobs.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
+
+# Let admins profile live requests to any sync endpoint
+app.state.profilable_routes = install_profiling(app)
+
+# Open an endpoint span inside each sampled request
+install_tracing(app)
+
+# Time from importing the app package until the app is built
+startup_duration.labels("import").set(time.perf_counter() - IMPORT_STARTED)
@@ -0,0 +1,358 @@
+"""
+Prometheus metrics for the API.
+Metrics render in the Prometheus text exposition format without an external client library. Labelled
+children are created once per label set and reused, so recording a value only takes a lock and an add.
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from .tracing import enter_span, exit_span
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render a label set as {a="x",b="y"}"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    """Base class holding one child per label set"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """Initialize a metric with no children"""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self.labels()
+
+    def labels(self, *values: str):
+        """Child for a label set, created on first use"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        """Create the child that stores values for one label set"""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Exposition lines for this metric"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: Tuple[str, ...], child) -> List[str]:
+        """Exposition lines for one child"""
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class _Value:
+    """Lock-protected number"""
+
+    def __init__(self):
+        """Start at zero"""
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        """Add to the value"""
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        """Subtract from the value"""
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        """Replace the value"""
+        with self._lock:
+            self.value = value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        """Create a zero counter"""
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        """Increment the unlabelled counter"""
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        """Create a zero gauge"""
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        """Increment the unlabelled gauge"""
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        """Decrement the unlabelled gauge"""
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        """Set the unlabelled gauge"""
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    """Bucket counts, sum and count of observations"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        """Start with empty buckets"""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """Record one observation"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """Initialize a histogram with the given upper bounds"""
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        """Create empty buckets"""
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        """Record an observation on the unlabelled histogram"""
+        self.labels().observe(value)
+
+    def _render_child(self, values: Tuple[str, ...], child) -> List[str]:
+        """Cumulative bucket, sum and count lines"""
+        with child._lock:
+            counts, total = list(child.counts), child.sum
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = 'le="+Inf"' if bound == float("inf") else f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics plus callbacks that refresh gauges at scrape time"""
+
+    def __init__(self):
+        """Initialize an empty registry"""
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric and return it"""
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Call `collector` before every render"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the text exposition format"""
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")))
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP responses by route and status class", ("method", "route", "status")))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"))
+db_query_duration = registry.register(Histogram(
+    "db_query_duration_seconds", "DatabaseClient method duration", ("method",)))
+db_errors = registry.register(Counter(
+    "db_errors_total", "DatabaseClient method calls that raised", ("method",)))
+db_connect_duration = registry.register(Histogram(
+    "db_connect_duration_seconds", "Time to obtain a database connection"))
+cache_hits = registry.register(Counter("cache_hits_total", "Cache hits", ("cache",)))
+cache_misses = registry.register(Counter("cache_misses_total", "Cache misses", ("cache",)))
+cache_hit_ratio = registry.register(Gauge("cache_hit_ratio", "Cache hits over lookups", ("cache",)))
+startup_duration = registry.register(Gauge(
+    "app_startup_seconds", "Time spent in each startup phase (import, warmup)", ("phase",)))
+
+
+def register_cache(name: str, cache):
+    """Export a cache's hit and miss counts, read from the cache at scrape time"""
+    hits, misses, ratio = cache_hits.labels(name), cache_misses.labels(name), cache_hit_ratio.labels(name)
+
+    def collect():
+        lookups = cache.hits + cache.misses
+        hits.set(cache.hits)
+        misses.set(cache.misses)
+        ratio.set(cache.hits / lookups if lookups else 0.0)
+
+    registry.add_collector(collect)
+
+
+class RequestQueries:
+    """Statement count and time accumulated while serving one request"""
+
+    __slots__ = ("count", "seconds", "route")
+
+    def __init__(self, route: Callable[[], str]):
+        """Start at zero; route returns the route label when a slow statement is logged"""
+        self.count = 0
+        self.seconds = 0.0
+        self.route = route
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Server-Timing header value with database and total time in milliseconds"""
+        return (f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries", '
+                f'total;dur={total_seconds * 1000:.1f}')
+
+
+# Set by MetricsMiddleware; thread pool handlers see it through the copied context
+current_request: ContextVar[Optional[RequestQueries]] = ContextVar("current_request", default=None)
+
+
+# DatabaseClient method currently running, used to attribute individual statements
+current_db_method: ContextVar[str] = ContextVar("current_db_method", default="unknown")
+
+
+def instrument_methods(cls: type, skip: Sequence[str] = ()):
+    """Wrap every public method of cls to record its duration and errors, and trace it as a span"""
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or name in skip or not callable(method):
+            continue
+        setattr(cls, name, _timed(method, db_query_duration.labels(name), db_errors.labels(name)))
+
+
+def _timed(method: Callable, duration, errors) -> Callable:
+    """Wrap a function with a pre-bound histogram and error counter"""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        token = current_db_method.set(name)
+        span = enter_span(f"db.{name}")
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            duration.observe(time.perf_counter() - started)
+            exit_span(span)
+            current_db_method.reset(token)
+    return wrapper
+
+
+# Request methods kept as metric labels; any other verb a client sends is labelled "other"
+HTTP_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE", "CONNECT"))
+
+
+def method_label(method: str) -> str:
+    """Metric label for a request method, so arbitrary verbs cannot create new label sets"""
+    return method if method in HTTP_METHODS else "other"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency, status and in-flight count per route, and setting Server-Timing"""
+
+    def __init__(self, app):
+        """Wrap an ASGI app"""
+        self.app = app
+        self._routes = None
+
+    def _route(self, scope) -> str:
+        """Path template of the matched route, so ids do not create a label set per URL"""
+        if self._routes is None:
+            self._routes = {
+                route.endpoint: route.path for route in scope["app"].routes if hasattr(route, "endpoint")
+            }
+        # The router stores the matched endpoint in the scope
+        return self._routes.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        """Time the request and record it under its route"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+        started = time.perf_counter()
+        method = method_label(scope["method"])
+        queries = RequestQueries(lambda: f"{method} {self._route(scope)}")
+        token = current_request.set(queries)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                timing = queries.server_timing(time.perf_counter() - started).encode("latin-1")
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing)]
+            await send(message)
+
+        in_flight = http_requests_in_flight.labels()
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            current_request.reset(token)
+            route = self._route(scope)
+            http_request_duration.labels(method, route).observe(time.perf_counter() - started)
+            http_requests.labels(method, route, f"{status[0] // 100}xx").inc()
@@ -1,8 +1,9 @@
 """
 Pydantic models for request/response validation
 """
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import Optional, List, Dict, Any
 
 
 class Ingredient(BaseModel):
@@ -46,3 +47,293 @@ class RecipeUpdate(BaseModel):
     instructions: Optional[str] = None
     prep_time: Optional[int] = None
     portions: Optional[int] = None
+
+
+class RecipeBulkUpdateItem(RecipeUpdate):
+    id: int
+    version: Optional[int] = None
+
+
+class RecipeBulkUpdateRequest(BaseModel):
+    items: List[RecipeBulkUpdateItem] = Field(min_length=1, max_length=1000)
+
+
+class RecipeBulkUpdateResult(BaseModel):
+    id: int
+    status: str
+    version: Optional[int] = None
+
+
+class RecipeBulkUpdateResponse(BaseModel):
+    status: str
+    updated: int
+    results: List[RecipeBulkUpdateResult]
+
+
+class CategoryStats(BaseModel):
+    # Recipes without a category are counted in a null group
+    category: Optional[str] = None
+    count: int
+    avg_prep_time: Optional[float] = None
+
+
+class CategoryStatsResponse(BaseModel):
+    status: str
+    categories: List[CategoryStats]
+
+
+class RecentRecipe(BaseModel):
+    id: int
+    name: str
+    category: Optional[str] = None
+    prep_time: Optional[int] = None
+    updated_at: datetime
+
+
+class RecentRecipesResponse(BaseModel):
+    status: str
+    count: int
+    recipes: List[RecentRecipe]
+
+
+class SearchFacets(BaseModel):
+    category: Dict[str, int]
+    prep_time: Dict[str, int]
+    portions: Dict[str, int]
+
+
+class RecipeSearchResponse(BaseModel):
+    status: str
+    count: int
+    total: int
+    recipes: List[RecipeResponse]
+    facets: Optional[SearchFacets] = None
+
+
+class MealPlanRequest(BaseModel):
+    days: int = Field(7, ge=1, le=31)
+    categories: List[str] = Field(default_factory=lambda: ['breakfast', 'lunch', 'dinner'], min_length=1)
+    max_prep_time: Optional[int] = Field(None, ge=0)
+    portions: Optional[int] = Field(None, ge=1)
+    no_repeat_days: int = Field(7, ge=0)
+    excluded_ingredients: List[str] = []
+    seed: Optional[int] = None
+
+
+class PlannedRecipe(BaseModel):
+    id: int
+    name: str
+    prep_time: Optional[int] = None
+    portions: Optional[int] = None
+
+
+class PlannedMeal(BaseModel):
+    category: str
+    recipe: Optional[PlannedRecipe] = None
+
+
+class PlannedDay(BaseModel):
+    day: int
+    meals: List[PlannedMeal]
+
+
+class MealPlanResponse(BaseModel):
+    status: str
+    days: List[PlannedDay]
+
+
+class ShoppingListItem(BaseModel):
+    recipe_id: int
+    portions: Optional[int] = Field(None, ge=1)
+
+
+class ShoppingListRequest(BaseModel):
+    items: List[ShoppingListItem] = Field(min_length=1, max_length=1000)
+
+
+class ShoppingListIngredient(BaseModel):
+    # Stored ingredients written before validation may lack a numeric quantity or a unit
+    quantity: Optional[float] = None
+    unit: Optional[str] = None
+    name: str
+
+
+class ShoppingListResponse(BaseModel):
+    status: str
+    main_ingredients: List[ShoppingListIngredient]
+    common_ingredients: List[str]
+    missing_recipe_ids: List[int]
+
+
+class MealPlanEntry(BaseModel):
+    day: int = Field(ge=1)
+    category: str
+    recipe_id: int
+    portions: Optional[int] = Field(None, ge=1)
+
+
+class MealPlanCreate(BaseModel):
+    name: str
+    start_date: Optional[date] = None
+    entries: List[MealPlanEntry] = Field(default_factory=list, max_length=1000)
+
+
+class MealPlanUpdate(BaseModel):
+    name: Optional[str] = None
+    start_date: Optional[date] = None
+    entries: Optional[List[MealPlanEntry]] = Field(None, max_length=1000)
+
+
+class MealPlanEntryResponse(MealPlanEntry):
+    id: int
+    recipe: PlannedRecipe
+
+
+class MealPlanShoppingList(BaseModel):
+    main_ingredients: List[ShoppingListIngredient]
+    common_ingredients: List[str]
+
+
+class SavedMealPlan(BaseModel):
+    id: int
+    name: str
+    start_date: Optional[date] = None
+    created_at: datetime
+    updated_at: datetime
+    entries: List[MealPlanEntryResponse]
+    shopping_list: Optional[MealPlanShoppingList] = None
+
+
+class MealPlanDetailResponse(BaseModel):
+    status: str
+    plan: SavedMealPlan
+
+
+class MealPlanSummary(BaseModel):
+    id: int
+    name: str
+    start_date: Optional[date] = None
+    entry_count: int
+    updated_at: datetime
+
+
+class MealPlanListResponse(BaseModel):
+    status: str
+    count: int
+    plans: List[MealPlanSummary]
+
+
+class ScaleItem(BaseModel):
+    recipe_id: int
+    target_portions: int = Field(ge=1)
+
+
+class ScaleRequest(BaseModel):
+    items: List[ScaleItem] = Field(min_length=1, max_length=1000)
+
+
+class ScaledRecipe(BaseModel):
+    recipe_id: int
+    name: str
+    portions: Optional[int] = None
+    target_portions: int
+    main_ingredients: List[Ingredient]
+
+
+class ScaleResponse(BaseModel):
+    status: str
+    recipes: List[ScaledRecipe]
+    missing_recipe_ids: List[int]
+
+
+class SimilarRecipe(BaseModel):
+    id: int
+    name: str
+    category: str
+    prep_time: Optional[int] = None
+    score: float
+
+
+class SimilarRecipesResponse(BaseModel):
+    status: str
+    count: int
+    recipes: List[SimilarRecipe]
+
+
+class ShoppingListJobParams(BaseModel):
+    plan_ids: List[int] = Field(min_length=1, max_length=1000)
+
+
+class RecipeExportJobParams(BaseModel):
+    pass
+
+
+class JobCreate(BaseModel):
+    kind: str
+    params: Dict[str, Any] = {}
+    max_attempts: int = Field(3, ge=1, le=10)
+
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    params: Dict[str, Any]
+    status: str
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class JobResponse(BaseModel):
+    status: str
+    job: Job
+
+
+class ProfilingCreate(BaseModel):
+    route: str
+    mode: str = 'sample'
+    requests: int = Field(1, ge=1, le=100)
+
+
+class ProfilingSession(BaseModel):
+    id: int
+    route: str
+    mode: str
+    requests: int
+    captured: int
+    complete: bool
+    output: str
+
+
+class ProfilingResponse(BaseModel):
+    status: str
+    session: ProfilingSession
+
+
+class TraceSpan(BaseModel):
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    name: str
+    start: float
+    duration_ms: float
+    attributes: Dict[str, Any]
+
+
+class Trace(BaseModel):
+    spans: List[TraceSpan]
+
+
+class TraceListResponse(BaseModel):
+    status: str
+    count: int
+    traces: List[Trace]
+
+
+class TraceResponse(BaseModel):
+    status: str
+    trace: Trace
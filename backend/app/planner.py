@@ -0,0 +1,76 @@
+"""
+Meal plan generation engine.
+Scores candidate recipes with vectorized feature arrays and fills each day's meal slots greedily.
+"""
+import numpy as np
+from typing import Optional, List, Dict, Any
+
+# Upper bound on candidates fetched per category, keeps planning time flat as the table grows
+MAX_CANDIDATES_PER_CATEGORY = 500
+
+# Relative weights of the scoring features
+PREP_TIME_WEIGHT = 1.0
+PORTIONS_WEIGHT = 1.0
+VARIETY_WEIGHT = 0.5
+
+
+def score_candidates(prep_times: np.ndarray, portions: np.ndarray, target_portions: Optional[int],
+                     rng: np.random.Generator) -> np.ndarray:
+    """Score candidates in one pass: quicker recipes and closer portion counts score higher"""
+    # Missing values are stored as NaN and score neutrally
+    max_prep = np.nanmax(prep_times) if np.any(~np.isnan(prep_times)) else 0.0
+    prep_score = 1.0 - prep_times / max_prep if max_prep > 0 else np.zeros_like(prep_times)
+    prep_score = np.nan_to_num(prep_score, nan=0.5)
+
+    if target_portions:
+        distance = np.abs(portions - target_portions) / target_portions
+        portions_score = np.nan_to_num(1.0 - np.minimum(distance, 1.0), nan=0.5)
+    else:
+        portions_score = np.zeros_like(portions)
+
+    # Random jitter so repeated requests produce varied plans
+    variety = rng.random(len(prep_times))
+
+    return PREP_TIME_WEIGHT * prep_score + PORTIONS_WEIGHT * portions_score + VARIETY_WEIGHT * variety
+
+
+def generate_plan(candidates: List[Dict[str, Any]], days: int, categories: List[str],
+                  no_repeat_days: int, target_portions: Optional[int] = None,
+                  seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Build a plan of `days` days with one meal per category, avoiding repeats within the window"""
+    rng = np.random.default_rng(seed)
+
+    # Flatten candidates into feature arrays
+    recipe_categories = np.array([c['category'] for c in candidates], dtype=object)
+    prep_times = np.array([c['prep_time'] if c['prep_time'] is not None else np.nan for c in candidates], dtype=float)
+    portions = np.array([c['portions'] if c['portions'] is not None else np.nan for c in candidates], dtype=float)
+
+    scores = score_candidates(prep_times, portions, target_portions, rng)
+
+    # Day each candidate was last planned on; far in the past means never
+    last_used = np.full(len(candidates), -(days + no_repeat_days + 1))
+    by_category = {category: np.flatnonzero(recipe_categories == category) for category in set(categories)}
+
+    plan = []
+    for day in range(days):
+        meals = []
+        for category in categories:
+            indices = by_category[category]
+            allowed = (day - last_used[indices]) >= no_repeat_days
+
+            recipe = None
+            if np.any(allowed):
+                best = indices[np.argmax(np.where(allowed, scores[indices], -np.inf))]
+                last_used[best] = day
+                candidate = candidates[best]
+                recipe = {
+                    'id': candidate['id'],
+                    'name': candidate['name'],
+                    'prep_time': candidate['prep_time'],
+                    'portions': candidate['portions']
+                }
+
+            meals.append({'category': category, 'recipe': recipe})
+        plan.append({'day': day + 1, 'meals': meals})
+
+    return plan
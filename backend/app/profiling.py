@@ -0,0 +1,360 @@
+"""
+On-demand profiling of live requests.
+An admin arms a session for the next N requests to a route, or sends X-Profile on a single request; matching
+endpoint calls then run under a stack sampler (collapsed stacks for flamegraphs), cProfile, or a tracemalloc
+snapshot diff. Disabled unless PROFILING_TOKEN is set.
+"""
+import asyncio
+import cProfile
+import functools
+import hmac
+import io
+import itertools
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Any
+
+# Shared secret for the admin endpoints and the X-Profile header; empty disables profiling
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+
+# Seconds between stack samples in sample mode
+SAMPLE_INTERVAL = float(os.getenv("PROFILING_SAMPLE_INTERVAL", "0.001"))
+
+PROFILE_MODES = ('sample', 'cprofile', 'tracemalloc')
+
+# Finished sessions kept for retrieval; the oldest are dropped first
+MAX_SESSIONS = 20
+
+# Lines reported by cprofile and tracemalloc output
+TOP_ENTRIES = 30
+
+
+def token_matches(token: Optional[str]) -> bool:
+    """Whether profiling is enabled and token is the configured secret"""
+    return bool(PROFILING_TOKEN) and token is not None and hmac.compare_digest(token.encode(), PROFILING_TOKEN.encode())
+
+
+class ProfilerUnavailable(Exception):
+    """The profiler could not start; the call has not run"""
+
+
+# cProfile allows one active profiler per interpreter on Python 3.12+ (sys.monitoring), so captures take turns
+_cprofile_lock = threading.Lock()
+
+
+def _frame_label(frame) -> str:
+    """Collapsed-stack label for a frame: file:function"""
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+
+
+class ProfileSession:
+    """Profiling results accumulated over the requests captured for one route"""
+
+    def __init__(self, session_id: int, route: str, mode: str, requests: int):
+        """Initialize an armed session"""
+        self.id = session_id
+        self.route = route
+        self.mode = mode
+        self.requests = requests
+        self.remaining = requests
+        self.armed = True
+        self.captured = 0
+        self.stacks: Counter = Counter()
+        self.allocations: Dict[str, List[int]] = {}
+        self.stats: Optional[pstats.Stats] = None
+        self._lock = threading.Lock()
+
+    def run(self, call: Callable, *args, **kwargs):
+        """Run one endpoint call under this session's profiler"""
+        runner = {'sample': self._sample, 'cprofile': self._cprofile, 'tracemalloc': self._tracemalloc}[self.mode]
+        captured = True
+        try:
+            return runner(call, *args, **kwargs)
+        except ProfilerUnavailable:
+            captured = False
+            raise
+        finally:
+            if captured:
+                with self._lock:
+                    self.captured += 1
+
+    def _sample(self, call: Callable, *args, **kwargs):
+        """Sample the calling thread's stack until the call returns"""
+        thread_id = threading.get_ident()
+        root = sys._getframe()
+        done = threading.Event()
+        stacks = Counter()
+
+        def sampler():
+            while not done.wait(SAMPLE_INTERVAL):
+                frame = sys._current_frames().get(thread_id)
+                stack = []
+                while frame is not None and frame is not root:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if frame is root and stack:
+                    stacks[";".join(reversed(stack))] += 1
+
+        thread = threading.Thread(target=sampler, daemon=True)
+        thread.start()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            done.set()
+            thread.join()
+            with self._lock:
+                self.stacks.update(stacks)
+
+    def _cprofile(self, call: Callable, *args, **kwargs):
+        """Run the call under cProfile and merge its stats; raises ProfilerUnavailable while another capture runs"""
+        if not _cprofile_lock.acquire(blocking=False):
+            raise ProfilerUnavailable()
+        try:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another tool, such as a debugger or coverage, holds the profiling hook
+                raise ProfilerUnavailable()
+            try:
+                return call(*args, **kwargs)
+            finally:
+                profile.disable()
+                with self._lock:
+                    if self.stats is None:
+                        self.stats = pstats.Stats(profile)
+                    else:
+                        self.stats.add(profile)
+        finally:
+            _cprofile_lock.release()
+
+    def _tracemalloc(self, call: Callable, *args, **kwargs):
+        """Diff allocation snapshots taken around the call; concurrent requests also show up in the diff"""
+        _start_tracing()
+        try:
+            before = tracemalloc.take_snapshot()
+            try:
+                return call(*args, **kwargs)
+            finally:
+                after = tracemalloc.take_snapshot()
+                with self._lock:
+                    for stat in after.compare_to(before, 'lineno'):
+                        frame = stat.traceback[0]
+                        totals = self.allocations.setdefault(f"{frame.filename}:{frame.lineno}", [0, 0])
+                        totals[0] += stat.size_diff
+                        totals[1] += stat.count_diff
+        finally:
+            _stop_tracing()
+
+    def output(self) -> str:
+        """Collapsed stacks (sample), top functions by cumulative time (cprofile) or top allocation sites"""
+        with self._lock:
+            if self.mode == 'sample':
+                return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+            if self.mode == 'cprofile':
+                if self.stats is None:
+                    return ""
+                stream = io.StringIO()
+                self.stats.stream = stream
+                self.stats.sort_stats('cumulative').print_stats(TOP_ENTRIES)
+                return stream.getvalue()
+            top = sorted(self.allocations.items(), key=lambda item: -item[1][0])[:TOP_ENTRIES]
+            return "\n".join(f"{location} size={size:+d} B count={count:+d}" for location, (size, count) in top)
+
+    def summary(self) -> Dict[str, Any]:
+        """Session state and output as a dict"""
+        return {
+            'id': self.id,
+            'route': self.route,
+            'mode': self.mode,
+            'requests': self.requests,
+            'captured': self.captured,
+            'complete': self.captured >= self.requests,
+            'output': self.output()
+        }
+
+
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+def _start_tracing():
+    """Start tracemalloc for one more capture unless something else already traces"""
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    """Stop tracemalloc once the last capture finishes, if it was started here"""
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+class Profiler:
+    """Armed and finished profiling sessions"""
+
+    def __init__(self):
+        """Initialize with no sessions"""
+        self.armed: Dict[str, List[ProfileSession]] = {}
+        self._sessions: Dict[int, ProfileSession] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def arm(self, route: str, mode: str, requests: int) -> ProfileSession:
+        """Profile the next `requests` calls to route ("METHOD /path/template")"""
+        return self._add(route, mode, requests, armed=True)
+
+    def single(self, route: str, mode: str) -> ProfileSession:
+        """Session for one request that asked to be profiled via the X-Profile header"""
+        return self._add(route, mode, 1, armed=False)
+
+    def _add(self, route: str, mode: str, requests: int, armed: bool) -> ProfileSession:
+        """Create and store a session"""
+        with self._lock:
+            session = ProfileSession(next(self._ids), route, mode, requests)
+            self._sessions[session.id] = session
+            while len(self._sessions) > MAX_SESSIONS:
+                self._sessions.pop(next(iter(self._sessions)))
+            if armed:
+                self.armed.setdefault(route, []).append(session)
+            else:
+                session.armed = False
+                session.remaining = 0
+        return session
+
+    def claim(self, route: str) -> Optional[ProfileSession]:
+        """Take one capture slot from the oldest session armed for route"""
+        with self._lock:
+            sessions = self.armed.get(route)
+            if not sessions:
+                return None
+            session = sessions[0]
+            session.remaining -= 1
+            if session.remaining == 0:
+                sessions.pop(0)
+                if not sessions:
+                    del self.armed[route]
+            return session
+
+    def release(self, session: ProfileSession):
+        """Return a claimed capture slot that went unused; a single-request session is dropped"""
+        with self._lock:
+            if not session.armed:
+                self._sessions.pop(session.id, None)
+                return
+            session.remaining += 1
+            sessions = self.armed.setdefault(session.route, [])
+            if session not in sessions:
+                sessions.insert(0, session)
+
+    def get(self, session_id: int) -> Optional[ProfileSession]:
+        """A session by id"""
+        return self._sessions.get(session_id)
+
+
+profiler = Profiler()
+
+
+class ProfileHeader:
+    """Profiling mode requested by a request's X-Profile header, and the session it produced"""
+
+    __slots__ = ("mode", "session")
+
+    def __init__(self, mode: str):
+        """Record the requested mode"""
+        self.mode = mode
+        self.session: Optional[ProfileSession] = None
+
+
+# Set by ProfilingMiddleware for requests with a valid X-Profile header
+current_profile_header: ContextVar[Optional[ProfileHeader]] = ContextVar("current_profile_header", default=None)
+
+
+def _profiled(call: Callable, route: str) -> Callable:
+    """Wrap a sync endpoint so armed sessions and X-Profile requests run it under a profiler"""
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs):
+        header = current_profile_header.get()
+        # Fast path: nothing armed and no header
+        if header is None and route not in profiler.armed:
+            return call(*args, **kwargs)
+        if header is not None:
+            header.session = profiler.single(route, header.mode)
+            session = header.session
+        else:
+            session = profiler.claim(route)
+            if session is None:
+                return call(*args, **kwargs)
+        try:
+            return session.run(call, *args, **kwargs)
+        except ProfilerUnavailable:
+            # Profiling must never fail the request it observes
+            profiler.release(session)
+            if header is not None:
+                header.session = None
+            return call(*args, **kwargs)
+    return wrapper
+
+
+def install_profiling(app) -> List[str]:
+    """Wrap every sync endpoint of app for profiling; returns the profilable route names"""
+    routes = []
+    for route in app.routes:
+        dependant = getattr(route, "dependant", None)
+        # Async endpoints run on the event loop, where a per-request profiler would see other requests
+        if dependant is None or asyncio.iscoroutinefunction(dependant.call):
+            continue
+        name = f"{','.join(sorted(route.methods))} {route.path}"
+        dependant.call = _profiled(dependant.call, name)
+        routes.append(name)
+    return routes
+
+
+class ProfilingMiddleware:
+    """ASGI middleware honouring X-Profile: <mode> (with X-Admin-Token) and returning X-Profile-Id"""
+
+    def __init__(self, app):
+        """Wrap an ASGI app"""
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        """Profile the request when it carries a valid X-Profile header"""
+        if scope["type"] != "http" or not PROFILING_TOKEN:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        mode = headers.get(b"x-profile", b"").decode("latin-1")
+        token = headers.get(b"x-admin-token", b"").decode("latin-1")
+        if mode not in PROFILE_MODES or not token_matches(token):
+            await self.app(scope, receive, send)
+            return
+
+        header = ProfileHeader(mode)
+        context_token = current_profile_header.set(header)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and header.session is not None:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", str(header.session.id).encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile_header.reset(context_token)
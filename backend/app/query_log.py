@@ -0,0 +1,142 @@
+"""
+Per-statement query timing and slow-query log.
+DatabaseClient connections use TimedCursor, which times every execute, feeds the metrics and the
+per-request totals behind the Server-Timing header, and logs statements slower than SLOW_QUERY_MS.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Optional, Tuple
+import psycopg2
+import psycopg2.extensions
+from .metrics import registry, Counter, Histogram, current_db_method, current_request
+from .tracing import record_span
+
+# Statements at or above this many milliseconds are logged; 0 logs everything, negative disables the log
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+# Fraction of slow read-only statements re-run under EXPLAIN (ANALYZE, BUFFERS) for the log
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_RATE", "0"))
+
+db_statement_duration = registry.register(Histogram(
+    "db_statement_duration_seconds", "SQL statement duration by DatabaseClient method and fingerprint",
+    ("method", "statement")))
+db_slow_queries = registry.register(Counter(
+    "db_slow_queries_total", "Statements slower than SLOW_QUERY_MS", ("method", "statement")))
+
+# Distinct fingerprints used as metric labels; later new statements share the label "other"
+MAX_FINGERPRINTS = int(os.getenv("MAX_STATEMENT_FINGERPRINTS", "500"))
+_labelled_fingerprints = set()
+_labelled_fingerprints_lock = threading.Lock()
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s")
+# Values rendered inline by execute_values: arrays of any length and NULLs (but not IS [NOT] NULL)
+_ARRAY = re.compile(r"\bARRAY\[[^\[\]]*\]", re.IGNORECASE)
+_NULL = re.compile(r"(?<!\bIS )(?<!\bNOT )\bNULL\b", re.IGNORECASE)
+# A parenthesized list of placeholders (optionally cast), then runs of such lists as in VALUES
+_VALUE_LIST = re.compile(r"\((?:\s*\?(?:::[\w\[\]]+)?\s*,?)+\)")
+_VALUE_LISTS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> Tuple[str, str]:
+    """Normalize a statement (literals, placeholders and value lists replaced) and return (id, text)"""
+    text = _STRING_LITERAL.sub("?", statement)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    text = _NULL.sub("?", _ARRAY.sub("?", text))
+    text = _VALUE_LISTS.sub("(...)", _VALUE_LIST.sub("(...)", text))
+    return hashlib.sha1(text.encode()).hexdigest()[:12], text
+
+
+def _fingerprint_label(statement_id: str) -> str:
+    """Metric label for a fingerprint, keeping at most MAX_FINGERPRINTS distinct values"""
+    if statement_id in _labelled_fingerprints:
+        return statement_id
+    with _labelled_fingerprints_lock:
+        if statement_id not in _labelled_fingerprints:
+            if len(_labelled_fingerprints) >= MAX_FINGERPRINTS:
+                return "other"
+            _labelled_fingerprints.add(statement_id)
+    return statement_id
+
+
+def _explain(cursor, query, params) -> Optional[str]:
+    """Run EXPLAIN (ANALYZE, BUFFERS) on the statement inside a savepoint that is always rolled back.
+
+    A SELECT can still write, e.g. SELECT sync_recipe_ingredients(...), so whatever the second run did is
+    undone. Returns None if it fails.
+    """
+    explain_cursor = psycopg2.extensions.cursor(cursor.connection)
+    plan = None
+    try:
+        explain_cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            explain_cursor.execute(b"EXPLAIN (ANALYZE, BUFFERS) " + query, params)
+            plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+        except psycopg2.Error:
+            pass
+        explain_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+        explain_cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    finally:
+        explain_cursor.close()
+
+
+def record_statement(cursor, query, params, seconds: float):
+    """Account one executed statement and log it if it was slow"""
+    statement = query.decode() if isinstance(query, bytes) else query
+    statement_id, text = fingerprint(statement)
+    method = current_db_method.get()
+    label = _fingerprint_label(statement_id)
+    db_statement_duration.labels(method, label).observe(seconds)
+
+    record_span("sql", seconds, statement=text, rows=cursor.rowcount)
+
+    request = current_request.get()
+    if request is not None:
+        request.count += 1
+        request.seconds += seconds
+
+    if SLOW_QUERY_MS < 0 or seconds * 1000 < SLOW_QUERY_MS:
+        return
+    db_slow_queries.labels(method, label).inc()
+    entry = {
+        'duration_ms': round(seconds * 1000, 2),
+        'fingerprint': statement_id,
+        'statement': text,
+        'params': len(params) if params else 0,
+        'rows': cursor.rowcount,
+        'method': method,
+        'route': request.route() if request is not None else None
+    }
+    # EXPLAIN ANALYZE executes the statement again, so only sample reads inside a healthy transaction, where
+    # _explain can roll the second run back; an autocommit connection has no transaction to hold the savepoint
+    if (text.upper().startswith("SELECT") and "FOR UPDATE" not in text.upper()
+            and not cursor.connection.autocommit
+            and cursor.connection.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_INERROR
+            and random.random() < SLOW_QUERY_EXPLAIN_RATE):
+        raw = query if isinstance(query, bytes) else query.encode()
+        entry['plan'] = _explain(cursor, raw, params)
+    print(f"Slow query: {json.dumps(entry)}")
+
+
+class TimedCursor(psycopg2.extensions.cursor):
+    """Cursor that records the duration of every statement it executes"""
+
+    def execute(self, query, vars=None):
+        """Execute and time a statement"""
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            record_statement(self, query, vars, time.perf_counter() - started)
@@ -0,0 +1,61 @@
+"""
+Admin endpoints for on-demand profiling and recent traces
+"""
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from ..models import ProfilingCreate, ProfilingResponse, TraceListResponse, TraceResponse
+from ..profiling import PROFILE_MODES, profiler, token_matches
+from ..tracing import exporter
+from .. import profiling
+
+# Create router for admin endpoints
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Reject requests unless PROFILING_TOKEN is set and X-Admin-Token matches it"""
+    if not profiling.PROFILING_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    if not token_matches(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.post("/profiling", response_model=ProfilingResponse, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(require_admin_token)])
+def create_profiling_session(session: ProfilingCreate, request: Request):
+    """Profile the next N requests to a route, e.g. {"route": "GET /recipes", "mode": "sample"}"""
+    if session.mode not in PROFILE_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown profiling mode: {session.mode}")
+    if session.route not in request.app.state.profilable_routes:
+        raise HTTPException(status_code=400, detail=f"Unknown route: {session.route}")
+    
+    armed = profiler.arm(session.route, session.mode, session.requests)
+    return {"status": "success", "session": armed.summary()}
+
+
+@router.get("/profiling/{session_id}", response_model=ProfilingResponse,
+            dependencies=[Depends(require_admin_token)])
+def get_profiling_session(session_id: int):
+    """Get a session's progress and output; sample mode output is collapsed stacks for flamegraph.pl"""
+    session = profiler.get(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Profiling session not found")
+    
+    return {"status": "success", "session": session.summary()}
+
+
+@router.get("/traces", response_model=TraceListResponse, dependencies=[Depends(require_admin_token)])
+def list_traces(limit: int = Query(20, ge=1, le=200)):
+    """Get the most recent sampled traces from the in-memory buffer"""
+    traces = exporter.traces(limit)
+    return {"status": "success", "count": len(traces), "traces": [{"spans": spans} for spans in traces]}
+
+
+@router.get("/traces/{trace_id}", response_model=TraceResponse, dependencies=[Depends(require_admin_token)])
+def get_trace(trace_id: str):
+    """Get one buffered trace by its id"""
+    spans = exporter.get(trace_id.lower())
+    if spans is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    
+    return {"status": "success", "trace": {"spans": spans}}
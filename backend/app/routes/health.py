@@ -1,13 +1,169 @@
 """
 Health check endpoints
 """
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+import anyio
+import anyio.to_thread
 from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from ..cache import TTLCache
+from ..database_client import DatabaseClient, open_pool, pool_usage
 
 # Create router for health endpoints
 router = APIRouter(prefix="/health", tags=["health"])
 
+# Seconds a database probe result is reused, so frequent load balancer probes cost one query per interval
+READINESS_CACHE_TTL = float(os.getenv("READINESS_CACHE_TTL", "2"))
+
+# Readiness thresholds
+READY_MAX_REPLICA_LAG = float(os.getenv("READY_MAX_REPLICA_LAG", "30"))
+READY_MAX_DB_CONNECTION_UTILIZATION = float(os.getenv("READY_MAX_DB_CONNECTION_UTILIZATION", "0.95"))
+READY_MAX_WORKER_UTILIZATION = float(os.getenv("READY_MAX_WORKER_UTILIZATION", "1.0"))
+
+# Seconds startup waits for the warm-up database probe before serving anyway; 0 skips the warm-up
+STARTUP_WARMUP_TIMEOUT = float(os.getenv("STARTUP_WARMUP_TIMEOUT", "5"))
+
+database_probe_cache = TTLCache(READINESS_CACHE_TTL)
+_probe_lock = threading.Lock()
+
 
 @router.get("")
 def health_check():
     """Health check endpoint to verify the API is running"""
     return {"status": "healthy", "message": "Meal Planner API is running !"}
+
+
+@router.get("/live")
+async def liveness():
+    """Liveness probe; answers from the event loop without touching the database"""
+    return {"status": "alive"}
+
+
+def probe_database() -> Dict[str, Any]:
+    """Measure connect and round-trip time, replica lag and connection usage"""
+    db_client = DatabaseClient()
+    started = time.perf_counter()
+    try:
+        if not db_client.connect():
+            return {'ok': False, 'error': "Failed to connect to database"}
+        connected = time.perf_counter()
+        if not db_client.is_connected():
+            return {'ok': False, 'error': "Database did not answer"}
+        round_trip = time.perf_counter() - connected
+
+        stats = db_client.get_readiness_stats()
+        utilization = stats['connections'] / stats['max_connections'] if stats['max_connections'] else 0.0
+        lag = stats['replica_lag_seconds']
+
+        errors = []
+        if lag is not None and lag > READY_MAX_REPLICA_LAG:
+            errors.append(f"Replica lag {lag:.1f}s exceeds {READY_MAX_REPLICA_LAG:g}s")
+        if utilization >= READY_MAX_DB_CONNECTION_UTILIZATION:
+            errors.append(f"Database connections at {utilization:.0%}")
+
+        result = {
+            'ok': not errors,
+            'connect_ms': round((connected - started) * 1000, 2),
+            'round_trip_ms': round(round_trip * 1000, 2),
+            'replica_lag_seconds': lag,
+            'connections': stats['connections'],
+            'max_connections': stats['max_connections'],
+            'connection_utilization': round(utilization, 3)
+        }
+        if errors:
+            result['error'] = "; ".join(errors)
+        return result
+    except Exception as e:
+        return {'ok': False, 'error': f"Database probe failed: {str(e)}"}
+    finally:
+        db_client.disconnect()
+
+
+def cached_database_probe() -> Tuple[Dict[str, Any], bool]:
+    """Probe result and whether it came from the cache; concurrent misses share one probe"""
+    result = database_probe_cache.get()
+    if result is not None:
+        return result, True
+    with _probe_lock:
+        result = database_probe_cache.get()
+        if result is not None:
+            return result, True
+        result = probe_database()
+        database_probe_cache.set(result)
+        return result, False
+
+
+def worker_usage() -> Dict[str, Any]:
+    """Threads of the sync endpoint pool in use; at capacity new requests queue"""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    in_use, capacity = limiter.borrowed_tokens, limiter.total_tokens
+    utilization = in_use / capacity if capacity else 0.0
+    return {
+        'ok': utilization < READY_MAX_WORKER_UTILIZATION,
+        'in_use': in_use,
+        'capacity': capacity,
+        'utilization': round(utilization, 3)
+    }
+
+
+def connection_pool_usage() -> Dict[str, Any]:
+    """This process's pooled database connections in use, against READY_MAX_DB_CONNECTION_UTILIZATION"""
+    in_use, size = pool_usage()
+    utilization = in_use / size if size else 0.0
+    return {
+        'ok': utilization < READY_MAX_DB_CONNECTION_UTILIZATION,
+        'in_use': in_use,
+        'size': size,
+        'utilization': round(utilization, 3)
+    }
+
+
+def warm_database() -> Dict[str, Any]:
+    """Open the connection pool, then run the readiness probe over one of its connections"""
+    try:
+        print(f"Startup warm-up: {open_pool()} pooled database connections open")
+    except Exception as e:
+        print(f"Startup warm-up: could not open the connection pool: {e}")
+    database, _ = cached_database_probe()
+    return database
+
+
+async def warm_up() -> Optional[Dict[str, Any]]:
+    """Pre-open pooled connections and probe the database once at startup, priming the readiness cache"""
+    if STARTUP_WARMUP_TIMEOUT <= 0:
+        return None
+    with anyio.move_on_after(STARTUP_WARMUP_TIMEOUT):
+        database = await anyio.to_thread.run_sync(warm_database, cancellable=True)
+        if database['ok']:
+            print(f"Startup warm-up: database ready, connected in {database['connect_ms']} ms")
+        else:
+            print(f"Startup warm-up: database not ready: {database['error']}")
+        return database
+    print(f"Startup warm-up: database probe still running after {STARTUP_WARMUP_TIMEOUT:g}s, serving anyway")
+    return None
+
+
+@router.get("/ready")
+async def readiness():
+    """Readiness probe: 200 when the database, connection pool and worker pool can take traffic, 503 otherwise"""
+    # Sample the pools before the probe borrows a thread and a connection from them
+    workers = worker_usage()
+    pool = connection_pool_usage()
+    database = database_probe_cache.get()
+    cached = database is not None
+    if not cached:
+        database, cached = await run_in_threadpool(cached_database_probe)
+    ready = database['ok'] and pool['ok'] and workers['ok']
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "cached": cached,
+            "checks": {"database": database, "connection_pool": pool, "workers": workers}
+        }
+    )
@@ -0,0 +1,74 @@
+"""
+Background job endpoints
+"""
+from fastapi import APIRouter, HTTPException, status
+from pydantic import ValidationError
+from ..database_client import DatabaseClient
+from ..jobs import JOB_KINDS
+from ..models import JobCreate, JobResponse
+
+# Create router for job endpoints
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.post("", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_job(job: JobCreate):
+    """Queue a background job; poll GET /jobs/{id} for its result"""
+    if job.kind not in JOB_KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {job.kind}")
+    
+    # Validate params up front so bad requests fail now rather than in a worker
+    params_model, _ = JOB_KINDS[job.kind]
+    try:
+        params = params_model(**job.params).model_dump(mode="json")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    
+    # Create database client
+    db_client = DatabaseClient()
+    
+    try:
+        # Connect to database
+        if not db_client.connect():
+            raise HTTPException(status_code=500, detail="Failed to connect to database")
+        
+        queued = db_client.enqueue_job(job.kind, params, job.max_attempts)
+        
+        return {"status": "success", "job": queued}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error queueing job: {str(e)}")
+    
+    finally:
+        # Always disconnect
+        db_client.disconnect()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(job_id: int):
+    """Get a job's status, and its result once it has succeeded"""
+    # Create database client
+    db_client = DatabaseClient()
+    
+    try:
+        # Connect to database
+        if not db_client.connect():
+            raise HTTPException(status_code=500, detail="Failed to connect to database")
+        
+        job = db_client.get_job(job_id)
+        
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+        
+        return {"status": "success", "job": job}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving job: {str(e)}")
+    
+    finally:
+        # Always disconnect
+        db_client.disconnect()
@@ -0,0 +1,207 @@
+"""
+Meal plan endpoints
+"""
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from psycopg2 import errors
+from ..database_client import DatabaseClient
+from ..models import (
+    MealPlanRequest, MealPlanResponse, MealPlanCreate, MealPlanUpdate, MealPlanDetailResponse,
+    MealPlanListResponse
+)
+from ..planner import MAX_CANDIDATES_PER_CATEGORY, generate_plan
+
+# Create router for meal plan endpoints
+router = APIRouter(prefix="/meal-plans", tags=["meal-plans"])
+
+
+@router.post("/generate", response_model=MealPlanResponse)
+def generate_meal_plan(request: MealPlanRequest):
+    """Generate a meal plan from the given constraints"""
+    # Create database client
+    db_client = DatabaseClient()
+    
+    try:
+        # Connect to database
+        if not db_client.connect():
+            raise HTTPException(status_code=500, detail="Failed to connect to database")
+        
+        # Pre-filter candidates in SQL, then score and assign them in memory
+        candidates = db_client.get_plan_candidates(
+            categories=list(set(request.categories)),
+            max_prep_time=request.max_prep_time,
+            excluded_ingredients=request.excluded_ingredients,
+            per_category_limit=MAX_CANDIDATES_PER_CATEGORY
+        )
+        
+        plan = generate_plan(
+            candidates,
+            days=request.days,
+            categories=request.categories,
+            no_repeat_days=request.no_repeat_days,
+            target_portions=request.portions,
+            seed=request.seed
+        )
+        
+        return {"status": "success", "days": plan}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating meal plan: {str(e)}")
+    
+    finally:
+        # Always disconnect
+        db_client.disconnect()
+
+
+@router.get("", response_model=MealPlanListResponse)
+def list_meal_plans(limit: int = Query(50, ge=1, le=200), offset: int = Query(0, ge=0)):
+    """List saved meal plans"""
+    # Create database client
+    db_client = DatabaseClient()
+    
+    try:
+        # Connect to database
+        if not db_client.connect():
+            raise HTTPException(status_code=500, detail="Failed to connect to database")
+        
+        plans = db_client.list_meal_plans(limit=limit, offset=offset)
+        
+        return {"status": "success", "count": len(plans), "plans": plans}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving meal plans: {str(e)}")
+    
+    finally:
+        # Always disconnect
+        db_client.disconnect()
+
+
+@router.get("/{plan_id}", response_model=MealPlanDetailResponse)
+def get_meal_plan(plan_id: int, include_shopping_list: bool = False):
+    """Get a saved meal plan with its recipes, optionally with the aggregated shopping list"""
+    # Create database client
+    db_client = DatabaseClient()
+    
+    try:
+        # Connect to database
+        if not db_client.connect():
+            raise HTTPException(status_code=500, detail="Failed to connect to database")
+        
+        plan = db_client.get_meal_plan(plan_id, include_shopping_list=include_shopping_list)
+        
+        if not plan:
+            raise HTTPException(status_code=404, detail=f"Meal plan with ID {plan_id} not found")
+        
+        return {"status": "success", "plan": plan}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving meal plan: {str(e)}")
+    
+    finally:
+        # Always disconnect
+        db_client.disconnect()
+
+
+@router.post("", response_model=MealPlanDetailResponse, status_code=status.HTTP_201_CREATED)
+def create_meal_plan(meal_plan: MealPlanCreate):
+    """Save a new meal plan"""
+    # Create database client
+    db_client = DatabaseClient()
+    
+    try:
+        # Connect to database
+        if not db_client.connect():
+            raise HTTPException(status_code=500, detail="Failed to connect to database")
+        
+        plan = db_client.create_meal_plan(
+            name=meal_plan.name,
+            start_date=meal_plan.start_date,
+            entries=[entry.model_dump() for entry in meal_plan.entries]
+        )
+        
+        return {"status": "success", "plan": plan}
+    
+    except errors.ForeignKeyViolation:
+        raise HTTPException(status_code=400, detail="Meal plan entries reference a recipe that does not exist")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating meal plan: {str(e)}")
+    
+    finally:
+        # Always disconnect
+        db_client.disconnect()
+
+
+@router.patch("/{plan_id}", response_model=MealPlanDetailResponse)
+def update_meal_plan(plan_id: int, meal_plan_update: MealPlanUpdate):
+    """Update a saved meal plan; entries, when given, replace the existing ones"""
+    # Create database client
+    db_client = DatabaseClient()
+    
+    try:
+        # Connect to database
+        if not db_client.connect():
+            raise HTTPException(status_code=500, detail="Failed to connect to database")
+        
+        update_data = meal_plan_update.model_dump(exclude_unset=True)
+        
+        # If no fields to update, return error
+        if not update_data:
+            raise HTTPException(status_code=400, detail="No fields provided for update")
+        
+        plan = db_client.update_meal_plan(plan_id, update_data)
+        
+        if not plan:
+            raise HTTPException(status_code=404, detail=f"Meal plan with ID {plan_id} not found")
+        
+        return {"status": "success", "plan": plan}
+    
+    except errors.ForeignKeyViolation:
+        raise HTTPException(status_code=400, detail="Meal plan entries reference a recipe that does not exist")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating meal plan: {str(e)}")
+    
+    finally:
+        # Always disconnect
+        db_client.disconnect()
+
+
+@router.delete("/{plan_id}")
+def delete_meal_plan(plan_id: int):
+    """Delete a saved meal plan"""
+    # Create database client
+    db_client = DatabaseClient()
+    
+    try:
+        # Connect to database
+        if not db_client.connect():
+            raise HTTPException(status_code=500, detail="Failed to connect to database")
+        
+        if not db_client.delete_meal_plan(plan_id):
+            raise HTTPException(status_code=404, detail=f"Meal plan with ID {plan_id} not found")
+        
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                "status": "success",
+                "message": f"Meal plan with ID {plan_id} deleted successfully"
+            }
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting meal plan: {str(e)}")
+    
+    finally:
+        # Always disconnect
+        db_client.disconnect()
@@ -0,0 +1,15 @@
+"""
+Prometheus metrics endpoint
+"""
+from fastapi import APIRouter
+from fastapi.responses import Response
+from ..metrics import registry, CONTENT_TYPE
+
+# Create router for the metrics endpoint
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("")
+def get_metrics():
+    """Expose all metrics in the Prometheus text format"""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -1,14 +1,63 @@
 """
 Recipe-related endpoints
 """
-from fastapi import APIRouter, HTTPException, status
+import os
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
 from fastapi.responses import JSONResponse
-from ..database_client import DatabaseClient
-from ..models import RecipeCreate, RecipeUpdate, RecipeResponse, NewRecipeResponse
+from ..batching import RECIPE_INSERT_BATCHING, recipe_insert_batcher
+from ..cache import category_stats_cache
+from ..database_client import DatabaseClient, VersionConflictError
+from ..idempotency import IDEMPOTENCY_KEY_TTL, request_fingerprint
+from ..models import (
+    RecipeCreate, RecipeUpdate, RecipeResponse, NewRecipeResponse, CategoryStatsResponse,
+    RecentRecipesResponse, RecipeSearchResponse, ScaleRequest, ScaleResponse, SimilarRecipesResponse,
+    RecipeBulkUpdateRequest, RecipeBulkUpdateResponse
+)
+from ..scaling import scale_recipes
+from ..similarity import NEIGHBORS_PER_RECIPE
 
 # Create router for recipe endpoints
 router = APIRouter(prefix="/recipes", tags=["recipes"])
 
+# When enabled, PATCH and DELETE without an If-Match header are rejected with 428
+REQUIRE_IF_MATCH = os.getenv("REQUIRE_IF_MATCH", "false").lower() == "true"
+
+
+def _etag(version: int) -> str:
+    """Format a recipe version as a strong ETag"""
+    return f'"{version}"'
+
+
+def _replay(stored: dict, fingerprint: str) -> JSONResponse:
+    """Return the response stored for an idempotency key, rejecting keys reused for another request"""
+    if stored["request_hash"] != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    return JSONResponse(
+        status_code=stored["status_code"],
+        content=stored["response_body"],
+        headers={**stored["response_headers"], "Idempotent-Replayed": "true"}
+    )
+
+
+def _parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """Return the version named by an If-Match header, or None when any version is accepted"""
+    if if_match is None:
+        if REQUIRE_IF_MATCH:
+            raise HTTPException(status_code=428, detail="If-Match header is required")
+        return None
+    
+    value = if_match.strip()
+    if value == "*":
+        return None
+    # If-Match uses strong comparison (RFC 9110), so a weak validator never matches
+    if value.startswith("W/"):
+        raise HTTPException(status_code=412, detail="Weak entity tags never match If-Match")
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid If-Match header: {if_match}")
+
 
 @router.get("")
 def get_all_recipes():
@@ -40,8 +89,115 @@ def get_all_recipes():
         db_client.disconnect()
 
 
+@router.get("/search", response_model=RecipeSearchResponse)
+def search_recipes(q: Optional[str] = None, category: Optional[str] = None,
+                   max_prep_time: Optional[int] = Query(None, ge=0),
+                   min_portions: Optional[int] = Query(None, ge=1),
+                   limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0),
+                   facets: bool = True):
+    """Search and filter recipes, returning a result page with facet counts"""
+    # Create database client
+    db_client = DatabaseClient()
+    
+    try:
+        # Connect to database
+        if not db_client.connect():
+            raise HTTPException(status_code=500, detail="Failed to connect to database")
+        
+        # Run the search; facets can be skipped by clients that don't render them
+        result = db_client.search_recipes(
+            query=q,
+            category=category,
+            max_prep_time=max_prep_time,
+            min_portions=min_portions,
+            limit=limit,
+            offset=offset,
+            include_facets=facets
+        )
+        
+        return {
+            "status": "success",
+            "count": len(result["recipes"]),
+            "total": result["total"],
+            "recipes": result["recipes"],
+            "facets": result["facets"]
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching recipes: {str(e)}")
+    
+    finally:
+        # Always disconnect
+        db_client.disconnect()
+
+
+@router.get("/recent", response_model=RecentRecipesResponse)
+def get_recent_recipes(limit: int = Query(10, ge=1, le=50)):
+    """Get the most recently updated recipes"""
+    # Create database client
+    db_client = DatabaseClient()
+    
+    try:
+        # Connect to database
+        if not db_client.connect():
+            raise HTTPException(status_code=500, detail="Failed to connect to database")
+        
+        # Get the latest recipe cards
+        recipes = db_client.get_recent_recipes(limit)
+        
+        return {
+            "status": "success",
+            "count": len(recipes),
+            "recipes": recipes
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving recent recipes: {str(e)}")
+    
+    finally:
+        # Always disconnect
+        db_client.disconnect()
+
+
+@router.get("/stats/categories", response_model=CategoryStatsResponse)
+def get_category_stats():
+    """Get recipe count and average prep time per category"""
+    # Serve from the cache when possible, without touching the database
+    stats = category_stats_cache.get()
+    if stats is not None:
+        return {"status": "success", "categories": stats}
+    
+    # Create database client
+    db_client = DatabaseClient()
+    
+    try:
+        # Connect to database
+        if not db_client.connect():
+            raise HTTPException(status_code=500, detail="Failed to connect to database")
+        
+        # Aggregate counts per category and cache the result, unless a write committed meanwhile
+        generation = category_stats_cache.generation
+        stats = db_client.get_category_stats()
+        category_stats_cache.set(stats, generation)
+        
+        return {"status": "success", "categories": stats}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving category stats: {str(e)}")
+    
+    finally:
+        # Always disconnect
+        db_client.disconnect()
+
+
 @router.get("/{recipe_id}", response_model=RecipeResponse)
-def get_recipe_by_id(recipe_id: int):
+def get_recipe_by_id(recipe_id: int, response: Response):
     """Get a specific recipe by ID"""
     # Create database client
     db_client = DatabaseClient()
@@ -57,6 +213,7 @@ def get_recipe_by_id(recipe_id: int):
         if not recipe:
             raise HTTPException(status_code=404, detail=f"Recipe with ID {recipe_id} not found")
         
+        response.headers["ETag"] = _etag(recipe["version"])
         return recipe
     
     except HTTPException:
@@ -69,9 +226,46 @@ def get_recipe_by_id(recipe_id: int):
         db_client.disconnect()
 
 
+@router.get("/{recipe_id}/similar", response_model=SimilarRecipesResponse)
+def get_similar_recipes(recipe_id: int, k: int = Query(10, ge=1, le=NEIGHBORS_PER_RECIPE)):
+    """Get the recipes most similar to a recipe by ingredients and category"""
+    # Create database client
+    db_client = DatabaseClient()
+    
+    try:
+        # Connect to database
+        if not db_client.connect():
+            raise HTTPException(status_code=500, detail="Failed to connect to database")
+        
+        # Look up the precomputed neighbours
+        recipes = db_client.get_similar_recipes(recipe_id, k)
+        
+        if recipes is None:
+            raise HTTPException(status_code=404, detail=f"Recipe with ID {recipe_id} not found")
+        
+        return {
+            "status": "success",
+            "count": len(recipes),
+            "recipes": recipes
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving similar recipes: {str(e)}")
+    
+    finally:
+        # Always disconnect
+        db_client.disconnect()
+
+
 @router.post("", response_model=NewRecipeResponse)
-def create_recipe(recipe: RecipeCreate):
-    """Create a new recipe in the database"""
+def create_recipe(recipe: RecipeCreate, idempotency_key: Optional[str] = Header(None)):
+    """Create a new recipe in the database; retries with the same Idempotency-Key replay the first response"""
+    # Keyed requests need their own transaction, so only plain creates are batched
+    if RECIPE_INSERT_BATCHING and not idempotency_key:
+        return _create_recipe_batched(recipe)
+    
     # Create database client
     db_client = DatabaseClient()
     
@@ -80,6 +274,12 @@ def create_recipe(recipe: RecipeCreate):
         if not db_client.connect():
             raise HTTPException(status_code=500, detail="Failed to connect to database")
         
+        if idempotency_key:
+            fingerprint = request_fingerprint("POST /recipes", recipe.model_dump())
+            stored = db_client.claim_idempotency_key(idempotency_key, fingerprint, IDEMPOTENCY_KEY_TTL)
+            if stored:
+                return _replay(stored, fingerprint)
+        
         # Create the recipe
         # Convert Pydantic Ingredient objects to dictionaries
         main_ingredients_dicts = [ingredient.model_dump() for ingredient in recipe.main_ingredients]
@@ -91,22 +291,130 @@ def create_recipe(recipe: RecipeCreate):
             common_ingredients=recipe.common_ingredients,
             instructions=recipe.instructions,
             prep_time=recipe.prep_time,
-            portions=recipe.portions
+            portions=recipe.portions,
+            commit=not idempotency_key
         )
         
+        content = {
+            "id": new_recipe["id"],
+            "status": "success",
+            "message": "Recipe created successfully"
+        }
+        headers = {"ETag": _etag(new_recipe["version"])}
+        
+        # Store the response in the same transaction as the new recipe
+        if idempotency_key:
+            db_client.complete_idempotency_key(idempotency_key, status.HTTP_201_CREATED, content, headers)
+        
+        return JSONResponse(status_code=status.HTTP_201_CREATED, content=content, headers=headers)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating recipe: {str(e)}")
+    
+    finally:
+        # Always disconnect
+        db_client.disconnect()
+
+
+def _create_recipe_batched(recipe: RecipeCreate) -> JSONResponse:
+    """Create a recipe through the group-commit batcher; returns once its batch is committed"""
+    try:
+        new_recipe = recipe_insert_batcher.submit(recipe.model_dump())
+        
         return JSONResponse(
             status_code=status.HTTP_201_CREATED,
             content={
                 "id": new_recipe["id"],
                 "status": "success",
                 "message": "Recipe created successfully"
-            }
+            },
+            headers={"ETag": _etag(new_recipe["version"])}
+        )
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating recipe: {str(e)}")
+
+
+@router.post("/scale", response_model=ScaleResponse)
+def scale_recipe_portions(request: ScaleRequest):
+    """Scale the main ingredients of many recipes to target portions"""
+    # Create database client
+    db_client = DatabaseClient()
+    
+    try:
+        # Connect to database
+        if not db_client.connect():
+            raise HTTPException(status_code=500, detail="Failed to connect to database")
+        
+        # Fetch every referenced recipe in one query
+        recipes = db_client.get_recipe_ingredients({item.recipe_id for item in request.items})
+        recipes_by_id = {recipe['id']: recipe for recipe in recipes}
+        
+        # Keep request order, including repeated recipes with different targets
+        found = [item for item in request.items if item.recipe_id in recipes_by_id]
+        missing = sorted({item.recipe_id for item in request.items if item.recipe_id not in recipes_by_id})
+        
+        scaled = scale_recipes(
+            [recipes_by_id[item.recipe_id] for item in found],
+            [item.target_portions for item in found]
         )
+        
+        return {"status": "success", "recipes": scaled, "missing_recipe_ids": missing}
     
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error creating recipe: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error scaling recipes: {str(e)}")
+    
+    finally:
+        # Always disconnect
+        db_client.disconnect()
+
+
+@router.patch("/bulk", response_model=RecipeBulkUpdateResponse)
+def bulk_update_recipes(request: RecipeBulkUpdateRequest, idempotency_key: Optional[str] = Header(None)):
+    """Apply partial updates to many recipes in one transaction"""
+    items = [item.model_dump(exclude_unset=True) for item in request.items]
+    
+    ids = [item['id'] for item in items]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Each recipe ID may appear only once")
+    if any(set(item) <= {'id', 'version'} for item in items):
+        raise HTTPException(status_code=400, detail="No fields provided for update")
+    
+    # Create database client
+    db_client = DatabaseClient()
+    
+    try:
+        # Connect to database
+        if not db_client.connect():
+            raise HTTPException(status_code=500, detail="Failed to connect to database")
+        
+        if idempotency_key:
+            fingerprint = request_fingerprint("PATCH /recipes/bulk", items)
+            stored = db_client.claim_idempotency_key(idempotency_key, fingerprint, IDEMPOTENCY_KEY_TTL)
+            if stored:
+                return _replay(stored, fingerprint)
+        
+        results = db_client.bulk_update_recipes(items, commit=not idempotency_key)
+        content = {
+            "status": "success",
+            "updated": sum(result["status"] == "updated" for result in results),
+            "results": results
+        }
+        
+        # Store the response in the same transaction as the updates
+        if idempotency_key:
+            db_client.complete_idempotency_key(idempotency_key, status.HTTP_200_OK, content)
+        
+        return content
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating recipes: {str(e)}")
     
     finally:
         # Always disconnect
@@ -114,8 +422,9 @@ def create_recipe(recipe: RecipeCreate):
 
 
 @router.patch("/{recipe_id}", response_model=RecipeResponse)
-def update_recipe(recipe_id: int, recipe_update: RecipeUpdate):
-    """Update a recipe by ID with partial data"""
+def update_recipe(recipe_id: int, recipe_update: RecipeUpdate, response: Response,
+                  if_match: Optional[str] = Header(None)):
+    """Update a recipe by ID with partial data; If-Match makes the update conditional on the version"""
     # Create database client
     db_client = DatabaseClient()
     
@@ -136,13 +445,16 @@ def update_recipe(recipe_id: int, recipe_update: RecipeUpdate):
         # so main_ingredients is already a list of dicts at this point
         
         # Update the recipe
-        updated_recipe = db_client.update_recipe(recipe_id, update_data)
+        updated_recipe = db_client.update_recipe(recipe_id, update_data, expected_version=_parse_if_match(if_match))
         
         if not updated_recipe:
             raise HTTPException(status_code=404, detail=f"Recipe with ID {recipe_id} not found")
         
+        response.headers["ETag"] = _etag(updated_recipe["version"])
         return updated_recipe
     
+    except VersionConflictError:
+        raise HTTPException(status_code=412, detail=f"Recipe with ID {recipe_id} has been modified")
     except HTTPException:
         raise
     except Exception as e:
@@ -154,8 +466,8 @@ def update_recipe(recipe_id: int, recipe_update: RecipeUpdate):
 
 
 @router.delete("/{recipe_id}")
-def delete_recipe(recipe_id: int):
-    """Delete a recipe by ID"""
+def delete_recipe(recipe_id: int, if_match: Optional[str] = Header(None)):
+    """Delete a recipe by ID; If-Match makes the delete conditional on the version"""
     # Create database client
     db_client = DatabaseClient()
     
@@ -165,7 +477,7 @@ def delete_recipe(recipe_id: int):
             raise HTTPException(status_code=500, detail="Failed to connect to database")
         
         # Attempt to delete the recipe
-        success = db_client.delete_recipe(recipe_id)
+        success = db_client.delete_recipe(recipe_id, expected_version=_parse_if_match(if_match))
         
         if not success:
             raise HTTPException(status_code=404, detail=f"Recipe with ID {recipe_id} not found")
@@ -178,6 +490,8 @@ def delete_recipe(recipe_id: int):
             }
         )
     
+    except VersionConflictError:
+        raise HTTPException(status_code=412, detail=f"Recipe with ID {recipe_id} has been modified")
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,35 @@
+"""
+Shopping list endpoints
+"""
+from fastapi import APIRouter, HTTPException
+from ..database_client import DatabaseClient
+from ..models import ShoppingListRequest, ShoppingListResponse
+
+# Create router for shopping list endpoints
+router = APIRouter(prefix="/shopping-list", tags=["shopping-list"])
+
+
+@router.post("", response_model=ShoppingListResponse)
+def create_shopping_list(request: ShoppingListRequest):
+    """Build a merged shopping list for a set of recipes and portions"""
+    # Create database client
+    db_client = DatabaseClient()
+    
+    try:
+        # Connect to database
+        if not db_client.connect():
+            raise HTTPException(status_code=500, detail="Failed to connect to database")
+        
+        # Aggregate all recipes in a single query
+        shopping_list = db_client.get_shopping_list([item.model_dump() for item in request.items])
+        
+        return {"status": "success", **shopping_list}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building shopping list: {str(e)}")
+    
+    finally:
+        # Always disconnect
+        db_client.disconnect()
@@ -0,0 +1,42 @@
+"""
+Portion scaling for recipe ingredients.
+Scales the ingredients of many recipes in one vectorized pass over a flattened quantity array.
+"""
+import numpy as np
+from typing import List, Dict, Any
+from .units import round_quantities
+
+
+def scale_recipes(recipes: List[Dict[str, Any]], target_portions: List[int]) -> List[Dict[str, Any]]:
+    """Scale each recipe's main_ingredients from its stored portions to the matching target portions"""
+    if not recipes:
+        return []
+
+    # Recipes without stored portions are left unscaled
+    stored = np.array([recipe['portions'] or target for recipe, target in zip(recipes, target_portions)], dtype=float)
+    factors = np.asarray(target_portions, dtype=float) / stored
+
+    # Flatten every ingredient of every recipe into one array
+    counts = [len(recipe['main_ingredients'] or []) for recipe in recipes]
+    ingredients = [ingredient for recipe in recipes for ingredient in recipe['main_ingredients'] or []]
+    quantities = np.array([ingredient['quantity'] for ingredient in ingredients], dtype=float)
+    units = [ingredient['unit'] for ingredient in ingredients]
+
+    scaled = round_quantities(quantities * np.repeat(factors, counts), units)
+
+    results = []
+    offset = 0
+    for recipe, target, count in zip(recipes, target_portions, counts):
+        results.append({
+            'recipe_id': recipe['id'],
+            'name': recipe['name'],
+            'portions': recipe['portions'],
+            'target_portions': target,
+            'main_ingredients': [
+                {'quantity': float(quantity), 'unit': ingredient['unit'], 'name': ingredient['name']}
+                for ingredient, quantity in zip(ingredients[offset:offset + count], scaled[offset:offset + count])
+            ]
+        })
+        offset += count
+
+    return results
@@ -0,0 +1,154 @@
+"""
+Recipe similarity index.
+Builds a sparse TF-IDF recipe x ingredient matrix and precomputes top-k neighbours into recipe_neighbors.
+
+Run as a batch job:
+    python -m app.similarity            # refresh recipes touched by writes
+    python -m app.similarity --full     # rebuild every recipe's neighbours
+"""
+import argparse
+import numpy as np
+from typing import TYPE_CHECKING, List, Dict, Any, Tuple, Iterable
+from .database_client import DatabaseClient
+
+# scipy is only needed by the batch job; importing it here would add to API startup via NEIGHBORS_PER_RECIPE
+if TYPE_CHECKING:
+    from scipy import sparse
+
+# Neighbours stored per recipe; GET /recipes/{id}/similar can return at most this many
+NEIGHBORS_PER_RECIPE = 20
+
+# Feature weights relative to a main ingredient
+COMMON_INGREDIENT_WEIGHT = 0.5
+CATEGORY_WEIGHT = 1.0
+
+# Rows scored per dense block; bounds memory at CHUNK_SIZE x recipes float32 values
+CHUNK_SIZE = 128
+
+
+def recipe_tokens(recipe: Dict[str, Any]) -> Dict[str, float]:
+    """Map a recipe to its weighted feature tokens"""
+    tokens = {}
+    for name in recipe['common_ingredients'] or []:
+        tokens[f"ingredient:{name.strip().lower()}"] = COMMON_INGREDIENT_WEIGHT
+    for ingredient in recipe['main_ingredients'] or []:
+        tokens[f"ingredient:{ingredient['name'].strip().lower()}"] = 1.0
+    if recipe['category']:
+        tokens[f"category:{recipe['category']}"] = CATEGORY_WEIGHT
+    return tokens
+
+
+def build_feature_matrix(recipes: List[Dict[str, Any]]) -> "sparse.csr_matrix":
+    """Build an L2-normalized TF-IDF matrix with one row per recipe"""
+    from scipy import sparse
+
+    vocabulary = {}
+    rows, columns, weights = [], [], []
+    for row, recipe in enumerate(recipes):
+        for token, weight in recipe_tokens(recipe).items():
+            rows.append(row)
+            columns.append(vocabulary.setdefault(token, len(vocabulary)))
+            weights.append(weight)
+
+    matrix = sparse.csr_matrix(
+        (np.array(weights, dtype=np.float32), (rows, columns)),
+        shape=(len(recipes), len(vocabulary))
+    )
+
+    # Smoothed inverse document frequency down-weights ubiquitous ingredients like salt
+    document_frequency = np.bincount(columns, minlength=len(vocabulary))
+    idf = np.log((1 + len(recipes)) / (1 + document_frequency)) + 1
+    matrix = matrix @ sparse.diags(idf.astype(np.float32))
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix)
+
+
+def top_k_neighbors(matrix: "sparse.csr_matrix", ids: List[int], rows: Iterable[int],
+                    k: int = NEIGHBORS_PER_RECIPE) -> List[Tuple[int, int, int, float]]:
+    """Compute (recipe_id, neighbor_id, rank, score) for the given rows by cosine similarity"""
+    rows = np.asarray(list(rows), dtype=int)
+    ids = np.asarray(ids)
+    neighbors = []
+    for start in range(0, len(rows), CHUNK_SIZE):
+        chunk = rows[start:start + CHUNK_SIZE]
+        scores = (matrix[chunk] @ matrix.T).toarray()
+        scores[np.arange(len(chunk)), chunk] = -np.inf
+
+        count = min(k, scores.shape[1] - 1)
+        if count <= 0:
+            continue
+        best = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+        for position, row in enumerate(chunk):
+            ordered = best[position][np.argsort(-scores[position, best[position]])]
+            rank = 0
+            for column in ordered:
+                if scores[position, column] <= 0:
+                    break
+                rank += 1
+                neighbors.append((int(ids[row]), int(ids[column]), rank, float(scores[position, column])))
+    return neighbors
+
+
+def affected_rows(matrix: "sparse.csr_matrix", ids: List[int], dirty_ids: Iterable[int],
+                  thresholds: Dict[int, float], referrer_ids: Iterable[int] = ()) -> List[int]:
+    """Rows whose neighbours must be recomputed after the dirty recipes changed"""
+    index = {recipe_id: row for row, recipe_id in enumerate(ids)}
+    dirty_rows = [index[recipe_id] for recipe_id in dirty_ids if recipe_id in index]
+    affected = set(dirty_rows)
+
+    # Recipes already listing a dirty recipe hold a score that may have dropped, or a recipe that is gone
+    affected.update(index[recipe_id] for recipe_id in referrer_ids if recipe_id in index)
+
+    # A clean recipe is affected when a dirty one now beats its weakest stored neighbour
+    cutoff = np.array([thresholds.get(recipe_id, 0.0) for recipe_id in ids], dtype=np.float32)
+    for start in range(0, len(dirty_rows), CHUNK_SIZE):
+        chunk = dirty_rows[start:start + CHUNK_SIZE]
+        scores = (matrix[chunk] @ matrix.T).toarray()
+        affected.update(np.flatnonzero((scores > cutoff).any(axis=0)).tolist())
+    return sorted(affected)
+
+
+def refresh_neighbors(db_client, full: bool = False) -> int:
+    """Recompute stored neighbours, either for every recipe or only those touched by writes"""
+    # Read the markers first so writes during the refresh stay marked for the next run
+    dirty = db_client.get_dirty_similarity_markers()
+    if not dirty and not full:
+        return 0
+
+    recipes = db_client.get_similarity_features()
+    ids = [recipe['id'] for recipe in recipes]
+    matrix = build_feature_matrix(recipes)
+
+    if full:
+        rows = list(range(len(ids)))
+    else:
+        dirty_ids = [recipe_id for recipe_id, _ in dirty]
+        thresholds = db_client.get_neighbor_thresholds(NEIGHBORS_PER_RECIPE)
+        referrers = db_client.get_neighbor_referrers(dirty_ids)
+        rows = affected_rows(matrix, ids, dirty_ids, thresholds, referrers)
+
+    recipe_ids = [ids[row] for row in rows]
+    db_client.replace_neighbors(recipe_ids, top_k_neighbors(matrix, ids, rows), dirty)
+    return len(recipe_ids)
+
+
+def main():
+    """Command line entry point for the neighbour batch job"""
+    parser = argparse.ArgumentParser(description="Refresh the recipe similarity index")
+    parser.add_argument("--full", action="store_true", help="rebuild neighbours for every recipe")
+    args = parser.parse_args()
+
+    db_client = DatabaseClient()
+    if not db_client.connect():
+        raise SystemExit("Failed to connect to database")
+    try:
+        refreshed = refresh_neighbors(db_client, full=args.full)
+        print(f"Refreshed neighbours for {refreshed} recipes")
+    finally:
+        db_client.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Request tracing with W3C traceparent propagation.
+A sampled request gets a root span, child spans for request validation, the endpoint, each DatabaseClient
+method, connection setup, every SQL statement and response serialization. Finished traces go to an in-memory
+ring buffer (GET /admin/traces) and optionally to a JSON-lines file, written by a background thread.
+Unsampled requests create no spans.
+"""
+import asyncio
+import functools
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+# Fraction of requests without a sampled traceparent that are traced
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+
+# Requests per second whose inbound sampled flag is honoured; the rest are sampled at TRACE_SAMPLE_RATE.
+# Any caller can set the flag, so this bounds the tracing cost it can force. 0 ignores the flag
+TRACE_MAX_FORCED_PER_SECOND = int(os.getenv("TRACE_MAX_FORCED_PER_SECOND", "10"))
+
+# Finished traces kept in memory for /admin/traces
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "200"))
+
+# Also append finished spans as JSON lines to this file when set
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "")
+
+# Finished traces waiting for the file writer; more are dropped rather than queued without bound
+TRACE_EXPORT_QUEUE_SIZE = int(os.getenv("TRACE_EXPORT_QUEUE_SIZE", "10000"))
+
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Trace:
+    """Spans recorded for one request"""
+
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id: str):
+        """Initialize an empty trace"""
+        self.trace_id = trace_id
+        self.spans: List["Span"] = []
+
+
+class Span:
+    """Timed operation within a trace; times are epoch seconds"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start", "end", "attributes")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str] = None,
+                 start: Optional[float] = None, **attributes):
+        """Start a span and add it to its trace"""
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time() if start is None else start
+        self.end: Optional[float] = None
+        self.attributes = attributes
+        trace.spans.append(self)
+
+    def child(self, name: str, start: Optional[float] = None, **attributes) -> "Span":
+        """Start a child span"""
+        return Span(self.trace, name, self.span_id, start, **attributes)
+
+    def finish(self, end: Optional[float] = None):
+        """End the span"""
+        self.end = time.time() if end is None else end
+
+    def traceparent(self) -> str:
+        """W3C traceparent header value naming this span as the parent"""
+        return f"00-{self.trace.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Exported representation"""
+        end = self.end if self.end is not None else time.time()
+        return {
+            'trace_id': self.trace.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start,
+            'duration_ms': round((end - self.start) * 1000, 3),
+            'attributes': self.attributes
+        }
+
+
+# Innermost open span of the current request; None when the request is not sampled
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def enter_span(name: str, **attributes) -> Optional[Tuple[Span, Any]]:
+    """Open a child of the current span and make it current; None when not tracing"""
+    parent = current_span.get()
+    if parent is None:
+        return None
+    span = parent.child(name, **attributes)
+    return span, current_span.set(span)
+
+
+def exit_span(handle: Optional[Tuple[Span, Any]]):
+    """Finish a span opened by enter_span and restore its parent"""
+    if handle is not None:
+        span, token = handle
+        span.finish()
+        current_span.reset(token)
+
+
+def record_span(name: str, seconds: float, **attributes):
+    """Record an already finished child span of the given duration, ending now"""
+    parent = current_span.get()
+    if parent is not None:
+        end = time.time()
+        parent.child(name, start=end - seconds, **attributes).finish(end)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace id, parent span id, sampled) from a traceparent header, or None if it is invalid"""
+    match = _TRACEPARENT.match(header.strip().lower()) if header else None
+    if not match or match.group(1) == "ff" or set(match.group(2)) == {"0"} or set(match.group(3)) == {"0"}:
+        return None
+    return match.group(2), match.group(3), bool(int(match.group(4), 16) & 1)
+
+
+class ForcedSampleLimit:
+    """Counts samples forced by inbound traceparent flags within the current second"""
+
+    def __init__(self):
+        """Initialize an empty window"""
+        self._second = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether one more forced sample fits in this second's TRACE_MAX_FORCED_PER_SECOND"""
+        second = int(time.monotonic())
+        with self._lock:
+            if second != self._second:
+                self._second, self._count = second, 0
+            if self._count >= TRACE_MAX_FORCED_PER_SECOND:
+                return False
+            self._count += 1
+            return True
+
+
+forced_samples = ForcedSampleLimit()
+
+
+def should_sample(parent: Optional[Tuple[str, str, bool]]) -> bool:
+    """Follow the caller's sampling decision within the forced-sample limit, otherwise sample at TRACE_SAMPLE_RATE"""
+    if parent is not None and not parent[2]:
+        return False
+    if parent is not None and forced_samples.allow():
+        return True
+    return random.random() < TRACE_SAMPLE_RATE
+
+
+class SpanExporter:
+    """Ring buffer of finished traces, optionally mirrored to a JSON-lines file by a writer thread"""
+
+    def __init__(self, buffer_size: int, path: str = "", queue_size: int = TRACE_EXPORT_QUEUE_SIZE):
+        """Initialize an empty buffer; the writer thread starts on the first export"""
+        self.path = path
+        self.dropped = 0
+        self._traces: Deque[List[Dict[str, Any]]] = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+
+    def export(self, trace: Trace):
+        """Store a finished trace and queue it for the file; never blocks on I/O"""
+        spans = [span.to_dict() for span in trace.spans]
+        with self._lock:
+            self._traces.append(spans)
+            if self.path and self._thread is None:
+                self._thread = threading.Thread(target=self._write, name="span-exporter", daemon=True)
+                self._thread.start()
+        if self.path:
+            try:
+                self._queue.put_nowait(spans)
+            except queue.Full:
+                self.dropped += 1
+
+    def close(self):
+        """Write the queued traces and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread:
+            self._queue.put(None)
+            thread.join()
+
+    def _write(self):
+        """Append queued traces to the file until close() enqueues the stop marker"""
+        with open(self.path, "a") as export_file:
+            while True:
+                spans = self._queue.get()
+                if spans is None:
+                    return
+                export_file.writelines(json.dumps(span) + "\n" for span in spans)
+                # A burst is written with one flush once the queue is drained
+                if self._queue.empty():
+                    export_file.flush()
+
+    def traces(self, limit: int = 20) -> List[List[Dict[str, Any]]]:
+        """Most recent traces first"""
+        with self._lock:
+            return list(self._traces)[::-1][:limit]
+
+    def get(self, trace_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Spans of one buffered trace"""
+        with self._lock:
+            for spans in reversed(self._traces):
+                if spans and spans[0]['trace_id'] == trace_id:
+                    return spans
+        return None
+
+
+exporter = SpanExporter(TRACE_BUFFER_SIZE, TRACE_EXPORT_FILE)
+
+
+def _traced(call: Callable, route: str) -> Callable:
+    """Wrap an endpoint in an "endpoint" span and name the request's root span after its route"""
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def async_wrapper(*args, **kwargs):
+            handle = _enter_endpoint(route)
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                exit_span(handle)
+        return async_wrapper
+
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs):
+        handle = _enter_endpoint(route)
+        try:
+            return call(*args, **kwargs)
+        finally:
+            exit_span(handle)
+    return wrapper
+
+
+def _enter_endpoint(route: str) -> Optional[Tuple[Span, Any]]:
+    """Name the root span after the route and open the endpoint span"""
+    root = current_span.get()
+    if root is None:
+        return None
+    root.name = route
+    root.attributes['http.route'] = route.split(" ", 1)[1]
+    return enter_span("endpoint")
+
+
+def install_tracing(app):
+    """Wrap every endpoint of app in an endpoint span"""
+    for route in app.routes:
+        dependant = getattr(route, "dependant", None)
+        if dependant is not None:
+            dependant.call = _traced(dependant.call, f"{','.join(sorted(route.methods))} {route.path}")
+
+
+class TracingMiddleware:
+    """ASGI middleware that samples requests, propagates traceparent and exports finished traces"""
+
+    def __init__(self, app):
+        """Wrap an ASGI app"""
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        """Trace the request when it is sampled"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                header = value.decode("latin-1")
+                break
+        parent = parse_traceparent(header)
+        if not should_sample(parent):
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(parent[0] if parent else f"{random.getrandbits(128):032x}")
+        root = Span(trace, f"{scope['method']} unmatched", parent[1] if parent else None,
+                    **{'http.method': scope['method'], 'http.target': scope['path']})
+        token = current_span.set(root)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.attributes['http.status_code'] = message["status"]
+                _add_phase_spans(root)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"traceparent", root.traceparent().encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_span.reset(token)
+            root.finish()
+            exporter.export(trace)
+
+
+def _add_phase_spans(root: Span):
+    """Add request validation (before the endpoint) and response serialization (after it) spans"""
+    endpoint = next((span for span in root.trace.spans if span.name == "endpoint"), None)
+    if endpoint is None or endpoint.end is None:
+        return
+    root.child("request.validation", start=root.start).finish(endpoint.start)
+    root.child("response.serialization", start=endpoint.end).finish()
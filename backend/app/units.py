@@ -0,0 +1,98 @@
+"""
+Unit registry for ingredient quantities.
+Maps unit spellings to a dimension and a precomputed factor to that dimension's canonical base unit.
+"""
+import numpy as np
+from typing import Optional, List, Dict, Any, Sequence, Tuple
+
+# Canonical base unit per dimension
+BASE_UNITS = {'mass': 'g', 'volume': 'ml', 'count': 'pcs'}
+
+# Keys normalize_ingredients adds to each stored main ingredient
+CANONICAL_KEYS = ('canonical_quantity', 'canonical_unit')
+
+# unit spelling -> (dimension, factor to base unit)
+UNIT_REGISTRY = {
+    # mass
+    'mg': ('mass', 0.001),
+    'g': ('mass', 1.0),
+    'gram': ('mass', 1.0),
+    'grams': ('mass', 1.0),
+    'kg': ('mass', 1000.0),
+    'oz': ('mass', 28.349523125),
+    'lb': ('mass', 453.59237),
+    'lbs': ('mass', 453.59237),
+    # volume
+    'ml': ('volume', 1.0),
+    'cl': ('volume', 10.0),
+    'dl': ('volume', 100.0),
+    'l': ('volume', 1000.0),
+    'tsp': ('volume', 5.0),
+    'tbsp': ('volume', 15.0),
+    'cup': ('volume', 240.0),
+    'cups': ('volume', 240.0),
+    # count
+    'pcs': ('count', 1.0),
+    'pc': ('count', 1.0),
+    'piece': ('count', 1.0),
+    'pieces': ('count', 1.0),
+    'x': ('count', 1.0),
+    'dozen': ('count', 12.0),
+}
+
+
+def canonical_unit(unit: str) -> Tuple[str, float]:
+    """Return the canonical unit and conversion factor for a unit; unknown units map to themselves"""
+    key = unit.strip().lower()
+    if key in UNIT_REGISTRY:
+        dimension, factor = UNIT_REGISTRY[key]
+        return BASE_UNITS[dimension], factor
+    return key, 1.0
+
+
+def normalize(quantity: float, unit: str) -> Tuple[float, str]:
+    """Convert a single quantity to its canonical base unit"""
+    base_unit, factor = canonical_unit(unit)
+    return quantity * factor, base_unit
+
+
+def convert_batch(quantities: Sequence[float], units: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+    """Convert many quantities to canonical base units in one vectorized multiply"""
+    # Look up each distinct unit once, then broadcast the factors
+    lookup = {unit: canonical_unit(unit) for unit in set(units)}
+    factors = np.array([lookup[unit][1] for unit in units], dtype=float)
+    base_units = [lookup[unit][0] for unit in units]
+    return np.asarray(quantities, dtype=float) * factors, base_units
+
+
+def normalize_ingredients(ingredients: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+    """Return ingredients with canonical_quantity / canonical_unit added alongside the original values; None stays None"""
+    if ingredients is None:
+        return None
+    if not ingredients:
+        return []
+    quantities, base_units = convert_batch(
+        [ingredient['quantity'] for ingredient in ingredients],
+        [ingredient['unit'] for ingredient in ingredients]
+    )
+    return [
+        {**ingredient, 'canonical_quantity': float(quantity), 'canonical_unit': base_unit}
+        for ingredient, quantity, base_unit in zip(ingredients, quantities, base_units)
+    ]
+
+
+def strip_canonical(ingredients: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+    """Return stored ingredients without canonical_quantity / canonical_unit, as clients sent them"""
+    if ingredients is None:
+        return None
+    return [
+        {key: value for key, value in ingredient.items() if key not in CANONICAL_KEYS}
+        for ingredient in ingredients
+    ]
+
+
+def round_quantities(quantities: np.ndarray, units: Sequence[str]) -> np.ndarray:
+    """Round quantities per unit: countable units up to whole numbers, the rest to two decimals"""
+    is_count = np.array([canonical_unit(unit)[0] == BASE_UNITS['count'] for unit in units], dtype=bool)
+    # Tolerance keeps float noise like 2.0000000001 pcs from rounding up to 3
+    return np.where(is_count, np.ceil(quantities - 1e-9), np.round(quantities, 2))
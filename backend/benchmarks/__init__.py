@@ -0,0 +1,3 @@
+"""
+Scale benchmarks for DatabaseClient and the recipe endpoints, run against a local Postgres.
+"""
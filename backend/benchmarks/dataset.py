@@ -0,0 +1,211 @@
+"""
+Deterministic synthetic recipe generator for load and scale testing.
+
+Recipes have a skewed category mix, Zipf-distributed ingredient popularity and variable-length
+instructions; main_ingredients match the Ingredient model. Rows are produced in fixed-size chunks
+from one seeded generator, so the output depends only on --seed and --count, and memory stays flat.
+
+Usage (from backend/):
+    python -m benchmarks.dataset --count 1000000 --seed 42                 # COPY into Postgres
+    python -m benchmarks.dataset --count 1000000 --output recipes.ndjson   # write NDJSON
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from typing import Iterator, List, Dict, Any, Optional
+import numpy as np
+from app.database_client import DatabaseClient
+from app.units import normalize_ingredients
+
+# Rows generated per step; fixed so the output does not depend on how it is consumed
+CHUNK_SIZE = 1000
+
+# Only the categories the recipes CHECK constraint allows; weights are skewed like real collections
+CATEGORIES = ['dinner', 'lunch', 'breakfast', 'snack']
+CATEGORY_WEIGHTS = [0.45, 0.25, 0.20, 0.10]
+
+# ingredient -> unit it is usually measured in
+INGREDIENT_UNITS = {
+    'onion': 'pcs', 'garlic': 'pcs', 'tomato': 'g', 'chicken': 'g', 'rice': 'g', 'pasta': 'g', 'potato': 'g',
+    'carrot': 'g', 'egg': 'pcs', 'milk': 'ml', 'butter': 'g', 'flour': 'g', 'cheese': 'g', 'beef': 'g',
+    'bell pepper': 'pcs', 'spinach': 'g', 'mushroom': 'g', 'cream': 'ml', 'lemon': 'pcs', 'beans': 'g',
+    'lentils': 'g', 'chickpeas': 'g', 'tofu': 'g', 'salmon': 'g', 'pork': 'g', 'zucchini': 'pcs',
+    'broccoli': 'g', 'cucumber': 'pcs', 'yogurt': 'ml', 'oats': 'g', 'banana': 'pcs', 'apple': 'pcs',
+    'coconut milk': 'ml', 'sugar': 'g', 'honey': 'tbsp', 'soy sauce': 'tbsp', 'ginger': 'g', 'chili': 'pcs',
+    'corn': 'g', 'peas': 'g', 'shrimp': 'g', 'tuna': 'g', 'avocado': 'pcs', 'quinoa': 'g', 'feta': 'g',
+    'bacon': 'g', 'leek': 'pcs', 'celery': 'pcs', 'eggplant': 'pcs', 'pumpkin': 'g', 'cabbage': 'g',
+    'noodles': 'g', 'bread': 'g', 'tortilla': 'pcs', 'mozzarella': 'g', 'parmesan': 'g', 'basil': 'g',
+    'cilantro': 'g', 'walnuts': 'g', 'almonds': 'g', 'raisins': 'g', 'chocolate': 'g', 'vanilla': 'tsp',
+    'berries': 'g', 'orange': 'pcs', 'mango': 'pcs', 'sweet potato': 'g', 'kale': 'g', 'turkey': 'g',
+}
+INGREDIENTS = list(INGREDIENT_UNITS)
+COMMON_INGREDIENTS = ['salt', 'pepper', 'olive oil', 'water', 'vinegar', 'paprika', 'cumin', 'oregano']
+
+# Zipf exponent of ingredient popularity: the top few ingredients appear in most recipes
+ZIPF_EXPONENT = 1.1
+
+DISHES = ['stew', 'salad', 'bowl', 'curry', 'bake', 'soup', 'stir fry', 'pie', 'wrap', 'skillet']
+STEPS = [
+    "Chop the {a} and the {b}.", "Heat the oil in a large pan.", "Add the {a} and cook for {n} minutes.",
+    "Season with salt and pepper.", "Stir in the {b} and simmer gently.", "Bring a pot of water to the boil.",
+    "Bake for {n} minutes until golden.", "Mix everything in a bowl.", "Let it rest for {n} minutes.",
+    "Serve warm, topped with the {a}.",
+]
+QUANTITY_SCALE = {'g': 150.0, 'ml': 200.0, 'pcs': 2.0, 'tbsp': 2.0, 'tsp': 1.0}
+
+COPY_COLUMNS = "name, category, main_ingredients, common_ingredients, instructions, prep_time, portions"
+
+
+def _zipf_weights(count: int, exponent: float) -> np.ndarray:
+    """Normalized Zipf probabilities for ranks 1..count"""
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+def generate_recipes(count: int, seed: int = 42, name_prefix: str = "") -> Iterator[Dict[str, Any]]:
+    """Yield `count` synthetic recipes, deterministically for a given seed"""
+    rng = np.random.default_rng(seed)
+    popularity = _zipf_weights(len(INGREDIENTS), ZIPF_EXPONENT)
+    cumulative = np.cumsum(popularity)
+    for start in range(0, count, CHUNK_SIZE):
+        # Draw every random column of a full chunk at once, so a smaller count is a prefix of a larger one
+        size = CHUNK_SIZE
+        categories = rng.choice(len(CATEGORIES), size=size, p=CATEGORY_WEIGHTS)
+        ingredient_counts = rng.integers(2, 9, size=size)
+        picks = np.searchsorted(cumulative, rng.random((size, 12)))
+        quantity_factors = rng.lognormal(0.0, 0.5, size=(size, 12))
+        step_counts = np.clip(rng.lognormal(1.5, 0.5, size=size).astype(int), 1, 25)
+        step_picks = rng.integers(len(STEPS), size=(size, 25))
+        minutes = rng.integers(2, 45, size=size)
+        prep_times = np.clip(rng.gamma(2.0, 15.0, size=size).astype(int), 5, 240)
+        portions = rng.choice([1, 2, 2, 4, 4, 4, 6, 8], size=size)
+        common_masks = rng.random((size, len(COMMON_INGREDIENTS))) < 0.35
+
+        for row in range(min(CHUNK_SIZE, count - start)):
+            # Zipf draws with duplicates removed, keeping first-drawn order
+            names = list(dict.fromkeys(INGREDIENTS[pick] for pick in picks[row]))[:ingredient_counts[row]]
+            ingredients = []
+            for name, factor in zip(names, quantity_factors[row]):
+                unit = INGREDIENT_UNITS[name]
+                quantity = QUANTITY_SCALE[unit] * factor
+                quantity = float(max(1, round(quantity))) if unit == 'pcs' else round(float(quantity), 1)
+                ingredients.append({'quantity': quantity, 'unit': unit, 'name': name})
+            steps = [
+                STEPS[pick].format(a=names[0], b=names[-1], n=minutes[row])
+                for pick in step_picks[row][:step_counts[row]]
+            ]
+            yield {
+                'name': f"{name_prefix}{names[0].title()} {DISHES[(start + row) % len(DISHES)]}",
+                'category': CATEGORIES[categories[row]],
+                'main_ingredients': ingredients,
+                'common_ingredients': [c for c, keep in zip(COMMON_INGREDIENTS, common_masks[row]) if keep],
+                'instructions': " ".join(steps),
+                'prep_time': int(prep_times[row]),
+                'portions': int(portions[row])
+            }
+
+
+def _postgres_array(values: List[str]) -> str:
+    """Format strings as a Postgres array literal"""
+    return "{" + ",".join('"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"' for value in values) + "}"
+
+
+class CopyStream:
+    """File-like object that renders recipes as COPY CSV on demand, holding one chunk in memory"""
+
+    def __init__(self, recipes: Iterator[Dict[str, Any]]):
+        """Wrap a recipe iterator"""
+        self._recipes = recipes
+        self._buffer = ""
+
+    def _fill(self) -> bool:
+        """Render the next chunk of rows into the buffer; False once the recipes are exhausted"""
+        out = io.StringIO()
+        writer = csv.writer(out)
+        for _ in range(CHUNK_SIZE):
+            recipe = next(self._recipes, None)
+            if recipe is None:
+                break
+            writer.writerow([
+                recipe['name'], recipe['category'],
+                json.dumps(normalize_ingredients(recipe['main_ingredients'])),
+                _postgres_array(recipe['common_ingredients']),
+                recipe['instructions'], recipe['prep_time'], recipe['portions']
+            ])
+        self._buffer += out.getvalue()
+        return bool(out.getvalue())
+
+    def read(self, size: int = -1) -> str:
+        """Return up to size characters of CSV"""
+        while (size < 0 or len(self._buffer) < size) and self._fill():
+            pass
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    readline = read
+
+
+def copy_recipes(db_client: DatabaseClient, recipes: Iterator[Dict[str, Any]], defer_triggers: bool = False):
+    """Stream recipes into the recipes table with a single COPY in one transaction"""
+    cursor = db_client._connection.cursor()
+    try:
+        if defer_triggers:
+            # Needs table ownership; run the ingredient backfill and similarity refresh afterwards
+            cursor.execute("ALTER TABLE recipes DISABLE TRIGGER USER")
+        cursor.copy_expert(f"COPY recipes ({COPY_COLUMNS}) FROM STDIN WITH (FORMAT csv)", CopyStream(recipes))
+        if defer_triggers:
+            cursor.execute("ALTER TABLE recipes ENABLE TRIGGER USER")
+        cursor.execute("ANALYZE recipes")
+        db_client._connection.commit()
+    except Exception:
+        db_client._connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def write_ndjson(recipes: Iterator[Dict[str, Any]], output: Optional[str]):
+    """Write recipes as newline-delimited JSON to a file, or stdout for '-'"""
+    out = sys.stdout if output == "-" else open(output, "w")
+    try:
+        for recipe in recipes:
+            out.write(json.dumps(recipe) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def main():
+    """Command line entry point for the generator"""
+    parser = argparse.ArgumentParser(description="Generate synthetic recipes")
+    parser.add_argument("--count", type=int, required=True, help="number of recipes")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("--name-prefix", default="", help="prefix for recipe names")
+    parser.add_argument("--output", help="NDJSON file ('-' for stdout); omit to COPY into Postgres")
+    parser.add_argument("--defer-triggers", action="store_true",
+                        help="disable recipe triggers during the load (then run the backfills)")
+    args = parser.parse_args()
+
+    recipes = generate_recipes(args.count, args.seed, args.name_prefix)
+    if args.output:
+        write_ndjson(recipes, args.output)
+        return
+
+    db_client = DatabaseClient()
+    if not db_client.connect():
+        raise SystemExit("Failed to connect to database")
+    try:
+        copy_recipes(db_client, recipes, defer_triggers=args.defer_triggers)
+        print(f"Loaded {args.count} recipes")
+        if args.defer_triggers:
+            print("Triggers were off: run `python -m app.backfill_ingredients` and `python -m app.similarity --full`")
+    finally:
+        db_client.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+HDR-style latency histogram.
+Buckets are log-linear, so every recorded value keeps about 1% relative precision from microseconds to minutes
+while memory stays fixed regardless of how many values are recorded.
+"""
+import numpy as np
+from typing import Dict
+
+# Linear sub-buckets per power of two; 128 gives under 1.6% relative error
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+HALF_SUB_BUCKET_COUNT = SUB_BUCKET_COUNT // 2
+
+# Largest trackable value in microseconds (about 35 minutes); larger values are clamped
+MAX_VALUE_US = (1 << 31) - 1
+
+
+def bucket_index(value: int) -> int:
+    """Index of the bucket holding a non-negative integer value"""
+    shift = max(value.bit_length() - SUB_BUCKET_BITS, 0)
+    return shift * HALF_SUB_BUCKET_COUNT + (value >> shift)
+
+
+def bucket_value(index: int) -> int:
+    """Highest value that falls into a bucket"""
+    if index < SUB_BUCKET_COUNT:
+        return index
+    shift = (index - HALF_SUB_BUCKET_COUNT) // HALF_SUB_BUCKET_COUNT
+    sub_bucket = index - shift * HALF_SUB_BUCKET_COUNT
+    return ((sub_bucket + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Fixed-size latency histogram with microsecond resolution"""
+
+    def __init__(self):
+        """Initialize an empty histogram"""
+        self.counts = np.zeros(bucket_index(MAX_VALUE_US) + 1, dtype=np.int64)
+        self.total = 0
+        self.max_us = 0
+
+    def record(self, seconds: float):
+        """Record one latency given in seconds"""
+        value = min(max(int(seconds * 1_000_000), 0), MAX_VALUE_US)
+        self.counts[bucket_index(value)] += 1
+        self.total += 1
+        self.max_us = max(self.max_us, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add another histogram's counts into this one"""
+        self.counts += other.counts
+        self.total += other.total
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, percent: float) -> float:
+        """Latency in milliseconds at or below which `percent` of the recorded values fall"""
+        if self.total == 0:
+            return 0.0
+        rank = max(int(np.ceil(percent / 100 * self.total)), 1)
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(bucket_value(index), self.max_us) / 1000
+
+    def summary(self) -> Dict[str, float]:
+        """p50/p90/p99/p99.9/max in milliseconds"""
+        return {
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'p999_ms': self.percentile(99.9),
+            'max_ms': self.max_us / 1000
+        }
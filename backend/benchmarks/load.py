@@ -0,0 +1,239 @@
+"""
+Open-loop HTTP load generator for the recipes API.
+
+Requests are started on a fixed arrival schedule whatever the response times, and latency is measured from
+the scheduled start, so a slow server shows up as queueing in the percentiles instead of a lower request rate.
+
+Usage (from backend/):
+    python -m benchmarks.load --rate 200 --duration 30                          # in-process ASGI app
+    python -m benchmarks.load --url http://localhost:8000 --rate 500 --mix get=70,list=10,create=10,update=5,delete=5
+
+The run creates its own working set of "load-..." recipes, which GET/PATCH/DELETE target, and deletes
+what is left of it at the end. `list` is GET /recipes and reads the whole table, so keep its share small
+on large tables.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Dict, List, Any, Optional
+import httpx
+import numpy as np
+from .dataset import generate_recipes
+from .histogram import LatencyHistogram
+
+LOAD_PREFIX = "load-"
+DEFAULT_MIX = "get=60,list=5,create=15,update=15,delete=5"
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse 'op=weight,...' into normalized probabilities"""
+    weights = {}
+    for part in mix.split(","):
+        operation, _, weight = part.partition("=")
+        operation = operation.strip()
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {operation}")
+        weights[operation] = float(weight or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Mix weights must sum to a positive number")
+    return {operation: weight / total for operation, weight in weights.items()}
+
+
+def arrival_offsets(rate: float, duration: float, rng: np.random.Generator, poisson: bool = False) -> np.ndarray:
+    """Scheduled start times (seconds from the run start) for a fixed or Poisson arrival rate"""
+    if poisson:
+        gaps = rng.exponential(1 / rate, size=int(rate * duration * 1.2) + 10)
+        offsets = np.cumsum(gaps)
+        return offsets[offsets < duration]
+    return np.arange(int(rate * duration)) / rate
+
+
+class LoadState:
+    """Working set of recipe ids and fresh payloads shared by the request tasks"""
+
+    def __init__(self, seed: int):
+        """Initialize an empty working set"""
+        self.ids: List[int] = []
+        self.rng = np.random.default_rng(seed)
+        self._recipes = generate_recipes(10 ** 9, seed=seed, name_prefix=LOAD_PREFIX)
+
+    def next_recipe(self) -> Dict[str, Any]:
+        """Next synthetic recipe payload"""
+        return next(self._recipes)
+
+    def random_id(self) -> Optional[int]:
+        """A random id from the working set, or None when it is empty"""
+        return self.ids[self.rng.integers(len(self.ids))] if self.ids else None
+
+    def take_id(self) -> Optional[int]:
+        """Remove and return a random id from the working set"""
+        if not self.ids:
+            return None
+        position = int(self.rng.integers(len(self.ids)))
+        self.ids[position], self.ids[-1] = self.ids[-1], self.ids[position]
+        return self.ids.pop()
+
+
+async def _create(client: httpx.AsyncClient, state: LoadState) -> httpx.Response:
+    """POST /recipes and add the new id to the working set"""
+    response = await client.post("/recipes", json=state.next_recipe())
+    if response.status_code == 201:
+        state.ids.append(response.json()['id'])
+    return response
+
+
+async def _get(client: httpx.AsyncClient, state: LoadState) -> httpx.Response:
+    """GET /recipes/{id}"""
+    recipe_id = state.random_id()
+    if recipe_id is None:
+        return await _create(client, state)
+    return await client.get(f"/recipes/{recipe_id}")
+
+
+async def _list(client: httpx.AsyncClient, state: LoadState) -> httpx.Response:
+    """GET /recipes"""
+    return await client.get("/recipes")
+
+
+async def _update(client: httpx.AsyncClient, state: LoadState) -> httpx.Response:
+    """PATCH /recipes/{id} with a new prep time"""
+    recipe_id = state.random_id()
+    if recipe_id is None:
+        return await _create(client, state)
+    return await client.patch(f"/recipes/{recipe_id}", json={'prep_time': int(state.rng.integers(5, 120))})
+
+
+async def _delete(client: httpx.AsyncClient, state: LoadState) -> httpx.Response:
+    """DELETE /recipes/{id}, removing it from the working set"""
+    recipe_id = state.take_id()
+    if recipe_id is None:
+        return await _create(client, state)
+    return await client.delete(f"/recipes/{recipe_id}")
+
+
+# mix name -> coroutine(client, state); operations on an empty working set fall back to a create
+OPERATIONS = {
+    'list': _list,
+    'get': _get,
+    'create': _create,
+    'update': _update,
+    'delete': _delete,
+}
+
+
+async def run_load(client: httpx.AsyncClient, mix: Dict[str, float], rate: float, duration: float,
+                   seed: int = 42, working_set: int = 100, poisson: bool = False) -> Dict[str, Any]:
+    """Drive the client at `rate` requests per second for `duration` seconds and summarize the results"""
+    state = LoadState(seed)
+    for _ in range(working_set):
+        await _create(client, state)
+
+    operations = list(mix)
+    offsets = arrival_offsets(rate, duration, state.rng, poisson)
+    choices = state.rng.choice(len(operations), size=len(offsets), p=[mix[operation] for operation in operations])
+    histograms = {operation: LatencyHistogram() for operation in operations}
+    errors = {operation: 0 for operation in operations}
+
+    async def issue(operation: str, scheduled: float):
+        try:
+            response = await OPERATIONS[operation](client, state)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            failed = True
+        histograms[operation].record(time.perf_counter() - scheduled)
+        if failed:
+            errors[operation] += 1
+
+    started = time.perf_counter()
+    tasks = []
+    for offset, choice in zip(offsets, choices):
+        delay = started + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(issue(operations[choice], started + offset)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    # Remove what is left of the working set
+    for recipe_id in state.ids:
+        await client.delete(f"/recipes/{recipe_id}")
+
+    overall = LatencyHistogram()
+    results = []
+    for operation in operations:
+        overall.merge(histograms[operation])
+        results.append(_summarize(operation, histograms[operation], errors[operation], elapsed))
+    results.append(_summarize('all', overall, sum(errors.values()), elapsed))
+    return {'rate': rate, 'duration': duration, 'elapsed': elapsed, 'results': results}
+
+
+def _summarize(operation: str, histogram: LatencyHistogram, errors: int, elapsed: float) -> Dict[str, Any]:
+    """Counts, error rate, throughput and percentiles for one operation"""
+    return {
+        'operation': operation,
+        'requests': histogram.total,
+        'errors': errors,
+        'error_rate': errors / histogram.total if histogram.total else 0.0,
+        'throughput': histogram.total / elapsed if elapsed > 0 else 0.0,
+        **histogram.summary()
+    }
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """Render load results as a fixed-width text table"""
+    lines = [f"{'operation':<10}{'reqs':>8}{'err %':>8}{'req/s':>10}{'p50 ms':>10}{'p90 ms':>10}"
+             f"{'p99 ms':>10}{'p99.9 ms':>10}{'max ms':>10}"]
+    for r in results:
+        lines.append(
+            f"{r['operation']:<10}{r['requests']:>8}{r['error_rate'] * 100:>8.2f}{r['throughput']:>10.1f}"
+            f"{r['p50_ms']:>10.2f}{r['p90_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['p999_ms']:>10.2f}{r['max_ms']:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def make_client(url: Optional[str], timeout: float) -> httpx.AsyncClient:
+    """HTTP client for a running server, or for the app in-process over ASGI"""
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=timeout, limits=httpx.Limits(max_connections=None))
+    from app.main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://app", timeout=timeout)
+
+
+async def _main(args: argparse.Namespace, mix: Dict[str, float]) -> Dict[str, Any]:
+    """Run the load test with a client built from the arguments"""
+    async with make_client(args.url, args.timeout) as client:
+        return await run_load(client, mix, args.rate, args.duration, args.seed, args.working_set, args.poisson)
+
+
+def main():
+    """Command line entry point for the load generator"""
+    parser = argparse.ArgumentParser(description="Open-loop HTTP load test for the recipes API")
+    parser.add_argument("--url", help="base URL of a running server; omit to drive the app in-process")
+    parser.add_argument("--rate", type=float, default=100, help="requests started per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation weights, e.g. get=70,create=30")
+    parser.add_argument("--poisson", action="store_true", help="Poisson arrivals instead of evenly spaced ones")
+    parser.add_argument("--working-set", type=int, default=100, help="recipes created before the run")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    report = asyncio.run(_main(args, mix))
+    print(format_results(report['results']))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark result summaries and baseline comparison.
+"""
+import numpy as np
+from typing import List, Dict, Any, Sequence
+
+# Keys identifying one measured cell
+RESULT_KEY = ('operation', 'size', 'concurrency')
+
+
+def summarize(operation: str, size: int, concurrency: int, latencies: Sequence[float],
+              wall_seconds: float, errors: int = 0) -> Dict[str, Any]:
+    """Summarize per-call latencies (seconds) into throughput and p50/p95/p99 milliseconds"""
+    latencies_ms = np.asarray(latencies, dtype=float) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99]) if len(latencies_ms) else (0.0, 0.0, 0.0)
+    return {
+        'operation': operation,
+        'size': size,
+        'concurrency': concurrency,
+        'ops': len(latencies_ms),
+        'errors': errors,
+        'throughput': len(latencies_ms) / wall_seconds if wall_seconds > 0 else 0.0,
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99)
+    }
+
+
+def compare(baseline: List[Dict[str, Any]], current: List[Dict[str, Any]],
+            threshold: float = 0.15) -> List[Dict[str, Any]]:
+    """Return the cells whose p95 grew or throughput fell by more than threshold versus the baseline"""
+    baseline_by_key = {tuple(result[key] for key in RESULT_KEY): result for result in baseline}
+    regressions = []
+    for result in current:
+        before = baseline_by_key.get(tuple(result[key] for key in RESULT_KEY))
+        if not before:
+            continue
+        reasons = []
+        if before['p95_ms'] > 0 and result['p95_ms'] > before['p95_ms'] * (1 + threshold):
+            reasons.append(f"p95 {before['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms")
+        if before['throughput'] > 0 and result['throughput'] < before['throughput'] * (1 - threshold):
+            reasons.append(f"throughput {before['throughput']:.1f} -> {result['throughput']:.1f} ops/s")
+        if reasons:
+            regressions.append({**{key: result[key] for key in RESULT_KEY}, 'reasons': reasons})
+    return regressions
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    """Render results as a fixed-width text table"""
+    lines = [f"{'operation':<24}{'size':>10}{'conc':>6}{'ops':>8}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+    for r in results:
+        lines.append(
+            f"{r['operation']:<24}{r['size']:>10}{r['concurrency']:>6}{r['ops']:>8}"
+            f"{r['throughput']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,224 @@
+"""
+Run the scale benchmarks, or compare two result files.
+
+Usage (from backend/, with the POSTGRES_* / PG* variables of a local database):
+    python -m benchmarks.run run --sizes 10000,100000 --concurrency 1,8 --output results.json
+    python -m benchmarks.run run --baseline baseline.json           # run, then flag regressions
+    python -m benchmarks.run compare baseline.json results.json     # compare stored results
+
+Synthetic rows (see benchmarks.dataset) are named "bench-..." and are kept between runs so larger sizes only top up;
+`run --cleanup` deletes them afterwards. Rows that are not benchmark rows are never modified.
+"""
+import argparse
+import json
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Any
+import numpy as np
+from fastapi.testclient import TestClient
+from app.database_client import DatabaseClient
+from app.main import app
+from app.planner import MAX_CANDIDATES_PER_CATEGORY
+from .dataset import CATEGORIES, generate_recipes, copy_recipes
+from .report import summarize, compare, format_table
+
+BENCH_PREFIX = "bench-"
+
+
+def benchmark_ids(db_client: DatabaseClient) -> np.ndarray:
+    """Ids of all benchmark rows"""
+    cursor = db_client._connection.cursor()
+    cursor.execute("SELECT id FROM recipes WHERE name LIKE %s", (BENCH_PREFIX + "%",))
+    ids = np.array([row[0] for row in cursor.fetchall()], dtype=np.int64)
+    cursor.close()
+    return ids
+
+
+def seed(db_client: DatabaseClient, size: int, seed_value: int) -> np.ndarray:
+    """Top up benchmark rows until there are `size` of them; returns their ids"""
+    ids = benchmark_ids(db_client)
+    if len(ids) < size:
+        # Offset the seed by the rows already present so each top-up draws fresh recipes
+        recipes = generate_recipes(size - len(ids), seed=seed_value + len(ids), name_prefix=BENCH_PREFIX)
+        copy_recipes(db_client, recipes)
+        print(f"  seeded {size - len(ids)} recipes", file=sys.stderr)
+        ids = benchmark_ids(db_client)
+    return ids[:size]
+
+
+def cleanup(db_client: DatabaseClient):
+    """Delete all benchmark rows"""
+    cursor = db_client._connection.cursor()
+    cursor.execute("DELETE FROM recipes WHERE name LIKE %s", (BENCH_PREFIX + "%",))
+    db_client._connection.commit()
+    cursor.close()
+
+
+def _random_id(rng: np.random.Generator, ids: np.ndarray) -> int:
+    """Pick a random benchmark recipe id"""
+    return int(ids[rng.integers(len(ids))])
+
+
+# name -> callable(db_client, http_client, rng, ids); the http client is a FastAPI TestClient
+OPERATIONS: Dict[str, Callable[..., Any]] = {
+    'get_recipe_by_id': lambda db, http, rng, ids: db.get_recipe_by_id(_random_id(rng, ids)),
+    'get_all_recipes': lambda db, http, rng, ids: db.get_all_recipes(),
+    'search_recipes': lambda db, http, rng, ids: db.search_recipes(
+        category=CATEGORIES[rng.integers(len(CATEGORIES))], max_prep_time=30, limit=20),
+    'get_recent_recipes': lambda db, http, rng, ids: db.get_recent_recipes(10),
+    'get_category_stats': lambda db, http, rng, ids: db.get_category_stats(),
+    'get_shopping_list': lambda db, http, rng, ids: db.get_shopping_list(
+        [{'recipe_id': _random_id(rng, ids), 'portions': 4} for _ in range(20)]),
+    'update_recipe': lambda db, http, rng, ids: db.update_recipe(
+        _random_id(rng, ids), {'prep_time': int(rng.integers(5, 120))}),
+    'http_get_recipe': lambda db, http, rng, ids: http.get(f"/recipes/{_random_id(rng, ids)}"),
+    'http_search': lambda db, http, rng, ids: http.get("/recipes/search", params={'q': 'bench', 'limit': 20}),
+    'get_plan_candidates': lambda db, http, rng, ids: db.get_plan_candidates(
+        ['breakfast', 'lunch', 'dinner'], max_prep_time=60, per_category_limit=MAX_CANDIDATES_PER_CATEGORY),
+    # A 7-day plan end to end; the target is under 200 ms at 100k recipes
+    'http_meal_plan': lambda db, http, rng, ids: http.post(
+        "/meal-plans/generate", json={'days': 7, 'max_prep_time': 60, 'seed': int(rng.integers(1 << 31))}),
+}
+
+# get_all_recipes returns every row, so it only runs at sizes up to this
+FULL_SCAN_MAX_SIZE = 100_000
+
+
+def measure(operation: str, ids: np.ndarray, concurrency: int, duration: float, seed_value: int) -> Dict[str, Any]:
+    """Run one operation from `concurrency` threads for `duration` seconds"""
+    run = OPERATIONS[operation]
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(number: int):
+        rng = np.random.default_rng(seed_value + number)
+        db_client = DatabaseClient()
+        db_client.connect()
+        http_client = TestClient(app)
+        local, failed = [], 0
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    run(db_client, http_client, rng, ids)
+                except Exception:
+                    failed += 1
+                    db_client.rollback()
+                    continue
+                local.append(time.perf_counter() - started)
+        finally:
+            db_client.disconnect()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    return summarize(operation, len(ids), concurrency, latencies, time.perf_counter() - started, errors[0])
+
+
+def run_suite(sizes: List[int], concurrencies: List[int], operations: List[str], duration: float,
+              seed_value: int = 42) -> List[Dict[str, Any]]:
+    """Seed each size in ascending order and measure every operation at every concurrency level"""
+    db_client = DatabaseClient()
+    if not db_client.connect():
+        raise SystemExit("Failed to connect to database")
+    results = []
+    try:
+        for size in sorted(sizes):
+            print(f"Seeding {size} recipes", file=sys.stderr)
+            ids = seed(db_client, size, seed_value)
+            for operation in operations:
+                if operation == 'get_all_recipes' and size > FULL_SCAN_MAX_SIZE:
+                    continue
+                for concurrency in concurrencies:
+                    result = measure(operation, ids, concurrency, duration, seed_value)
+                    print(format_table([result]).splitlines()[1], file=sys.stderr)
+                    results.append(result)
+    finally:
+        db_client.disconnect()
+    return results
+
+
+def _report_regressions(baseline_path: str, results: List[Dict[str, Any]], threshold: float) -> int:
+    """Print regressions against a baseline file; returns the exit code"""
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)['results']
+    regressions = compare(baseline, results, threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression['operation']} size={regression['size']} "
+              f"concurrency={regression['concurrency']}: {'; '.join(regression['reasons'])}")
+    print(f"{len(regressions)} regressions (threshold {threshold:.0%})")
+    return 1 if regressions else 0
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Meal planner scale benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="seed data and run the benchmarks")
+    run_parser.add_argument("--sizes", default="10000,100000", help="comma separated row counts")
+    run_parser.add_argument("--concurrency", default="1,8", help="comma separated thread counts")
+    run_parser.add_argument("--operations", default=",".join(OPERATIONS), help="comma separated operations")
+    run_parser.add_argument("--duration", type=float, default=5.0, help="seconds per measurement")
+    run_parser.add_argument("--output", default="benchmark_results.json", help="JSON results file")
+    run_parser.add_argument("--baseline", help="results file to compare against")
+    run_parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative slowdown")
+    run_parser.add_argument("--cleanup", action="store_true", help="delete benchmark rows afterwards")
+
+    compare_parser = commands.add_parser("compare", help="compare two results files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative slowdown")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.current) as current_file:
+            results = json.load(current_file)['results']
+        raise SystemExit(_report_regressions(args.baseline, results, args.threshold))
+
+    operations = args.operations.split(",")
+    unknown = set(operations) - set(OPERATIONS)
+    if unknown:
+        raise SystemExit(f"Unknown operations: {', '.join(sorted(unknown))}")
+
+    results = run_suite(
+        sizes=[int(size) for size in args.sizes.split(",")],
+        concurrencies=[int(concurrency) for concurrency in args.concurrency.split(",")],
+        operations=operations,
+        duration=args.duration
+    )
+    with open(args.output, "w") as output_file:
+        json.dump({
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'duration': args.duration
+            },
+            'results': results
+        }, output_file, indent=2)
+    print(format_table(results))
+    print(f"Results written to {args.output}")
+
+    if args.cleanup:
+        db_client = DatabaseClient()
+        if db_client.connect():
+            cleanup(db_client)
+            db_client.disconnect()
+
+    if args.baseline:
+        raise SystemExit(_report_regressions(args.baseline, results, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
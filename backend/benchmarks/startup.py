@@ -0,0 +1,134 @@
+"""
+Cold-start benchmark for the API process.
+
+Each run is a fresh interpreter that imports app.main and, with --lifespan, runs the startup half of the
+lifespan handler (job workers and the database warm-up). One extra run under `python -X importtime` gives
+the import profile, grouped by top-level package.
+
+Usage (from backend/):
+    python -m benchmarks.startup                                   # median of 5 runs and the import profile
+    python -m benchmarks.startup --runs 10 --lifespan --output startup.json
+    python -m benchmarks.startup --budget-ms 800                   # exit 1 over budget, e.g. in CI
+
+The run also fails when app.main imports a package listed in FORBIDDEN_AT_STARTUP.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Any, Tuple
+
+# Median import time of app.main, in milliseconds, above which the run fails
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1000"))
+
+# Packages only batch jobs need; importing them from app.main is a startup regression
+FORBIDDEN_AT_STARTUP = ("scipy",)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in each child process; prints one JSON line
+PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+lifespan_ms = None
+if {lifespan}:
+    async def startup():
+        async with app.main.app.router.lifespan_context(app.main.app):
+            return (time.perf_counter() - imported) * 1000
+    lifespan_ms = asyncio.run(startup())
+print(json.dumps({{'import_ms': (imported - started) * 1000, 'lifespan_ms': lifespan_ms,
+                  'modules': sorted(name for name in sys.modules if '.' not in name)}}))
+"""
+
+
+def run_once(lifespan: bool = False, importtime: bool = False) -> Tuple[Dict[str, Any], str]:
+    """Start one fresh interpreter; returns its measurements and its stderr"""
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", PROBE.format(lifespan=lifespan)]
+    completed = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup probe failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """Module -> (self, cumulative) microseconds from `python -X importtime` output"""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        timings[module.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def package_times(timings: Dict[str, Tuple[int, int]], limit: int = 15) -> List[Tuple[str, float]]:
+    """Self time summed per top-level package in milliseconds, slowest first"""
+    totals = defaultdict(int)
+    for module, (self_us, _) in timings.items():
+        totals[module.split(".")[0]] += self_us
+    return [(package, total / 1000) for package, total in sorted(totals.items(), key=lambda item: -item[1])[:limit]]
+
+
+def measure(runs: int, lifespan: bool = False) -> Dict[str, Any]:
+    """Median timings over `runs` fresh processes plus the import profile of one more"""
+    samples = [run_once(lifespan)[0] for _ in range(runs)]
+    profiled, stderr = run_once(importtime=True)
+    lifespan_samples = [sample['lifespan_ms'] for sample in samples if sample['lifespan_ms'] is not None]
+    return {
+        'runs': runs,
+        'import_ms': statistics.median(sample['import_ms'] for sample in samples),
+        'lifespan_ms': statistics.median(lifespan_samples) if lifespan_samples else None,
+        'packages': package_times(parse_importtime(stderr)),
+        'forbidden': [package for package in FORBIDDEN_AT_STARTUP if package in profiled['modules']]
+    }
+
+
+def check_budget(report: Dict[str, Any], budget_ms: float) -> List[str]:
+    """Reasons the run fails its budget; empty when it passes"""
+    failures = []
+    if report['import_ms'] > budget_ms:
+        failures.append(f"import of app.main took {report['import_ms']:.0f} ms, budget is {budget_ms:.0f} ms")
+    for package in report['forbidden']:
+        failures.append(f"app.main imports {package}, which is only allowed in batch jobs")
+    return failures
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Human readable summary"""
+    lines = [f"import app.main   {report['import_ms']:8.1f} ms  (median of {report['runs']})"]
+    if report['lifespan_ms'] is not None:
+        lines.append(f"lifespan startup  {report['lifespan_ms']:8.1f} ms")
+    lines.append("")
+    lines.append("Import self time by package (one -X importtime run):")
+    lines.extend(f"  {package:<24}{milliseconds:8.1f} ms" for package, milliseconds in report['packages'])
+    return "\n".join(lines)
+
+
+def main():
+    """Command line entry point for the startup benchmark"""
+    parser = argparse.ArgumentParser(description="Measure API cold-start time against a budget")
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes to time")
+    parser.add_argument("--lifespan", action="store_true", help="also time lifespan startup (needs the database)")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS, help="median import time budget")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    report = measure(args.runs, args.lifespan)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+    failures = check_budget(report, args.budget_ms)
+    if failures:
+        raise SystemExit("Startup budget exceeded:\n  " + "\n  ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
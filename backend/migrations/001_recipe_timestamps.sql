@@ -0,0 +1,6 @@
+-- Track when recipes are created and last modified
+ALTER TABLE recipes ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ NOT NULL DEFAULT now();
+ALTER TABLE recipes ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+-- Serves the recent recipes feed with an index scan + LIMIT instead of a sort
+CREATE INDEX IF NOT EXISTS idx_recipes_updated_at ON recipes (updated_at DESC, id DESC);
@@ -0,0 +1,2 @@
+-- Category filter in /recipes/search, ordered by id for paging
+CREATE INDEX IF NOT EXISTS idx_recipes_category ON recipes (category, id);
@@ -0,0 +1,43 @@
+-- Precomputed top-k similar recipes, served by a single primary key lookup
+CREATE TABLE IF NOT EXISTS recipe_neighbors (
+  recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+  rank SMALLINT NOT NULL,
+  neighbor_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+  score REAL NOT NULL,
+  PRIMARY KEY (recipe_id, rank)
+);
+
+CREATE INDEX IF NOT EXISTS idx_recipe_neighbors_neighbor_id ON recipe_neighbors (neighbor_id);
+
+-- Recipes whose neighbours need recomputing by the incremental refresh job
+CREATE TABLE IF NOT EXISTS recipe_similarity_dirty (
+  recipe_id INTEGER PRIMARY KEY,
+  marked_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+);
+
+-- Every write path marks the recipes it touches, in the same transaction
+CREATE OR REPLACE FUNCTION mark_recipe_similarity_dirty() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    -- Recipes listing the deleted one lose a neighbour when the cascade runs
+    INSERT INTO recipe_similarity_dirty (recipe_id)
+    SELECT recipe_id FROM recipe_neighbors WHERE neighbor_id = OLD.id AND recipe_id <> OLD.id
+    ON CONFLICT (recipe_id) DO UPDATE SET marked_at = clock_timestamp();
+    RETURN OLD;
+  END IF;
+
+  INSERT INTO recipe_similarity_dirty (recipe_id) VALUES (NEW.id)
+  ON CONFLICT (recipe_id) DO UPDATE SET marked_at = clock_timestamp();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS recipes_similarity_write ON recipes;
+CREATE TRIGGER recipes_similarity_write
+  AFTER INSERT OR UPDATE OF category, main_ingredients, common_ingredients ON recipes
+  FOR EACH ROW EXECUTE FUNCTION mark_recipe_similarity_dirty();
+
+DROP TRIGGER IF EXISTS recipes_similarity_delete ON recipes;
+CREATE TRIGGER recipes_similarity_delete
+  BEFORE DELETE ON recipes
+  FOR EACH ROW EXECUTE FUNCTION mark_recipe_similarity_dirty();
@@ -0,0 +1,72 @@
+-- Interned ingredient names
+CREATE TABLE IF NOT EXISTS ingredients (
+  id SERIAL PRIMARY KEY,
+  name TEXT NOT NULL UNIQUE
+);
+
+-- One row per ingredient of a recipe; main_ingredients JSONB stays the source for reads
+CREATE TABLE IF NOT EXISTS recipe_ingredients (
+  recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+  is_common BOOLEAN NOT NULL,
+  position INTEGER NOT NULL,
+  ingredient_id INTEGER NOT NULL REFERENCES ingredients(id),
+  quantity DOUBLE PRECISION,
+  unit TEXT,
+  canonical_quantity DOUBLE PRECISION,
+  canonical_unit TEXT,
+  PRIMARY KEY (recipe_id, is_common, position)
+);
+
+CREATE INDEX IF NOT EXISTS idx_recipe_ingredients_ingredient_id ON recipe_ingredients (ingredient_id, recipe_id);
+
+-- Write the normalized rows of a recipe that has none yet from its JSONB / array columns
+CREATE OR REPLACE FUNCTION insert_recipe_ingredients(p_recipe_id INTEGER, p_main JSONB, p_common TEXT[])
+RETURNS void AS $$
+BEGIN
+  INSERT INTO ingredients (name)
+  SELECT DISTINCT lower(trim(item->>'name')) FROM jsonb_array_elements(COALESCE(p_main, '[]'::jsonb)) AS item
+  UNION
+  SELECT DISTINCT lower(trim(item)) FROM unnest(COALESCE(p_common, '{}'::text[])) AS item
+  ON CONFLICT (name) DO NOTHING;
+
+  INSERT INTO recipe_ingredients (recipe_id, is_common, position, ingredient_id, quantity, unit,
+                                  canonical_quantity, canonical_unit)
+  SELECT p_recipe_id, false, item.position, ingredients.id, (item.value->>'quantity')::double precision,
+         item.value->>'unit', (item.value->>'canonical_quantity')::double precision, item.value->>'canonical_unit'
+  FROM jsonb_array_elements(COALESCE(p_main, '[]'::jsonb)) WITH ORDINALITY AS item(value, position)
+  JOIN ingredients ON ingredients.name = lower(trim(item.value->>'name'));
+
+  INSERT INTO recipe_ingredients (recipe_id, is_common, position, ingredient_id)
+  SELECT p_recipe_id, true, item.position, ingredients.id
+  FROM unnest(COALESCE(p_common, '{}'::text[])) WITH ORDINALITY AS item(value, position)
+  JOIN ingredients ON ingredients.name = lower(trim(item.value));
+END;
+$$ LANGUAGE plpgsql;
+
+-- Rebuild the normalized rows of one recipe from its JSONB / array columns
+CREATE OR REPLACE FUNCTION sync_recipe_ingredients(p_recipe_id INTEGER, p_main JSONB, p_common TEXT[])
+RETURNS void AS $$
+BEGIN
+  DELETE FROM recipe_ingredients WHERE recipe_id = p_recipe_id;
+  PERFORM insert_recipe_ingredients(p_recipe_id, p_main, p_common);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Keep the normalized rows in the same transaction as every recipe write; deletes cascade
+CREATE OR REPLACE FUNCTION recipes_sync_ingredients() RETURNS trigger AS $$
+BEGIN
+  -- A new recipe has no rows to delete; the cached plan of that DELETE can be a seq scan that makes
+  -- bulk loads into a small table quadratic
+  IF TG_OP = 'INSERT' THEN
+    PERFORM insert_recipe_ingredients(NEW.id, NEW.main_ingredients, NEW.common_ingredients);
+  ELSE
+    PERFORM sync_recipe_ingredients(NEW.id, NEW.main_ingredients, NEW.common_ingredients);
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS recipes_ingredients_write ON recipes;
+CREATE TRIGGER recipes_ingredients_write
+  AFTER INSERT OR UPDATE OF main_ingredients, common_ingredients ON recipes
+  FOR EACH ROW EXECUTE FUNCTION recipes_sync_ingredients();
@@ -0,0 +1,22 @@
+-- Saved meal plans
+CREATE TABLE IF NOT EXISTS meal_plans (
+  id SERIAL PRIMARY KEY,
+  name TEXT NOT NULL,
+  start_date DATE,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- One planned meal per row; deleting a plan or a recipe removes its entries
+CREATE TABLE IF NOT EXISTS meal_plan_entries (
+  id SERIAL PRIMARY KEY,
+  plan_id INTEGER NOT NULL REFERENCES meal_plans(id) ON DELETE CASCADE,
+  day INTEGER NOT NULL CHECK (day >= 1),
+  category TEXT NOT NULL,
+  recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+  portions INTEGER CHECK (portions >= 1)
+);
+
+-- Week views read a plan's entries in day order
+CREATE INDEX IF NOT EXISTS idx_meal_plan_entries_plan_day ON meal_plan_entries (plan_id, day);
+CREATE INDEX IF NOT EXISTS idx_meal_plan_entries_recipe_id ON meal_plan_entries (recipe_id);
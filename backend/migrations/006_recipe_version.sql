@@ -0,0 +1,2 @@
+-- Row version for optimistic concurrency; every update bumps it and If-Match compares against it
+ALTER TABLE recipes ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
@@ -0,0 +1,38 @@
+-- Backfill canonical_quantity / canonical_unit into main_ingredients of recipes written before they were stored.
+-- The factors mirror UNIT_REGISTRY in app/units.py; unknown units map to themselves, as in canonical_unit()
+WITH units (unit, base_unit, factor) AS (
+  VALUES
+    ('mg', 'g', 0.001),
+    ('g', 'g', 1.0),
+    ('gram', 'g', 1.0),
+    ('grams', 'g', 1.0),
+    ('kg', 'g', 1000.0),
+    ('oz', 'g', 28.349523125),
+    ('lb', 'g', 453.59237),
+    ('lbs', 'g', 453.59237),
+    ('ml', 'ml', 1.0),
+    ('cl', 'ml', 10.0),
+    ('dl', 'ml', 100.0),
+    ('l', 'ml', 1000.0),
+    ('tsp', 'ml', 5.0),
+    ('tbsp', 'ml', 15.0),
+    ('cup', 'ml', 240.0),
+    ('cups', 'ml', 240.0),
+    ('pcs', 'pcs', 1.0),
+    ('pc', 'pcs', 1.0),
+    ('piece', 'pcs', 1.0),
+    ('pieces', 'pcs', 1.0),
+    ('x', 'pcs', 1.0),
+    ('dozen', 'pcs', 12.0)
+)
+UPDATE recipes SET main_ingredients = (
+  SELECT jsonb_agg(item.value || jsonb_build_object(
+           'canonical_quantity', (item.value->>'quantity')::double precision * COALESCE(units.factor, 1.0),
+           'canonical_unit', COALESCE(units.base_unit, lower(trim(item.value->>'unit'))))
+         ORDER BY item.position)
+  FROM jsonb_array_elements(recipes.main_ingredients) WITH ORDINALITY AS item(value, position)
+  LEFT JOIN units ON units.unit = lower(trim(item.value->>'unit'))
+)
+-- Only rows with an ingredient still missing its canonical values, so re-running is a no-op
+WHERE jsonb_typeof(main_ingredients) = 'array'
+  AND EXISTS (SELECT 1 FROM jsonb_array_elements(main_ingredients) AS item WHERE NOT item ? 'canonical_quantity');
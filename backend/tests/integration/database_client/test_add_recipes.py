@@ -0,0 +1,24 @@
+"""
+Tests for database client add_recipes batch insert functionality
+"""
+from .conftest import TEST_RECIPE_DATA
+
+
+class TestAddRecipes:
+    """Test the multi-row add_recipes method"""
+    
+    def test_add_recipes_returns_rows_in_order(self, db_client):
+        """Test that each input recipe gets its own committed row, in input order"""
+        # Connect to database
+        db_client.connect()
+        
+        names = [f"Batch Recipe {i}" for i in range(5)]
+        recipes = db_client.add_recipes([{**TEST_RECIPE_DATA, 'name': name} for name in names])
+        
+        try:
+            assert [recipe['name'] for recipe in recipes] == names
+            assert len({recipe['id'] for recipe in recipes}) == 5
+            assert db_client.get_recipe_by_id(recipes[0]['id'])['name'] == names[0]
+        finally:
+            for recipe in recipes:
+                db_client.delete_recipe(recipe['id'])
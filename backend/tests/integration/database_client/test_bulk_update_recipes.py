@@ -0,0 +1,34 @@
+"""
+Tests for database client bulk_update_recipes functionality
+"""
+from .conftest import TEST_RECIPE_DATA
+
+
+class TestBulkUpdateRecipes:
+    """Test grouped bulk updates"""
+    
+    def test_bulk_update(self, db_client):
+        """Test mixed field sets, a stale version and an unknown id in one call"""
+        # Connect to database
+        db_client.connect()
+        
+        first = db_client.add_recipe(**TEST_RECIPE_DATA)
+        second = db_client.add_recipe(**TEST_RECIPE_DATA)
+        
+        try:
+            results = db_client.bulk_update_recipes([
+                {'id': first['id'], 'category': 'dinner', 'common_ingredients': ['pepper']},
+                {'id': second['id'], 'prep_time': 5, 'version': second['version'] + 10},
+                {'id': 999999, 'category': 'dinner'},
+            ])
+            
+            assert [result['status'] for result in results] == ['updated', 'conflict', 'not_found']
+            assert results[0]['version'] == first['version'] + 1
+            
+            recipe = db_client.get_recipe_by_id(first['id'])
+            assert recipe['category'] == 'dinner'
+            assert recipe['common_ingredients'] == ['pepper']
+            assert db_client.get_recipe_by_id(second['id'])['prep_time'] == TEST_RECIPE_DATA['prep_time']
+        finally:
+            db_client.delete_recipe(first['id'])
+            db_client.delete_recipe(second['id'])
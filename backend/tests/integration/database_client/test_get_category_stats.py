@@ -0,0 +1,22 @@
+"""
+Tests for database client get_category_stats functionality
+"""
+
+
+class TestGetCategoryStats:
+    """Test the get_category_stats functionality"""
+    
+    def test_get_category_stats_matches_recipes(self, db_client):
+        """Test that per-category counts add up to the number of recipes"""
+        # Connect to database
+        db_client.connect()
+        
+        stats = db_client.get_category_stats()
+        recipes = db_client.get_all_recipes()
+        
+        assert isinstance(stats, list)
+        assert sum(entry['count'] for entry in stats) == len(recipes)
+        
+        for entry in stats:
+            expected = [r for r in recipes if r['category'] == entry['category']]
+            assert entry['count'] == len(expected)
@@ -0,0 +1,51 @@
+"""
+Tests for database client get_plan_candidates functionality
+"""
+from .conftest import TEST_RECIPE_DATA
+
+
+class TestGetPlanCandidates:
+    """Test the get_plan_candidates functionality"""
+    
+    def test_candidates_respect_constraints(self, db_client):
+        """Test that category and prep time filters are applied"""
+        # Connect to database
+        db_client.connect()
+        
+        candidates = db_client.get_plan_candidates(['lunch', 'dinner'], max_prep_time=30)
+        
+        for candidate in candidates:
+            assert candidate['category'] in ('lunch', 'dinner')
+            assert candidate['prep_time'] <= 30
+    
+    def test_excluded_ingredients(self, db_client):
+        """Test that recipes containing an excluded ingredient are dropped"""
+        # Connect to database
+        db_client.connect()
+        
+        new_recipe = db_client.add_recipe(**TEST_RECIPE_DATA)
+        
+        # A limit above the table size returns every match, so the new recipe is in the sample however many exist
+        everything = 10 ** 9
+        try:
+            included = db_client.get_plan_candidates(['lunch'], per_category_limit=everything)
+            excluded_main = db_client.get_plan_candidates(
+                ['lunch'], excluded_ingredients=['Chicken'], per_category_limit=everything)
+            excluded_common = db_client.get_plan_candidates(
+                ['lunch'], excluded_ingredients=['olive oil'], per_category_limit=everything)
+            
+            assert new_recipe['id'] in [c['id'] for c in included]
+            assert new_recipe['id'] not in [c['id'] for c in excluded_main]
+            assert new_recipe['id'] not in [c['id'] for c in excluded_common]
+        finally:
+            db_client.delete_recipe(new_recipe['id'])
+    
+    def test_per_category_limit(self, db_client):
+        """Test that the candidate pool is capped per category"""
+        # Connect to database
+        db_client.connect()
+        
+        candidates = db_client.get_plan_candidates(['breakfast', 'lunch', 'dinner', 'snack'], per_category_limit=1)
+        
+        categories = [c['category'] for c in candidates]
+        assert len(categories) == len(set(categories))
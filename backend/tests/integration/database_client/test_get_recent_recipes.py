@@ -0,0 +1,50 @@
+"""
+Tests for database client get_recent_recipes functionality
+"""
+from .conftest import TEST_RECIPE_DATA
+
+
+class TestGetRecentRecipes:
+    """Test the get_recent_recipes functionality"""
+    
+    def test_new_recipe_is_most_recent(self, db_client):
+        """Test that a freshly added recipe comes first in the feed"""
+        # Connect to database
+        db_client.connect()
+        
+        new_recipe = db_client.add_recipe(**TEST_RECIPE_DATA)
+        
+        try:
+            recent = db_client.get_recent_recipes(limit=1)
+            
+            assert len(recent) == 1
+            assert recent[0]['id'] == new_recipe['id']
+            assert set(recent[0].keys()) == {'id', 'name', 'category', 'prep_time', 'updated_at'}
+        finally:
+            db_client.delete_recipe(new_recipe['id'])
+    
+    def test_updated_recipe_moves_to_top(self, db_client):
+        """Test that updating a recipe bumps it to the top of the feed"""
+        # Connect to database
+        db_client.connect()
+        
+        first = db_client.add_recipe(**TEST_RECIPE_DATA)
+        second = db_client.add_recipe(**TEST_RECIPE_DATA)
+        
+        try:
+            db_client.update_recipe(first['id'], {'prep_time': 40})
+            recent = db_client.get_recent_recipes(limit=2)
+            
+            assert [r['id'] for r in recent] == [first['id'], second['id']]
+        finally:
+            db_client.delete_recipe(first['id'])
+            db_client.delete_recipe(second['id'])
+    
+    def test_limit_is_respected(self, db_client):
+        """Test that the feed never returns more rows than requested"""
+        # Connect to database
+        db_client.connect()
+        
+        recent = db_client.get_recent_recipes(limit=3)
+        
+        assert len(recent) <= 3
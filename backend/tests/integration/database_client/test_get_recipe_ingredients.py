@@ -0,0 +1,25 @@
+"""
+Tests for database client get_recipe_ingredients functionality
+"""
+from .conftest import TEST_RECIPE_DATA
+
+
+class TestGetRecipeIngredients:
+    """Test the get_recipe_ingredients functionality"""
+    
+    def test_get_recipe_ingredients(self, db_client):
+        """Test that many recipes are returned in one call and unknown ids are skipped"""
+        # Connect to database
+        db_client.connect()
+        
+        new_recipe = db_client.add_recipe(**TEST_RECIPE_DATA)
+        
+        try:
+            recipes = db_client.get_recipe_ingredients([new_recipe['id'], 999999])
+            
+            assert len(recipes) == 1
+            assert recipes[0]['id'] == new_recipe['id']
+            assert recipes[0]['portions'] == TEST_RECIPE_DATA['portions']
+            assert [i['name'] for i in recipes[0]['main_ingredients']] == ['chicken', 'tomato', 'onion', 'potato']
+        finally:
+            db_client.delete_recipe(new_recipe['id'])
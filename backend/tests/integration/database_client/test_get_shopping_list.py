@@ -0,0 +1,91 @@
+"""
+Tests for database client get_shopping_list functionality
+"""
+from .conftest import TEST_RECIPE_DATA
+
+
+class TestGetShoppingList:
+    """Test the get_shopping_list functionality"""
+    
+    def test_scaled_and_merged_ingredients(self, db_client):
+        """Test that quantities are scaled by portions and summed per ingredient"""
+        # Connect to database
+        db_client.connect()
+        
+        # TEST_RECIPE_DATA serves 2 with 300 g of tomato
+        first = db_client.add_recipe(**TEST_RECIPE_DATA)
+        second = db_client.add_recipe(**TEST_RECIPE_DATA)
+        
+        try:
+            result = db_client.get_shopping_list([
+                {'recipe_id': first['id'], 'portions': 4},
+                {'recipe_id': second['id'], 'portions': None},
+            ])
+            
+            tomato = [i for i in result['main_ingredients'] if i['name'] == 'tomato' and i['unit'] == 'g']
+            assert tomato == [{'name': 'tomato', 'unit': 'g', 'quantity': 900.0}]
+            assert result['common_ingredients'].count('salt') == 1
+            assert 'olive oil' in result['common_ingredients']
+            assert result['missing_recipe_ids'] == []
+        finally:
+            db_client.delete_recipe(first['id'])
+            db_client.delete_recipe(second['id'])
+    
+    def test_units_are_merged(self, db_client):
+        """Test that quantities in different units of the same dimension are merged"""
+        # Connect to database
+        db_client.connect()
+        
+        grams = db_client.add_recipe(**{**TEST_RECIPE_DATA, "main_ingredients": [
+            {"name": "tomato", "unit": "g", "quantity": 500}
+        ]})
+        kilograms = db_client.add_recipe(**{**TEST_RECIPE_DATA, "main_ingredients": [
+            {"name": "Tomato", "unit": "kg", "quantity": 0.5}
+        ]})
+        
+        try:
+            result = db_client.get_shopping_list([
+                {'recipe_id': grams['id'], 'portions': None},
+                {'recipe_id': kilograms['id'], 'portions': None},
+            ])
+            
+            assert result['main_ingredients'] == [{'name': 'tomato', 'unit': 'g', 'quantity': 1000.0}]
+        finally:
+            db_client.delete_recipe(grams['id'])
+            db_client.delete_recipe(kilograms['id'])
+    
+    def test_missing_recipes_are_reported(self, db_client):
+        """Test that unknown recipe ids are listed as missing"""
+        # Connect to database
+        db_client.connect()
+        
+        result = db_client.get_shopping_list([{'recipe_id': 999999, 'portions': 2}])
+        
+        assert result['main_ingredients'] == []
+        assert result['missing_recipe_ids'] == [999999]
+    
+    def test_legacy_rows_without_quantity(self, db_client):
+        """Test that stored ingredients lacking a quantity are listed without one instead of failing the list"""
+        # Connect to database
+        db_client.connect()
+        
+        # Written directly, as rows from before input validation were
+        cursor = db_client._connection.cursor()
+        cursor.execute("""
+            INSERT INTO recipes (name, category, main_ingredients, common_ingredients, instructions, portions)
+            VALUES ('Legacy Stock', 'dinner', %s::jsonb, ARRAY['salt'], 'Simmer', 2)
+            RETURNING id
+        """, ('[{"name": "water", "unit": "ml"}, {"name": "carrot", "unit": "pcs", "quantity": 2}]',))
+        recipe_id = cursor.fetchone()[0]
+        db_client._connection.commit()
+        cursor.close()
+        
+        try:
+            result = db_client.get_shopping_list([{'recipe_id': recipe_id, 'portions': 4}])
+            
+            assert result['main_ingredients'] == [
+                {'name': 'carrot', 'unit': 'pcs', 'quantity': 4.0},
+                {'name': 'water', 'unit': 'ml', 'quantity': None},
+            ]
+        finally:
+            db_client.delete_recipe(recipe_id)
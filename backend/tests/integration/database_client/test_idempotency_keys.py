@@ -0,0 +1,39 @@
+"""
+Tests for database client idempotency key storage
+"""
+from .conftest import TEST_RECIPE_DATA
+
+
+class TestIdempotencyKeys:
+    """Test claiming, completing and replaying idempotency keys"""
+    
+    def test_claim_complete_replay(self, db_client):
+        """Test that a completed key replays its response and a rolled back claim frees the key"""
+        # Connect to database
+        db_client.connect()
+        
+        key = 'integration-test-key'
+        new_recipe = None
+        
+        try:
+            assert db_client.claim_idempotency_key(key, 'hash', 60) is None
+            new_recipe = db_client.add_recipe(**TEST_RECIPE_DATA, commit=False)
+            db_client.complete_idempotency_key(key, 201, {'id': new_recipe['id']})
+            
+            stored = db_client.claim_idempotency_key(key, 'hash', 60)
+            assert stored['status_code'] == 201
+            assert stored['response_body'] == {'id': new_recipe['id']}
+            
+            # A claim that is rolled back leaves no trace
+            other_key = 'integration-test-key-rolled-back'
+            assert db_client.claim_idempotency_key(other_key, 'hash', 60) is None
+            db_client._connection.rollback()
+            assert db_client.claim_idempotency_key(other_key, 'hash', 60) is None
+            db_client._connection.rollback()
+        finally:
+            cursor = db_client._connection.cursor()
+            cursor.execute("DELETE FROM idempotency_keys WHERE key = %s", (key,))
+            db_client._connection.commit()
+            cursor.close()
+            if new_recipe:
+                db_client.delete_recipe(new_recipe['id'])
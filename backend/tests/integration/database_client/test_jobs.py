@@ -0,0 +1,43 @@
+"""
+Tests for database client background job queue functionality
+"""
+from app.database_client import DatabaseClient
+
+
+class TestJobQueue:
+    """Test enqueueing, claiming and finishing jobs"""
+    
+    def test_job_lifecycle(self, db_client):
+        """Test that a claimed job is invisible to a second worker and retries after failing"""
+        # Connect to database
+        db_client.connect()
+        other_worker = DatabaseClient()
+        other_worker.connect()
+        
+        job = db_client.enqueue_job('recipe_export', {}, max_attempts=2)
+        
+        try:
+            claimed = db_client.dequeue_job()
+            assert claimed['id'] == job['id']
+            assert claimed['status'] == 'running'
+            assert claimed['attempts'] == 1
+            
+            # The job is running, so another worker does not get it again
+            other = other_worker.dequeue_job()
+            assert other is None or other['id'] != job['id']
+            
+            db_client.fail_job(job['id'], "boom", 0)
+            assert db_client.get_job(job['id'])['status'] == 'queued'
+            
+            db_client.dequeue_job()
+            db_client.complete_job(job['id'], {'count': 0})
+            finished = db_client.get_job(job['id'])
+            assert finished['status'] == 'succeeded'
+            assert finished['result'] == {'count': 0}
+            assert finished['attempts'] == 2
+        finally:
+            cursor = db_client._connection.cursor()
+            cursor.execute("DELETE FROM jobs WHERE id = %s", (job['id'],))
+            db_client._connection.commit()
+            cursor.close()
+            other_worker.disconnect()
@@ -0,0 +1,39 @@
+"""
+Tests for database client saved meal plan functionality
+"""
+from .conftest import TEST_RECIPE_DATA
+
+
+class TestMealPlans:
+    """Test saving, loading, updating and deleting meal plans"""
+    
+    def test_meal_plan_lifecycle(self, db_client):
+        """Test that a plan round-trips with its recipes and shopping list"""
+        # Connect to database
+        db_client.connect()
+        
+        new_recipe = db_client.add_recipe(**TEST_RECIPE_DATA)
+        plan = None
+        
+        try:
+            plan = db_client.create_meal_plan('Test Week', entries=[
+                {'day': 2, 'category': 'dinner', 'recipe_id': new_recipe['id'], 'portions': None},
+                {'day': 1, 'category': 'dinner', 'recipe_id': new_recipe['id'], 'portions': None},
+            ])
+            
+            assert [entry['day'] for entry in plan['entries']] == [1, 2]
+            assert plan['entries'][0]['recipe']['name'] == TEST_RECIPE_DATA['name']
+            
+            loaded = db_client.get_meal_plan(plan['id'], include_shopping_list=True)
+            chicken = [i for i in loaded['shopping_list']['main_ingredients'] if i['name'] == 'chicken']
+            assert len(chicken) == 1
+            
+            updated = db_client.update_meal_plan(plan['id'], {'name': 'Renamed', 'entries': []})
+            assert updated['name'] == 'Renamed'
+            assert updated['entries'] == []
+        finally:
+            if plan:
+                assert db_client.delete_meal_plan(plan['id'])
+            db_client.delete_recipe(new_recipe['id'])
+        
+        assert db_client.get_meal_plan(plan['id']) is None
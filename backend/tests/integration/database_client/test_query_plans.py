@@ -0,0 +1,272 @@
+"""
+Query-plan regression tests for the statements DatabaseClient emits.
+A scaled synthetic dataset is loaded, each client call runs with its statements captured, and every
+captured statement is re-planned with EXPLAIN (FORMAT JSON) so a lost index or new sort fails the build.
+"""
+import os
+import pytest
+from unittest.mock import patch
+from app.database_client import DatabaseClient
+from app.metrics import current_db_method
+from benchmarks.dataset import generate_recipes, copy_recipes
+from .conftest import TEST_RECIPE_DATA
+
+PLAN_PREFIX = "plan-"
+
+# Large enough that the planner prefers indexes over scanning the table
+PLAN_DATASET_SIZE = int(os.getenv("PLAN_TEST_RECIPES", "20000"))
+
+
+@pytest.fixture(scope="module")
+def plan_db():
+    """Database client over a table seeded with the synthetic dataset"""
+    client = DatabaseClient()
+    client.connect()
+    copy_recipes(client, generate_recipes(PLAN_DATASET_SIZE, seed=7, name_prefix=PLAN_PREFIX))
+    # copy_recipes analyzes recipes; refresh the tables its triggers filled too
+    cursor = client._connection.cursor()
+    cursor.execute("ANALYZE recipe_ingredients")
+    cursor.execute("ANALYZE recipe_neighbors")
+    client._connection.commit()
+    cursor.close()
+    yield client
+    cursor = client._connection.cursor()
+    cursor.execute("DELETE FROM recipes WHERE name LIKE %s", (PLAN_PREFIX + "%",))
+    cursor.execute("DELETE FROM recipe_similarity_dirty WHERE recipe_id NOT IN (SELECT id FROM recipes)")
+    client._connection.commit()
+    # Without this the next run's trigger statements are planned on stale stats over the dead rows
+    client._connection.autocommit = True
+    cursor.execute("VACUUM ANALYZE recipes, recipe_ingredients, recipe_neighbors, recipe_similarity_dirty")
+    cursor.close()
+    client.disconnect()
+
+
+@pytest.fixture(scope="module")
+def plan_ids(plan_db):
+    """A few ids from the seeded dataset"""
+    cursor = plan_db._connection.cursor()
+    cursor.execute("SELECT id FROM recipes WHERE name LIKE %s ORDER BY id LIMIT 5", (PLAN_PREFIX + "%",))
+    ids = [row[0] for row in cursor.fetchall()]
+    plan_db._connection.rollback()
+    cursor.close()
+    return ids
+
+
+def explain_calls(db_client, call):
+    """Run call with its statements captured and return (method, statement, plan) for each of them"""
+    captured = []
+
+    def capture(cursor, query, params, seconds):
+        statement = cursor.mogrify(query, params)
+        if statement.strip() != b"SELECT 1":
+            captured.append((current_db_method.get(), statement))
+
+    with patch('app.query_log.record_statement', side_effect=capture):
+        call()
+
+    plans = []
+    cursor = db_client._connection.cursor()
+    for method, statement in captured:
+        cursor.execute(b"EXPLAIN (FORMAT JSON) " + statement)
+        plans.append((method, statement.decode(), cursor.fetchone()[0][0]['Plan']))
+    db_client._connection.rollback()
+    cursor.close()
+    assert plans, "call executed no statements"
+    return plans
+
+
+def plan_nodes(plan):
+    """All nodes of a plan tree, depth first"""
+    nodes = [plan]
+    for child in plan.get('Plans', []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+def seq_scans(plan, relation="recipes"):
+    """Sequential scans on a relation"""
+    return [node for node in plan_nodes(plan) if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') == relation]
+
+
+def index_names(plan):
+    """Indexes used anywhere in the plan"""
+    return {node['Index Name'] for node in plan_nodes(plan) if 'Index Name' in node}
+
+
+def sorts(plan):
+    """Explicit sort nodes"""
+    return [node for node in plan_nodes(plan) if node['Node Type'] in ('Sort', 'Incremental Sort')]
+
+
+def unindexed_filters(plan, relation="recipes"):
+    """Filters on a relation that are checked row by row instead of through an index condition"""
+    return [node['Filter'] for node in plan_nodes(plan)
+            if node.get('Relation Name') == relation and 'Filter' in node and 'Index Cond' not in node]
+
+
+def assert_no_recipes_seq_scan(plans, relations=("recipes",)):
+    """Fail with the offending statement if any plan scans the whole of one of the relations"""
+    for method, statement, plan in plans:
+        for relation in relations:
+            assert not seq_scans(plan, relation), f"{method} seq-scans {relation}:\n{statement}"
+
+
+class TestPointLookups:
+    """Single-recipe reads and writes must go through the primary key"""
+    
+    def test_get_recipe_by_id(self, plan_db, plan_ids):
+        """Test that a lookup by id is an index scan returning at most one row"""
+        plans = explain_calls(plan_db, lambda: plan_db.get_recipe_by_id(plan_ids[0]))
+        
+        assert_no_recipes_seq_scan(plans)
+        for method, statement, plan in plans:
+            assert plan['Plan Rows'] <= 1, statement
+    
+    def test_update_recipe(self, plan_db, plan_ids):
+        """Test that plain and conditional updates locate the row by index"""
+        plans = explain_calls(plan_db, lambda: plan_db.update_recipe(plan_ids[1], {'prep_time': 25}))
+        version = plan_db.get_recipe_by_id(plan_ids[1])['version']
+        plans += explain_calls(
+            plan_db, lambda: plan_db.update_recipe(plan_ids[1], {'portions': 3}, expected_version=version))
+        
+        assert_no_recipes_seq_scan(plans)
+        assert any(statement.lstrip().startswith("UPDATE") for _, statement, _ in plans)
+    
+    def test_bulk_update_recipes(self, plan_db, plan_ids):
+        """Test that a bulk update joins its VALUES list to recipes by index"""
+        items = [{'id': recipe_id, 'prep_time': 40} for recipe_id in plan_ids[2:5]]
+        plans = explain_calls(plan_db, lambda: plan_db.bulk_update_recipes(items))
+        
+        assert_no_recipes_seq_scan(plans)
+    
+    def test_delete_recipe(self, plan_db):
+        """Test that a delete by id is an index scan"""
+        recipe = plan_db.add_recipe(**{**TEST_RECIPE_DATA, 'name': PLAN_PREFIX + "delete me"})
+        plans = explain_calls(plan_db, lambda: plan_db.delete_recipe(recipe['id']))
+        
+        assert_no_recipes_seq_scan(plans)
+        for method, statement, plan in plans:
+            assert plan['Plan Rows'] <= 1, statement
+
+
+class TestListsAndFilters:
+    """Paged and filtered reads must use their indexes and avoid sorting the table"""
+    
+    def test_recent_recipes(self, plan_db):
+        """Test that recent recipes walk idx_recipes_updated_at without a sort"""
+        plans = explain_calls(plan_db, lambda: plan_db.get_recent_recipes(10))
+        
+        for method, statement, plan in plans:
+            assert 'idx_recipes_updated_at' in index_names(plan), statement
+            assert not sorts(plan), statement
+            assert plan['Plan Rows'] <= 10, statement
+    
+    def test_search_page_without_filters(self, plan_db):
+        """Test that the first unfiltered page reads in primary key order without a sort"""
+        plans = explain_calls(plan_db, lambda: plan_db.search_recipes(limit=20, include_facets=False))
+        
+        for method, statement, plan in plans:
+            assert not sorts(plan), statement
+            assert plan['Plan Rows'] <= 20, statement
+    
+    def test_search_by_category(self, plan_db):
+        """Test that a category page needs no sort and its facets come from a single pass over recipes"""
+        plans = explain_calls(
+            plan_db, lambda: plan_db.search_recipes(category='snack', limit=20, include_facets=True))
+        (_, page_statement, page), (_, facets_statement, facets) = plans
+        
+        # At a 10% share the planner may walk recipes_pkey instead; either index already yields id order
+        assert not sorts(page), page_statement
+        assert not seq_scans(page), page_statement
+        assert page['Plan Rows'] <= 20
+        # 10% of the table is cheaper to seq-scan than to fetch through idx_recipes_category; either is one scan
+        scans = [node for node in plan_nodes(facets) if node.get('Relation Name') == 'recipes']
+        assert len(scans) == 1, facets_statement
+    
+    def test_get_all_recipes_scans_once(self, plan_db):
+        """Test that listing every recipe is a single pass over the table"""
+        plans = explain_calls(plan_db, lambda: plan_db.get_all_recipes())
+        
+        for method, statement, plan in plans:
+            scans = [node for node in plan_nodes(plan) if node.get('Relation Name') == 'recipes']
+            assert len(scans) == 1, statement
+    
+    def test_name_search_is_a_known_seq_scan(self, plan_db):
+        """Test the documented exception: substring name search has no supporting index yet"""
+        plans = explain_calls(plan_db, lambda: plan_db.search_recipes(query='stew', include_facets=False))
+        
+        # Update this test when a trigram index is added for name ILIKE
+        assert any('~~*' in condition for condition in unindexed_filters(plans[0][2]))
+    
+    def test_search_by_range_filters(self, plan_db):
+        """Test that a range-only page walks the primary key, and the documented exception for its facets"""
+        plans = explain_calls(
+            plan_db, lambda: plan_db.search_recipes(max_prep_time=20, min_portions=4, limit=20, include_facets=True))
+        (_, page_statement, page), (_, facets_statement, facets) = plans
+        
+        assert not seq_scans(page), page_statement
+        assert not sorts(page), page_statement
+        # prep_time and portions have no index, and facets count every matching row; update this test if one is added
+        assert len(seq_scans(facets)) == 1, facets_statement
+
+
+class TestMultiRecipeReads:
+    """Reads of several recipes at once must stay index driven"""
+    
+    def test_recipe_ingredients(self, plan_db, plan_ids):
+        """Test that a handful of recipes are fetched by primary key"""
+        plans = explain_calls(plan_db, lambda: plan_db.get_recipe_ingredients(plan_ids[:3]))
+        
+        assert_no_recipes_seq_scan(plans)
+        for method, statement, plan in plans:
+            assert plan['Plan Rows'] <= 3, statement
+    
+    def test_similar_recipes(self, plan_db, plan_ids):
+        """Test that neighbours are joined to recipes by primary key"""
+        plans = explain_calls(plan_db, lambda: plan_db.get_similar_recipes(plan_ids[0]))
+        
+        assert_no_recipes_seq_scan(plans)
+
+
+class TestMealPlanning:
+    """Plan generation, shopping lists and saved plans must reach recipes and ingredients through indexes"""
+    
+    def test_plan_candidates(self, plan_db):
+        """Test that each category is walked in id order from a sampled start, with exclusions probed by index"""
+        plans = explain_calls(plan_db, lambda: plan_db.get_plan_candidates(
+            ['breakfast', 'lunch', 'dinner'], max_prep_time=60, excluded_ingredients=['garlic'], per_category_limit=50))
+        
+        assert_no_recipes_seq_scan(plans, ("recipes", "recipe_ingredients"))
+        for method, statement, plan in plans:
+            # Either index yields id order; at these category shares the planner may prefer the primary key
+            assert index_names(plan) & {'idx_recipes_category', 'recipes_pkey'}, statement
+            assert any(node['Node Type'] == 'Sample Scan' for node in plan_nodes(plan)), statement
+    
+    def test_shopping_list(self, plan_db, plan_ids):
+        """Test that the requested recipes are fetched by primary key"""
+        items = [{'recipe_id': recipe_id, 'portions': 2} for recipe_id in plan_ids]
+        plans = explain_calls(plan_db, lambda: plan_db.get_shopping_list(items))
+        
+        assert_no_recipes_seq_scan(plans, ("recipes", "recipe_ingredients"))
+    
+    def test_saved_plans(self, plan_db, plan_ids):
+        """Test that creating, reading, listing and updating a plan never scans recipes.
+
+        The meal plan tables hold a handful of rows here, so scans of them are not checked.
+        """
+        entries = [{'day': day, 'category': 'dinner', 'recipe_id': recipe_id, 'portions': 2}
+                   for day, recipe_id in enumerate(plan_ids[:3], start=1)]
+        created = []
+        try:
+            plans = explain_calls(
+                plan_db, lambda: created.append(plan_db.create_meal_plan(PLAN_PREFIX + "week", entries=entries)))
+            plan_id = created[0]['id']
+            plans += explain_calls(plan_db, lambda: plan_db.get_meal_plan(plan_id, include_shopping_list=True))
+            plans += explain_calls(plan_db, lambda: plan_db.list_meal_plans())
+            plans += explain_calls(plan_db, lambda: plan_db.get_meal_plan_items([plan_id]))
+            plans += explain_calls(plan_db, lambda: plan_db.update_meal_plan(plan_id, {'entries': entries[:1]}))
+            
+            assert_no_recipes_seq_scan(plans, ("recipes", "recipe_ingredients"))
+        finally:
+            for plan in created:
+                plan_db.delete_meal_plan(plan['id'])
@@ -0,0 +1,45 @@
+"""
+Tests for keeping the normalized ingredient tables in sync with recipe writes
+"""
+from .conftest import TEST_RECIPE_DATA
+
+
+def normalized_names(db_client, recipe_id):
+    """Read a recipe's ingredient names back from recipe_ingredients"""
+    cursor = db_client._connection.cursor()
+    cursor.execute("""
+        SELECT ingredients.name
+        FROM recipe_ingredients
+        JOIN ingredients ON ingredients.id = recipe_ingredients.ingredient_id
+        WHERE recipe_id = %s
+        ORDER BY is_common, position
+    """, (recipe_id,))
+    names = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return names
+
+
+class TestRecipeIngredientsSync:
+    """Test that add/update/delete maintain recipe_ingredients"""
+    
+    def test_rows_follow_recipe_writes(self, db_client):
+        """Test that normalized rows are written, replaced and removed with the recipe"""
+        # Connect to database
+        db_client.connect()
+        
+        new_recipe = db_client.add_recipe(**TEST_RECIPE_DATA)
+        
+        try:
+            expected = [i['name'] for i in TEST_RECIPE_DATA['main_ingredients']] + TEST_RECIPE_DATA['common_ingredients']
+            assert normalized_names(db_client, new_recipe['id']) == [name.lower() for name in expected]
+            
+            db_client.update_recipe(new_recipe['id'], {'common_ingredients': ['Pepper']})
+            assert normalized_names(db_client, new_recipe['id'])[-1:] == ['pepper']
+            
+            # The response shape still comes from the JSONB column
+            recipe = db_client.get_recipe_by_id(new_recipe['id'])
+            assert recipe['common_ingredients'] == ['Pepper']
+        finally:
+            db_client.delete_recipe(new_recipe['id'])
+        
+        assert normalized_names(db_client, new_recipe['id']) == []
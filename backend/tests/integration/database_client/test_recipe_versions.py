@@ -0,0 +1,33 @@
+"""
+Tests for database client optimistic concurrency on recipes
+"""
+import pytest
+from app.database_client import VersionConflictError
+from .conftest import TEST_RECIPE_DATA
+
+
+class TestRecipeVersions:
+    """Test version-guarded updates and deletes"""
+    
+    def test_concurrent_editors(self, db_client):
+        """Test that the second writer holding the same version is rejected"""
+        # Connect to database
+        db_client.connect()
+        
+        new_recipe = db_client.add_recipe(**TEST_RECIPE_DATA)
+        
+        try:
+            version = new_recipe['version']
+            
+            updated = db_client.update_recipe(new_recipe['id'], {'name': 'First Editor'}, expected_version=version)
+            assert updated['version'] == version + 1
+            
+            with pytest.raises(VersionConflictError):
+                db_client.update_recipe(new_recipe['id'], {'name': 'Second Editor'}, expected_version=version)
+            
+            with pytest.raises(VersionConflictError):
+                db_client.delete_recipe(new_recipe['id'], expected_version=version)
+            
+            assert db_client.get_recipe_by_id(new_recipe['id'])['name'] == 'First Editor'
+        finally:
+            db_client.delete_recipe(new_recipe['id'])
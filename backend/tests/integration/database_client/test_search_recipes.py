@@ -0,0 +1,37 @@
+"""
+Tests for database client search_recipes functionality
+"""
+from .conftest import TEST_RECIPE_DATA
+
+
+class TestSearchRecipes:
+    """Test the search_recipes functionality"""
+    
+    def test_search_finds_new_recipe(self, db_client):
+        """Test that a recipe can be found by name with matching facets"""
+        # Connect to database
+        db_client.connect()
+        
+        new_recipe = db_client.add_recipe(**{**TEST_RECIPE_DATA, "name": "Facet Search Soup"})
+        
+        try:
+            result = db_client.search_recipes(query='facet search', category='lunch')
+            
+            assert result['total'] >= 1
+            assert new_recipe['id'] in [r['id'] for r in result['recipes']]
+            assert result['facets']['category'].get('lunch') == result['total']
+            assert sum(result['facets']['prep_time'].values()) <= result['total']
+            assert result['facets']['prep_time']['30-60'] >= 1
+            assert result['facets']['portions']['1-2'] >= 1
+        finally:
+            db_client.delete_recipe(new_recipe['id'])
+    
+    def test_search_without_facets(self, db_client):
+        """Test that facets are skipped on request"""
+        # Connect to database
+        db_client.connect()
+        
+        result = db_client.search_recipes(limit=1, include_facets=False)
+        
+        assert result['facets'] is None
+        assert len(result['recipes']) <= 1
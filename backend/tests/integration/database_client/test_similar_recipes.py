@@ -0,0 +1,63 @@
+"""
+Tests for the recipe similarity index against the database
+"""
+from app.similarity import refresh_neighbors
+from .conftest import TEST_RECIPE_DATA
+
+
+class TestSimilarRecipes:
+    """Test the similarity refresh job and get_similar_recipes"""
+    
+    def test_incremental_refresh_links_similar_recipes(self, db_client):
+        """Test that writes are picked up by the incremental refresh"""
+        # Connect to database
+        db_client.connect()
+        
+        first = db_client.add_recipe(**TEST_RECIPE_DATA)
+        second = db_client.add_recipe(**TEST_RECIPE_DATA)
+        
+        try:
+            # Both inserts were marked dirty by the write trigger
+            dirty_ids = [recipe_id for recipe_id, _ in db_client.get_dirty_similarity_markers()]
+            assert first['id'] in dirty_ids and second['id'] in dirty_ids
+            
+            refresh_neighbors(db_client)
+            
+            similar = db_client.get_similar_recipes(first['id'], 20)
+            assert second['id'] in [r['id'] for r in similar]
+            assert db_client.get_dirty_similarity_markers() == []
+        finally:
+            db_client.delete_recipe(first['id'])
+            db_client.delete_recipe(second['id'])
+    
+    def test_edit_that_lowers_similarity_drops_stale_neighbour(self, db_client):
+        """Test that recipes listing an edited recipe are recomputed even when its score only fell"""
+        # Connect to database
+        db_client.connect()
+        
+        first = db_client.add_recipe(**TEST_RECIPE_DATA)
+        second = db_client.add_recipe(**TEST_RECIPE_DATA)
+        
+        try:
+            refresh_neighbors(db_client)
+            assert second['id'] in [r['id'] for r in db_client.get_similar_recipes(first['id'], 20)]
+            
+            # Nothing in common with the first recipe any more
+            db_client.update_recipe(second['id'], {
+                'category': 'snack' if TEST_RECIPE_DATA['category'] != 'snack' else 'breakfast',
+                'main_ingredients': [{'name': 'unobtainium', 'unit': 'g', 'quantity': 1}],
+                'common_ingredients': []
+            })
+            refresh_neighbors(db_client)
+            
+            assert second['id'] not in [r['id'] for r in db_client.get_similar_recipes(first['id'], 20)]
+        finally:
+            db_client.delete_recipe(first['id'])
+            db_client.delete_recipe(second['id'])
+    
+    def test_missing_recipe(self, db_client):
+        """Test that a missing recipe returns None"""
+        # Connect to database
+        db_client.connect()
+        
+        assert db_client.get_similar_recipes(999999) is None
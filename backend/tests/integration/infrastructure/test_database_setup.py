@@ -89,7 +89,10 @@ class TestDatabaseInfrastructure:
             'prep_time': ('integer', 'YES'),
             'portions': ('integer', 'YES'),
             'common_ingredients': ('ARRAY', 'YES'),
-            'main_ingredients': ('jsonb', 'YES')
+            'main_ingredients': ('jsonb', 'YES'),
+            'created_at': ('timestamp with time zone', 'NO'),
+            'updated_at': ('timestamp with time zone', 'NO'),
+            'version': ('integer', 'NO')
         }
         
         # Convert to dict for easier checking
@@ -4,12 +4,21 @@ Shared test configuration and fixtures for unit tests
 import pytest
 import os
 from dotenv import load_dotenv
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
+from app.database_client import close_pools
 
 # Load test environment variables
 load_dotenv(os.path.join(os.path.dirname(__file__), '..', '..', '.env.test'))
 
 
+@pytest.fixture(autouse=True)
+def no_connection_pool():
+    """Keep unit tests from opening pooled connections; tests of the pool patch DB_POOL_SIZE themselves"""
+    with patch('app.database_client.DB_POOL_SIZE', 0):
+        yield
+    close_pools()
+
+
 # Common test data for recipes
 SAMPLE_RECIPE_1 = {
     'id': 1,
@@ -19,7 +28,8 @@ SAMPLE_RECIPE_1 = {
     'common_ingredients': ['salt', 'pepper'],
     'instructions': 'Cook it',
     'prep_time': 30,
-    'portions': 4
+    'portions': 4,
+    'version': 1
 }
 
 SAMPLE_RECIPE_2 = {
@@ -30,7 +40,8 @@ SAMPLE_RECIPE_2 = {
     'common_ingredients': ['salt'],
     'instructions': 'Cook rice',
     'prep_time': 20,
-    'portions': 2
+    'portions': 2,
+    'version': 1
 }
 
 # Test data for creating recipes (without ID)
@@ -69,7 +80,8 @@ UPDATED_RECIPE_RESPONSE = {
     'common_ingredients': ['salt', 'pepper'],
     'instructions': 'Updated instructions',
     'prep_time': 35,
-    'portions': 4
+    'portions': 4,
+    'version': 1
 }
 
 # Updated recipe response after ingredient update
@@ -81,7 +93,8 @@ UPDATED_RECIPE_WITH_INGREDIENTS_RESPONSE = {
     'common_ingredients': ['garlic', 'onion'],
     'instructions': 'Cook rice',
     'prep_time': 25,
-    'portions': 2
+    'portions': 2,
+    'version': 1
 }
 
 # Invalid test data
@@ -112,14 +125,14 @@ SAMPLE_RECIPE_1_DB_ROW = (
     1, 'Test Recipe', 'dinner',
     [{'quantity': 250, 'unit': 'g', 'name': 'pasta'}],
     ['salt', 'pepper'],
-    'Cook it', 30, 4
+    'Cook it', 30, 4, 1
 )
 
 SAMPLE_RECIPE_2_DB_ROW = (
     123, 'New Recipe', 'lunch',
     [{'quantity': 200, 'unit': 'g', 'name': 'rice'}],
     ['salt'],
-    'Cook rice', 20, 2
+    'Cook rice', 20, 2, 1
 )
 
 # Database test data for add_recipe method
@@ -145,7 +158,7 @@ UPDATED_RECIPE_DB_ROW = (
     1, 'Test Recipe', 'dinner',
     [{'quantity': 200, 'unit': 'g', 'name': 'rice'}],
     ['garlic', 'onion'],
-    'Cook rice', 25, 2
+    'Cook rice', 25, 2, 1
 )
 
 # Edge case test data
@@ -224,7 +237,7 @@ EMPTY_RECIPE_DATA = {
 
 # Database row for empty recipe
 EMPTY_RECIPE_DB_ROW = (
-    1, 'Empty Recipe', 'snack', [], [], 'No cooking', 0, 1
+    1, 'Empty Recipe', 'snack', [], [], 'No cooking', 0, 1, 1
 )
 
 
@@ -0,0 +1,223 @@
+"""
+Unit tests for group-commit batching of recipe inserts
+"""
+import threading
+import pytest
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.batching import RecipeInsertBatcher
+from app.database_client import DatabaseClient
+from .conftest import ADD_RECIPE_PARAMS, CREATE_RECIPE_DATA, SAMPLE_RECIPE_2
+
+
+# Create a test client
+client = TestClient(app)
+
+
+class FakeBatchClient:
+    """Database client double that records each batch and numbers the inserted rows"""
+
+    def __init__(self, batches, fail=False, bad=()):
+        self.batches = batches
+        self.fail = fail
+        self.bad = set(bad)
+
+    def connect(self):
+        return True
+
+    def is_connected(self):
+        return True
+
+    def disconnect(self):
+        pass
+
+    def add_recipes(self, recipes):
+        if self.fail:
+            raise Exception("insert failed")
+        if self.bad & {recipe['name'] for recipe in recipes}:
+            raise Exception("violates check constraint")
+        self.batches.append([recipe['name'] for recipe in recipes])
+        return [{'id': recipe['name'], 'version': 1} for recipe in recipes]
+
+
+class TestRecipeInsertBatcher:
+    """Test batching, flushing and result delivery"""
+    
+    def test_concurrent_submits_share_batches(self):
+        """Test that concurrent callers are grouped and each gets its own row"""
+        batches = []
+        batcher = RecipeInsertBatcher(max_batch_size=5, max_delay_ms=200,
+                                      client_factory=lambda: FakeBatchClient(batches))
+        results = {}
+        
+        def submit(name):
+            results[name] = batcher.submit({'name': name})['id']
+        
+        threads = [threading.Thread(target=submit, args=(f"r{i}",)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        batcher.close()
+        
+        assert results == {f"r{i}": f"r{i}" for i in range(10)}
+        assert sum(len(batch) for batch in batches) == 10
+        assert all(len(batch) <= 5 for batch in batches)
+        assert len(batches) < 10
+    
+    def test_flushes_after_delay(self):
+        """Test that a lone submit is flushed once the delay passes"""
+        batches = []
+        batcher = RecipeInsertBatcher(max_batch_size=50, max_delay_ms=1,
+                                      client_factory=lambda: FakeBatchClient(batches))
+        
+        assert batcher.submit({'name': 'solo'})['id'] == 'solo'
+        batcher.close()
+        
+        assert batches == [['solo']]
+    
+    def test_failure_reaches_every_caller(self):
+        """Test that a failed batch raises in each waiting caller"""
+        batcher = RecipeInsertBatcher(max_batch_size=5, max_delay_ms=1,
+                                      client_factory=lambda: FakeBatchClient([], fail=True))
+        
+        with pytest.raises(Exception, match="insert failed"):
+            batcher.submit({'name': 'r1'})
+        batcher.close()
+    
+    def test_bad_row_fails_alone(self):
+        """Test that a row rejected by the database fails only its own caller"""
+        batches = []
+        batcher = RecipeInsertBatcher(max_batch_size=3, max_delay_ms=500,
+                                      client_factory=lambda: FakeBatchClient(batches, bad={'bad'}))
+        results = {}
+        
+        def submit(name):
+            try:
+                results[name] = batcher.submit({'name': name})['id']
+            except Exception as e:
+                results[name] = str(e)
+        
+        threads = [threading.Thread(target=submit, args=(name,)) for name in ('good1', 'bad', 'good2')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        batcher.close()
+        
+        assert results == {'good1': 'good1', 'bad': 'violates check constraint', 'good2': 'good2'}
+        assert sorted(name for batch in batches for name in batch) == ['good1', 'good2']
+    
+    def test_dead_connection_is_released_before_reconnecting(self):
+        """Test that a client whose connection dropped is disconnected, returning it to the pool"""
+        dead = Mock()
+        dead.is_connected.return_value = False
+        batches = []
+        batcher = RecipeInsertBatcher(max_batch_size=5, max_delay_ms=1,
+                                      client_factory=lambda: FakeBatchClient(batches))
+        batcher._db_client = dead
+        
+        assert batcher.submit({'name': 'r1'})['id'] == 'r1'
+        batcher.close()
+        
+        dead.disconnect.assert_called_once()
+        assert batches == [['r1']]
+    
+    def test_rows_retried_on_a_fresh_connection(self):
+        """Test that a batch lost with its connection is retried row by row over a new one"""
+        batches = []
+        broken = Mock()
+        broken.is_connected.side_effect = [True, False]
+        broken.add_recipes.side_effect = Exception("server closed the connection unexpectedly")
+        batcher = RecipeInsertBatcher(max_batch_size=2, max_delay_ms=500,
+                                      client_factory=lambda: FakeBatchClient(batches))
+        batcher._db_client = broken
+        results = {}
+        
+        def submit(name):
+            results[name] = batcher.submit({'name': name})['id']
+        
+        threads = [threading.Thread(target=submit, args=(name,)) for name in ('r1', 'r2')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        batcher.close()
+        
+        assert results == {'r1': 'r1', 'r2': 'r2'}
+        broken.disconnect.assert_called_once()
+        assert batches == [['r1'], ['r2']]
+    
+    def test_timed_out_recipe_is_withdrawn(self):
+        """Test that a recipe whose caller timed out while queued is never written"""
+        batches = []
+        batcher = RecipeInsertBatcher(max_batch_size=50, max_delay_ms=300,
+                                      client_factory=lambda: FakeBatchClient(batches))
+        
+        with pytest.raises(TimeoutError):
+            batcher.submit({'name': 'late'}, timeout=0.01)
+        assert batcher.submit({'name': 'next'})['id'] == 'next'
+        batcher.close()
+        
+        assert batches == [['next']]
+    
+    @patch('app.routes.recipes.RECIPE_INSERT_BATCHING', True)
+    @patch('app.routes.recipes.recipe_insert_batcher')
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_route_uses_batcher_when_enabled(self, mock_db_client_class, mock_batcher):
+        """Test that POST /recipes goes through the batcher without opening its own connection"""
+        mock_batcher.submit.return_value = SAMPLE_RECIPE_2
+        
+        response = client.post("/recipes", json=CREATE_RECIPE_DATA)
+        
+        assert response.status_code == 201
+        assert response.json()['id'] == SAMPLE_RECIPE_2['id']
+        assert mock_batcher.submit.call_args[0][0]['name'] == CREATE_RECIPE_DATA['name']
+        mock_db_client_class.assert_not_called()
+    
+    @patch('app.routes.recipes.RECIPE_INSERT_BATCHING', True)
+    @patch('app.routes.recipes.recipe_insert_batcher')
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_keyed_requests_bypass_batcher(self, mock_db_client_class, mock_batcher):
+        """Test that Idempotency-Key requests keep their own transaction"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.claim_idempotency_key.return_value = None
+        mock_db_client.add_recipe.return_value = SAMPLE_RECIPE_2
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.post("/recipes", json=CREATE_RECIPE_DATA, headers={"Idempotency-Key": "abc"})
+        
+        assert response.status_code == 201
+        mock_batcher.submit.assert_not_called()
+
+
+class TestAddRecipesMethod:
+    """Test the multi-row add_recipes method"""
+    
+    @patch('app.database_client.execute_values')
+    def test_add_recipes_single_statement_and_commit(self, mock_execute_values):
+        """Test that a batch is one INSERT ... RETURNING and one commit"""
+        db_client = DatabaseClient()
+        mock_connection = Mock()
+        db_client._connection = mock_connection
+        mock_execute_values.return_value = [(123, 'New Recipe', 'lunch', [], ['salt'], 'Cook rice', 20, 2, 1)] * 2
+        
+        with patch.object(db_client, 'is_connected', return_value=True):
+            recipes = db_client.add_recipes([ADD_RECIPE_PARAMS, ADD_RECIPE_PARAMS])
+        
+        assert [recipe['id'] for recipe in recipes] == [123, 123]
+        mock_execute_values.assert_called_once()
+        assert "RETURNING" in mock_execute_values.call_args[0][1]
+        assert mock_execute_values.call_args[1]['fetch'] is True
+        assert mock_execute_values.call_args[1]['page_size'] == 2
+        mock_connection.commit.assert_called_once()
+    
+    def test_add_recipes_not_connected(self):
+        """Test that a batch insert requires a connection"""
+        db_client = DatabaseClient()
+        
+        with patch.object(db_client, 'is_connected', return_value=False):
+            with pytest.raises(Exception, match="Not connected to database"):
+                db_client.add_recipes([ADD_RECIPE_PARAMS])
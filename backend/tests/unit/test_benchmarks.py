@@ -0,0 +1,137 @@
+"""
+Unit tests for the benchmark suite's reporting and data generation
+"""
+import csv
+import io
+import json
+from collections import Counter
+from unittest.mock import Mock
+from benchmarks.dataset import generate_recipes, copy_recipes, write_ndjson, CopyStream, INGREDIENTS
+from benchmarks.report import summarize, compare
+from benchmarks.run import OPERATIONS, BENCH_PREFIX
+from app.models import RecipeCreate
+
+
+def result(operation='get_recipe_by_id', p95=2.0, throughput=1000.0):
+    """Build a summarized result with the given p95 and throughput"""
+    return {'operation': operation, 'size': 10000, 'concurrency': 1, 'ops': 100, 'errors': 0,
+            'throughput': throughput, 'p50_ms': 1.0, 'p95_ms': p95, 'p99_ms': p95 * 2}
+
+
+class TestSummarize:
+    """Test latency summaries"""
+    
+    def test_percentiles_and_throughput(self):
+        """Test that latencies in seconds become millisecond percentiles"""
+        summary = summarize('op', 10000, 4, [0.001] * 99 + [0.1], wall_seconds=2.0)
+        
+        assert summary['ops'] == 100
+        assert summary['throughput'] == 50.0
+        assert summary['p50_ms'] == 1.0
+        assert summary['p99_ms'] > 1.0
+    
+    def test_no_samples(self):
+        """Test that an operation that never completed summarizes to zeros"""
+        summary = summarize('op', 10000, 1, [], wall_seconds=1.0, errors=3)
+        
+        assert summary['ops'] == 0
+        assert summary['errors'] == 3
+        assert summary['p95_ms'] == 0.0
+
+
+class TestCompare:
+    """Test regression detection against a baseline"""
+    
+    def test_within_threshold(self):
+        """Test that small changes are not flagged"""
+        assert compare([result()], [result(p95=2.2, throughput=900.0)], threshold=0.15) == []
+    
+    def test_latency_regression(self):
+        """Test that a p95 increase beyond the threshold is flagged"""
+        regressions = compare([result()], [result(p95=3.0)], threshold=0.15)
+        
+        assert len(regressions) == 1
+        assert regressions[0]['operation'] == 'get_recipe_by_id'
+        assert "p95" in regressions[0]['reasons'][0]
+    
+    def test_throughput_regression(self):
+        """Test that a throughput drop beyond the threshold is flagged"""
+        regressions = compare([result()], [result(throughput=500.0)], threshold=0.15)
+        
+        assert "throughput" in regressions[0]['reasons'][0]
+    
+    def test_new_cells_ignored(self):
+        """Test that cells missing from the baseline are not regressions"""
+        assert compare([result()], [result(operation='search_recipes', p95=100.0)]) == []
+
+
+class TestSyntheticRecipes:
+    """Test the benchmark data generator"""
+    
+    def test_recipes_are_valid(self):
+        """Test that generated recipes pass the API model and carry the name prefix"""
+        for recipe in generate_recipes(50, seed=1, name_prefix=BENCH_PREFIX):
+            RecipeCreate(**recipe)
+            assert recipe['name'].startswith(BENCH_PREFIX)
+    
+    def test_deterministic_for_seed(self):
+        """Test that the same seed yields the same recipes and a different seed does not"""
+        assert list(generate_recipes(1500, seed=3)) == list(generate_recipes(1500, seed=3))
+        assert list(generate_recipes(20, seed=3)) != list(generate_recipes(20, seed=4))
+    
+    def test_prefix_of_larger_run(self):
+        """Test that a smaller count is a prefix of a larger one with the same seed"""
+        assert list(generate_recipes(1200, seed=5)) == list(generate_recipes(2500, seed=5))[:1200]
+    
+    def test_distributions_are_skewed(self):
+        """Test that categories and ingredient popularity follow the skewed distributions"""
+        recipes = list(generate_recipes(5000, seed=2))
+        categories = Counter(recipe['category'] for recipe in recipes)
+        ingredients = Counter(i['name'] for recipe in recipes for i in recipe['main_ingredients'])
+        lengths = [len(recipe['instructions']) for recipe in recipes]
+        
+        assert categories.most_common(1)[0][0] == 'dinner'
+        assert set(categories) == {'breakfast', 'lunch', 'dinner', 'snack'}
+        assert categories['dinner'] > 3 * categories['snack']
+        assert ingredients[INGREDIENTS[0]] > 10 * ingredients[INGREDIENTS[-1]]
+        assert max(lengths) > 4 * min(lengths)
+    
+    def test_copy_stream_renders_csv(self):
+        """Test that the COPY stream yields one CSV row per recipe with canonical quantities"""
+        stream = CopyStream(generate_recipes(1100, seed=1))
+        chunks = []
+        while True:
+            chunk = stream.read(8192)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        rows = list(csv.reader(io.StringIO("".join(chunks))))
+        
+        assert len(rows) == 1100
+        ingredients = json.loads(rows[0][2])
+        assert 'canonical_quantity' in ingredients[0]
+        assert rows[0][3].startswith("{") and rows[0][3].endswith("}")
+    
+    def test_copy_recipes_single_transaction(self):
+        """Test that recipes are loaded with one COPY and one commit"""
+        db_client = Mock()
+        cursor = db_client._connection.cursor.return_value
+        
+        copy_recipes(db_client, generate_recipes(10, seed=1))
+        
+        assert cursor.copy_expert.call_count == 1
+        assert cursor.copy_expert.call_args[0][0].startswith("COPY recipes (")
+        db_client._connection.commit.assert_called_once()
+    
+    def test_ndjson_output(self, tmp_path):
+        """Test that NDJSON output holds one API-shaped recipe per line"""
+        path = tmp_path / "recipes.ndjson"
+        write_ndjson(generate_recipes(25, seed=1), str(path))
+        
+        lines = path.read_text().splitlines()
+        assert len(lines) == 25
+        RecipeCreate(**json.loads(lines[0]))
+    
+    def test_operations_cover_client_and_endpoints(self):
+        """Test that the suite measures the main DatabaseClient methods and HTTP routes"""
+        assert {'get_all_recipes', 'get_recipe_by_id', 'update_recipe', 'http_get_recipe'} <= set(OPERATIONS)
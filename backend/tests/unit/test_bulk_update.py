@@ -0,0 +1,155 @@
+"""
+Unit tests for bulk recipe updates
+"""
+import pytest
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database_client import DatabaseClient
+
+
+# Create a test client
+client = TestClient(app)
+
+BULK_RESULTS = [
+    {'id': 1, 'status': 'updated', 'version': 2},
+    {'id': 2, 'status': 'conflict', 'version': None},
+    {'id': 3, 'status': 'not_found', 'version': None},
+]
+
+
+class TestBulkUpdateEndpoint:
+    """Test the PATCH /recipes/bulk endpoint"""
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_bulk_update(self, mock_db_client_class):
+        """Test that items are passed through and per-id results returned"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.bulk_update_recipes.return_value = BULK_RESULTS
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.patch("/recipes/bulk", json={"items": [
+            {"id": 1, "category": "lunch"},
+            {"id": 2, "category": "lunch", "version": 4},
+            {"id": 3, "category": "lunch"},
+        ]})
+        
+        assert response.status_code == 200
+        assert response.json() == {"status": "success", "updated": 1, "results": BULK_RESULTS}
+        items, = mock_db_client.bulk_update_recipes.call_args[0]
+        assert items[1] == {'id': 2, 'category': 'lunch', 'version': 4}
+        assert mock_db_client.bulk_update_recipes.call_args[1] == {'commit': True}
+        mock_db_client.disconnect.assert_called_once()
+    
+    def test_duplicate_ids_rejected(self):
+        """Test 400 when one id appears twice"""
+        response = client.patch("/recipes/bulk", json={"items": [
+            {"id": 1, "category": "lunch"}, {"id": 1, "name": "Renamed"}
+        ]})
+        
+        assert response.status_code == 400
+    
+    def test_item_without_fields_rejected(self):
+        """Test 400 when an item has nothing to update"""
+        response = client.patch("/recipes/bulk", json={"items": [{"id": 1, "version": 2}]})
+        
+        assert response.status_code == 400
+    
+    def test_empty_items_rejected(self):
+        """Test 422 for an empty item list"""
+        response = client.patch("/recipes/bulk", json={"items": []})
+        
+        assert response.status_code == 422
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_bulk_update_with_idempotency_key(self, mock_db_client_class):
+        """Test that a keyed bulk update commits together with its stored response"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.claim_idempotency_key.return_value = None
+        mock_db_client.bulk_update_recipes.return_value = BULK_RESULTS[:1]
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.patch("/recipes/bulk", json={"items": [{"id": 1, "category": "lunch"}]},
+                                headers={"Idempotency-Key": "bulk-1"})
+        
+        assert response.status_code == 200
+        assert mock_db_client.bulk_update_recipes.call_args[1] == {'commit': False}
+        mock_db_client.complete_idempotency_key.assert_called_once()
+
+
+class TestBulkUpdateMethod:
+    """Test the grouped UPDATE ... FROM (VALUES ...) statements"""
+    
+    def _client(self):
+        """Build a client with a mocked connection and cursor"""
+        db_client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_connection.cursor.return_value = mock_cursor
+        db_client._connection = mock_connection
+        return db_client, mock_connection, mock_cursor
+    
+    @patch('app.database_client.execute_values')
+    def test_items_grouped_by_field_set(self, mock_execute_values):
+        """Test that one statement runs per distinct field set and results keep input order"""
+        db_client, mock_connection, mock_cursor = self._client()
+        mock_execute_values.side_effect = [[(1, 2), (3, 5)], [(2, 7)]]
+        mock_cursor.fetchall.return_value = []
+        items = [
+            {'id': 1, 'category': 'lunch'},
+            {'id': 2, 'name': 'Renamed', 'prep_time': 10},
+            {'id': 3, 'category': 'lunch'},
+        ]
+        
+        with patch.object(db_client, 'is_connected', return_value=True):
+            results = db_client.bulk_update_recipes(items)
+        
+        assert mock_execute_values.call_count == 2
+        sql = mock_execute_values.call_args_list[0][0][1]
+        assert "FROM (VALUES %s) AS v(id, category)" in sql
+        assert "version = recipes.version + 1" in sql
+        assert mock_execute_values.call_args_list[0][0][2] == [(1, 'lunch'), (3, 'lunch')]
+        assert mock_execute_values.call_args_list[0][1]['template'] == "(%s::integer, %s::varchar)"
+        assert [result['version'] for result in results] == [2, 7, 5]
+        mock_cursor.execute.assert_not_called()
+        mock_connection.commit.assert_called_once()
+    
+    @patch('app.database_client.execute_values')
+    def test_version_checked_items_and_misses(self, mock_execute_values):
+        """Test that stale versions are reported as conflicts and unknown ids as not found"""
+        db_client, mock_connection, mock_cursor = self._client()
+        mock_execute_values.return_value = []
+        mock_cursor.fetchall.return_value = [(2,)]
+        items = [{'id': 2, 'portions': 4, 'version': 1}, {'id': 9, 'portions': 4, 'version': 1}]
+        
+        with patch.object(db_client, 'is_connected', return_value=True):
+            results = db_client.bulk_update_recipes(items)
+        
+        sql = mock_execute_values.call_args[0][1]
+        assert "AND recipes.version = v.expected_version" in sql
+        assert mock_execute_values.call_args[0][2] == [(2, 4, 1), (9, 4, 1)]
+        assert [result['status'] for result in results] == ['conflict', 'not_found']
+    
+    @patch('app.database_client.execute_values')
+    def test_failure_rolls_back_everything(self, mock_execute_values):
+        """Test that an error in any group rolls back the whole request"""
+        db_client, mock_connection, mock_cursor = self._client()
+        mock_execute_values.side_effect = [[(1, 2)], Exception("boom")]
+        items = [{'id': 1, 'category': 'lunch'}, {'id': 2, 'name': 'Renamed'}]
+        
+        with patch.object(db_client, 'is_connected', return_value=True):
+            with pytest.raises(Exception, match="boom"):
+                db_client.bulk_update_recipes(items)
+        
+        mock_connection.rollback.assert_called_once()
+        mock_connection.commit.assert_not_called()
+    
+    def test_not_connected(self):
+        """Test that bulk updates require a connection"""
+        db_client = DatabaseClient()
+        
+        with patch.object(db_client, 'is_connected', return_value=False):
+            with pytest.raises(Exception, match="Not connected to database"):
+                db_client.bulk_update_recipes([{'id': 1, 'name': 'x'}])
@@ -0,0 +1,272 @@
+"""
+Unit tests for the category stats aggregate and its cache
+"""
+import pytest
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.cache import TTLCache, category_stats_cache
+from app.database_client import DatabaseClient
+from .conftest import ADD_RECIPE_PARAMS, SAMPLE_RECIPE_2_DB_ROW
+
+
+# Create a test client
+client = TestClient(app)
+
+CATEGORY_STATS_DB_ROWS = [
+    ('breakfast', 6, 12.5),
+    ('dinner', 1, None),
+]
+
+CATEGORY_STATS = [
+    {'category': 'breakfast', 'count': 6, 'avg_prep_time': 12.5},
+    {'category': 'dinner', 'count': 1, 'avg_prep_time': None},
+]
+
+
+class TestTTLCache:
+    """Test the TTLCache helper"""
+    
+    def test_get_empty_cache(self):
+        """Test that an empty cache reports a miss"""
+        cache = TTLCache(60)
+        
+        assert cache.get() is None
+        assert cache.misses == 1
+        assert cache.hits == 0
+    
+    def test_set_then_get(self):
+        """Test that a stored value is returned until it expires"""
+        cache = TTLCache(60)
+        cache.set(CATEGORY_STATS)
+        
+        assert cache.get() == CATEGORY_STATS
+        assert cache.hits == 1
+    
+    def test_expired_value(self):
+        """Test that values older than the TTL are not returned"""
+        cache = TTLCache(0)
+        cache.set(CATEGORY_STATS)
+        
+        assert cache.get() is None
+    
+    def test_invalidate(self):
+        """Test that invalidate drops the cached value"""
+        cache = TTLCache(60)
+        cache.set(CATEGORY_STATS)
+        cache.invalidate()
+        
+        assert cache.get() is None
+    
+    def test_set_skipped_after_invalidation(self):
+        """Test that a value loaded before an invalidation is not stored"""
+        cache = TTLCache(60)
+        generation = cache.generation
+        cache.invalidate()
+        cache.set(CATEGORY_STATS, generation)
+        
+        assert cache.get() is None
+        cache.set(CATEGORY_STATS, cache.generation)
+        assert cache.get() == CATEGORY_STATS
+
+
+class TestDatabaseClientGetCategoryStats:
+    """Test DatabaseClient get_category_stats method"""
+    
+    def test_get_category_stats_success(self):
+        """Test aggregation of recipes per category"""
+        # Setup client with mock connection
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = CATEGORY_STATS_DB_ROWS
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            stats = client.get_category_stats()
+        
+        # Assertions
+        assert stats == CATEGORY_STATS
+        
+        # Verify a single GROUP BY query is issued
+        mock_cursor.execute.assert_called_once()
+        sql_call = mock_cursor.execute.call_args[0][0]
+        assert "GROUP BY category" in sql_call
+        mock_cursor.close.assert_called_once()
+    
+    def test_get_category_stats_not_connected(self):
+        """Test get_category_stats when not connected to database"""
+        client = DatabaseClient()
+        client._connection = None
+        
+        with patch.object(client, 'is_connected', return_value=False):
+            with pytest.raises(Exception, match="Not connected to database"):
+                client.get_category_stats()
+    
+    def test_add_recipe_invalidates_cache(self):
+        """Test that writes invalidate the cached aggregate"""
+        category_stats_cache.set(CATEGORY_STATS)
+        
+        # Setup client with mock connection
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = SAMPLE_RECIPE_2_DB_ROW
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            client.add_recipe(**ADD_RECIPE_PARAMS)
+        
+        assert category_stats_cache.get() is None
+    
+    def test_uncommitted_add_recipe_invalidates_on_commit(self):
+        """Test that a write left for the caller to commit invalidates only once it is committed"""
+        category_stats_cache.set(CATEGORY_STATS)
+        
+        # Setup client with mock connection
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = SAMPLE_RECIPE_2_DB_ROW
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            client.add_recipe(**ADD_RECIPE_PARAMS, commit=False)
+            assert category_stats_cache.get() == CATEGORY_STATS
+            
+            client.complete_idempotency_key("key", 201, {'id': 2})
+        
+        assert category_stats_cache.get() is None
+    
+    def test_rolled_back_add_recipe_keeps_cache(self):
+        """Test that an uncommitted write that is rolled back leaves the cache alone"""
+        category_stats_cache.set(CATEGORY_STATS)
+        
+        # Setup client with mock connection
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = SAMPLE_RECIPE_2_DB_ROW
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            client.add_recipe(**ADD_RECIPE_PARAMS, commit=False)
+            client.rollback()
+            client.complete_idempotency_key("other", 200, {})
+        
+        assert category_stats_cache.get() == CATEGORY_STATS
+
+
+class TestCategoryStatsEndpoint:
+    """Test the GET /recipes/stats/categories endpoint"""
+    
+    def setup_method(self):
+        """Start every test with an empty cache"""
+        category_stats_cache.invalidate()
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_get_category_stats_success(self, mock_db_client_class):
+        """Test successful retrieval of category stats"""
+        # Setup mock
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_category_stats.return_value = CATEGORY_STATS
+        
+        # Make request
+        response = client.get("/recipes/stats/categories")
+        
+        # Assertions
+        assert response.status_code == 200
+        json_response = response.json()
+        assert json_response["status"] == "success"
+        assert json_response["categories"] == CATEGORY_STATS
+        mock_db_client.disconnect.assert_called_once()
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_get_category_stats_served_from_cache(self, mock_db_client_class):
+        """Test that a second request does not hit the database"""
+        # Setup mock
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_category_stats.return_value = CATEGORY_STATS
+        
+        # Make two requests
+        client.get("/recipes/stats/categories")
+        response = client.get("/recipes/stats/categories")
+        
+        # Assertions
+        assert response.status_code == 200
+        assert response.json()["categories"] == CATEGORY_STATS
+        mock_db_client.get_category_stats.assert_called_once()
+        mock_db_client.connect.assert_called_once()
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_null_category_group(self, mock_db_client_class):
+        """Test that recipes without a category are reported as a null group instead of failing"""
+        stats = CATEGORY_STATS + [{'category': None, 'count': 2, 'avg_prep_time': None}]
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_category_stats.return_value = stats
+        
+        response = client.get("/recipes/stats/categories")
+        
+        assert response.status_code == 200
+        assert response.json()["categories"] == stats
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_write_during_read_is_not_cached(self, mock_db_client_class):
+        """Test that counts read while a write commits are returned but not cached"""
+        def read_then_concurrent_write():
+            category_stats_cache.invalidate()
+            return CATEGORY_STATS
+        
+        # Setup mock
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_category_stats.side_effect = read_then_concurrent_write
+        
+        response = client.get("/recipes/stats/categories")
+        
+        assert response.json()["categories"] == CATEGORY_STATS
+        assert category_stats_cache.get() is None
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_get_category_stats_connection_failure(self, mock_db_client_class):
+        """Test handling of database connection failure"""
+        # Setup mock to simulate connection failure
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = False
+        
+        # Make request
+        response = client.get("/recipes/stats/categories")
+        
+        # Assertions
+        assert response.status_code == 500
+        assert "Failed to connect to database" in response.json()["detail"]
+        mock_db_client.disconnect.assert_called_once()
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_get_category_stats_database_error(self, mock_db_client_class):
+        """Test handling of database errors during aggregation"""
+        # Setup mock to simulate database error
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_category_stats.side_effect = Exception("Database error")
+        
+        # Make request
+        response = client.get("/recipes/stats/categories")
+        
+        # Assertions
+        assert response.status_code == 500
+        assert "Error retrieving category stats" in response.json()["detail"]
+        assert category_stats_cache.get() is None
@@ -4,7 +4,8 @@ Unit tests for DatabaseClient methods using mocks
 import pytest
 from unittest.mock import Mock, patch
 import psycopg2
-from app.database_client import DatabaseClient
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from app.database_client import DatabaseClient, open_pool, pool_usage
 from .conftest import (
     SAMPLE_RECIPE_1, SAMPLE_RECIPE_2, SAMPLE_RECIPE_1_DB_ROW, SAMPLE_RECIPE_2_DB_ROW,
     ADD_RECIPE_PARAMS, UPDATE_RECIPE_PARAMS, UPDATE_RECIPE_WITH_INGREDIENTS_PARAMS,
@@ -107,6 +108,81 @@ class TestDatabaseClientConnection:
         assert result is False
 
 
+def idle_connection():
+    """Mock connection in the state a finished request leaves it"""
+    connection = Mock(closed=0, autocommit=False)
+    connection.info.transaction_status = TRANSACTION_STATUS_IDLE
+    return connection
+
+
+@patch('app.database_client.DB_POOL_SIZE', 2)
+@patch('app.database_client.psycopg2.connect')
+class TestConnectionPool:
+    """Test that clients reuse pooled connections"""
+    
+    def test_connection_is_reused(self, mock_connect):
+        """Test that a returned connection is checked out again instead of reconnecting"""
+        mock_connect.side_effect = lambda **kwargs: idle_connection()
+        
+        first = DatabaseClient()
+        first.connect()
+        connection = first._connection
+        first.disconnect()
+        second = DatabaseClient()
+        second.connect()
+        
+        assert second._connection is connection
+        connection.close.assert_not_called()
+        assert mock_connect.call_count == 2
+    
+    def test_overflow_connection_is_closed(self, mock_connect):
+        """Test that clients beyond the pool size get their own connection, closed on disconnect"""
+        mock_connect.side_effect = lambda **kwargs: idle_connection()
+        
+        clients = [DatabaseClient() for _ in range(3)]
+        for db_client in clients:
+            assert db_client.connect() is True
+        pooled, overflow = clients[0]._connection, clients[2]._connection
+        for db_client in clients:
+            db_client.disconnect()
+        
+        assert mock_connect.call_count == 3
+        overflow.close.assert_called_once()
+        pooled.close.assert_not_called()
+    
+    def test_autocommit_connection_is_discarded(self, mock_connect):
+        """Test that a connection left in autocommit mode is closed instead of pooled"""
+        mock_connect.side_effect = lambda **kwargs: idle_connection()
+        
+        db_client = DatabaseClient()
+        db_client.connect()
+        connection = db_client._connection
+        connection.autocommit = True
+        db_client.disconnect()
+        
+        connection.close.assert_called_once()
+    
+    def test_open_pool(self, mock_connect):
+        """Test that warming the pool opens its connections up front"""
+        mock_connect.side_effect = lambda **kwargs: idle_connection()
+        
+        assert open_pool() == 2
+        assert mock_connect.call_count == 2
+    
+    def test_pool_usage(self, mock_connect):
+        """Test that checked-out pooled connections are counted against the pool size, overflow ones are not"""
+        mock_connect.side_effect = lambda **kwargs: idle_connection()
+        assert pool_usage() == (0, 0)
+        
+        clients = [DatabaseClient() for _ in range(3)]
+        for db_client in clients:
+            db_client.connect()
+        
+        assert pool_usage() == (2, 2)
+        clients[0].disconnect()
+        assert pool_usage() == (1, 2)
+
+
 class TestDatabaseClientGetAllRecipes:
     """Test DatabaseClient get_all_recipes method"""
     
@@ -223,7 +299,7 @@ class TestDatabaseClientGetRecipeById:
         # Verify SQL query
         mock_cursor.execute.assert_called_once_with(
             """
-            SELECT id, name, category, main_ingredients, common_ingredients, instructions, prep_time, portions
+            SELECT id, name, category, main_ingredients, common_ingredients, instructions, prep_time, portions, version
             FROM recipes
             WHERE id = %s
         """, (999,)
@@ -473,7 +549,7 @@ class TestUpdateRecipeMethod:
              [{'quantity': 300, 'unit': 'g', 'name': 'pasta'}],
              ['salt', 'pepper'],
              'Updated instructions',
-             35, 4)  # Updated recipe data
+             35, 4, 2)  # Updated recipe data
         ]
         
         # Call method
@@ -484,8 +560,8 @@ class TestUpdateRecipeMethod:
         assert result['id'] == 1
         assert result['name'] == 'Updated Recipe'
         
-        # Verify cursor calls (is_connected check, exists check, update, select)
-        assert mock_cursor.execute.call_count == 4
+        # Verify cursor calls (is_connected check, exists check, update returning the row)
+        assert mock_cursor.execute.call_count == 3
         mock_connection.commit.assert_called_once()
         # cursor.close() is called once at the end
         mock_cursor.close.assert_called()
@@ -180,7 +180,7 @@ class TestDeleteRecipeEndpoint:
         
         # Verify mock calls
         mock_db_client.connect.assert_called_once()
-        mock_db_client.delete_recipe.assert_called_once_with(123)
+        mock_db_client.delete_recipe.assert_called_once_with(123, expected_version=None)
         mock_db_client.disconnect.assert_called_once()
     
     @patch('app.routes.recipes.DatabaseClient')
@@ -202,7 +202,7 @@ class TestDeleteRecipeEndpoint:
         
         # Verify mock calls
         mock_db_client.connect.assert_called_once()
-        mock_db_client.delete_recipe.assert_called_once_with(999)
+        mock_db_client.delete_recipe.assert_called_once_with(999, expected_version=None)
         mock_db_client.disconnect.assert_called_once()
     
     @patch('app.routes.recipes.DatabaseClient')
@@ -246,7 +246,7 @@ class TestDeleteRecipeEndpoint:
         
         # Verify mock calls
         mock_db_client.connect.assert_called_once()
-        mock_db_client.delete_recipe.assert_called_once_with(123)
+        mock_db_client.delete_recipe.assert_called_once_with(123, expected_version=None)
         mock_db_client.disconnect.assert_called_once()
     
     def test_delete_recipe_invalid_id(self):
@@ -87,7 +87,7 @@ class TestEdgeCases:
             mock_db_client = Mock()
             mock_db_client_class.return_value = mock_db_client
             mock_db_client.connect.return_value = True
-            mock_db_client.add_recipe.return_value = {"id": 1, **EDGE_CASE_RECIPE_DATA}
+            mock_db_client.add_recipe.return_value = {"id": 1, "version": 1, **EDGE_CASE_RECIPE_DATA}
             
             response = client.post("/recipes", json=EDGE_CASE_RECIPE_DATA)
             
@@ -100,7 +100,7 @@ class TestEdgeCases:
             mock_db_client = Mock()
             mock_db_client_class.return_value = mock_db_client
             mock_db_client.connect.return_value = True
-            mock_db_client.add_recipe.return_value = {"id": 1, **UNICODE_RECIPE_DATA}
+            mock_db_client.add_recipe.return_value = {"id": 1, "version": 1, **UNICODE_RECIPE_DATA}
             
             response = client.post("/recipes", json=UNICODE_RECIPE_DATA)
             
@@ -113,7 +113,7 @@ class TestEdgeCases:
             mock_db_client = Mock()
             mock_db_client_class.return_value = mock_db_client
             mock_db_client.connect.return_value = True
-            mock_db_client.add_recipe.return_value = {"id": 1, **COMPLEX_RECIPE_DATA}
+            mock_db_client.add_recipe.return_value = {"id": 1, "version": 1, **COMPLEX_RECIPE_DATA}
             
             response = client.post("/recipes", json=COMPLEX_RECIPE_DATA)
             
@@ -125,8 +125,7 @@ class TestDatabaseClientEdgeCases:
     """Test DatabaseClient edge cases"""
     
     @patch.dict('os.environ', {}, clear=True)  # Clear all environment variables
-    @patch('app.database_client.load_dotenv')  # Prevent loading .env file
-    def test_database_client_with_none_values(self, mock_load_dotenv):
+    def test_database_client_with_none_values(self):
         """Test DatabaseClient initialization with None values"""
         # Test that None values are handled gracefully
         client = DatabaseClient(
@@ -156,7 +155,7 @@ class TestDatabaseClientEdgeCases:
             1, EMPTY_RECIPE_DATA["name"], EMPTY_RECIPE_DATA["category"], 
             EMPTY_RECIPE_DATA["main_ingredients"], EMPTY_RECIPE_DATA["common_ingredients"], 
             EMPTY_RECIPE_DATA["instructions"], EMPTY_RECIPE_DATA["prep_time"], 
-            EMPTY_RECIPE_DATA["portions"]
+            EMPTY_RECIPE_DATA["portions"], 1
         )
         
         mock_connection.cursor.return_value = mock_cursor
@@ -0,0 +1,170 @@
+"""
+Unit tests for Idempotency-Key handling
+"""
+import pytest
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database_client import DatabaseClient
+from app.idempotency import request_fingerprint
+from app.models import RecipeCreate
+from .conftest import CREATE_RECIPE_DATA, SAMPLE_RECIPE_2
+
+
+# Create a test client
+client = TestClient(app)
+
+STORED_RESPONSE = {
+    'status_code': 201,
+    'response_body': {'id': 123, 'status': 'success', 'message': 'Recipe created successfully'},
+    'response_headers': {'ETag': '"1"'}
+}
+
+
+def stored_for(payload):
+    """Build the stored row a first POST /recipes with this payload would have left"""
+    fingerprint = request_fingerprint("POST /recipes", RecipeCreate(**payload).model_dump())
+    return {**STORED_RESPONSE, 'request_hash': fingerprint}
+
+
+class TestIdempotentCreateRecipe:
+    """Test POST /recipes with an Idempotency-Key header"""
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_first_request_stores_response(self, mock_db_client_class):
+        """Test that the first request writes the recipe and stores its response in one transaction"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.claim_idempotency_key.return_value = None
+        mock_db_client.add_recipe.return_value = SAMPLE_RECIPE_2
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.post("/recipes", json=CREATE_RECIPE_DATA, headers={"Idempotency-Key": "abc"})
+        
+        assert response.status_code == 201
+        assert mock_db_client.add_recipe.call_args[1]['commit'] is False
+        key, status_code, body, headers = mock_db_client.complete_idempotency_key.call_args[0]
+        assert (key, status_code, body['id'], headers) == ('abc', 201, 123, {'ETag': '"1"'})
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_retry_replays_stored_response(self, mock_db_client_class):
+        """Test that a retry gets the stored response without another insert"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.claim_idempotency_key.return_value = stored_for(CREATE_RECIPE_DATA)
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.post("/recipes", json=CREATE_RECIPE_DATA, headers={"Idempotency-Key": "abc"})
+        
+        assert response.status_code == 201
+        assert response.json() == STORED_RESPONSE['response_body']
+        assert response.headers['etag'] == '"1"'
+        assert response.headers['idempotent-replayed'] == 'true'
+        mock_db_client.add_recipe.assert_not_called()
+        mock_db_client.disconnect.assert_called_once()
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_key_reused_for_different_request(self, mock_db_client_class):
+        """Test 422 when a key is replayed with a different body"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.claim_idempotency_key.return_value = stored_for({**CREATE_RECIPE_DATA, 'name': 'Other'})
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.post("/recipes", json=CREATE_RECIPE_DATA, headers={"Idempotency-Key": "abc"})
+        
+        assert response.status_code == 422
+        mock_db_client.add_recipe.assert_not_called()
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_without_key(self, mock_db_client_class):
+        """Test that requests without a key commit directly"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.add_recipe.return_value = SAMPLE_RECIPE_2
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.post("/recipes", json=CREATE_RECIPE_DATA)
+        
+        assert response.status_code == 201
+        assert mock_db_client.add_recipe.call_args[1]['commit'] is True
+        mock_db_client.claim_idempotency_key.assert_not_called()
+        mock_db_client.complete_idempotency_key.assert_not_called()
+
+
+class TestIdempotencyKeyStorage:
+    """Test the idempotency key methods of DatabaseClient"""
+    
+    def _client(self):
+        """Build a client with a mocked connection and cursor"""
+        db_client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_connection.cursor.return_value = mock_cursor
+        db_client._connection = mock_connection
+        return db_client, mock_connection, mock_cursor
+    
+    def test_claim_leaves_transaction_open(self):
+        """Test that a fresh key is claimed without committing"""
+        db_client, mock_connection, mock_cursor = self._client()
+        mock_cursor.fetchone.return_value = ('abc',)
+        
+        with patch.object(db_client, 'is_connected', return_value=True):
+            assert db_client.claim_idempotency_key('abc', 'hash', 60) is None
+        
+        assert "ON CONFLICT (key) DO NOTHING" in mock_cursor.execute.call_args[0][0]
+        mock_connection.commit.assert_not_called()
+    
+    def test_claim_returns_stored_response(self):
+        """Test that an existing key returns its stored response"""
+        db_client, mock_connection, mock_cursor = self._client()
+        mock_cursor.fetchone.side_effect = [None, ('hash', 201, {'id': 1}, {'ETag': '"1"'})]
+        
+        with patch.object(db_client, 'is_connected', return_value=True):
+            stored = db_client.claim_idempotency_key('abc', 'hash', 60)
+        
+        assert stored == {
+            'request_hash': 'hash', 'status_code': 201,
+            'response_body': {'id': 1}, 'response_headers': {'ETag': '"1"'}
+        }
+        mock_connection.commit.assert_called_once()
+    
+    def test_complete_commits(self):
+        """Test that storing the response commits the open transaction"""
+        db_client, mock_connection, mock_cursor = self._client()
+        
+        with patch.object(db_client, 'is_connected', return_value=True):
+            db_client.complete_idempotency_key('abc', 201, {'id': 1})
+        
+        assert mock_cursor.execute.call_args[0][1][-1] == 'abc'
+        mock_connection.commit.assert_called_once()
+    
+    def test_add_recipe_without_commit(self):
+        """Test that add_recipe can leave the commit to the caller"""
+        db_client, mock_connection, mock_cursor = self._client()
+        mock_cursor.fetchone.return_value = (1, 'Recipe', 'dinner', [], [], 'Cook', 10, 2, 1)
+        
+        with patch.object(db_client, 'is_connected', return_value=True):
+            db_client.add_recipe('Recipe', 'dinner', [], [], 'Cook', 10, 2, commit=False)
+        
+        mock_connection.commit.assert_not_called()
+    
+    def test_claim_not_connected(self):
+        """Test that claiming a key requires a connection"""
+        db_client = DatabaseClient()
+        
+        with patch.object(db_client, 'is_connected', return_value=False):
+            with pytest.raises(Exception, match="Not connected to database"):
+                db_client.claim_idempotency_key('abc', 'hash', 60)
+
+
+class TestRequestFingerprint:
+    """Test request fingerprints"""
+    
+    def test_fingerprint_ignores_key_order(self):
+        """Test that equal payloads hash equally"""
+        assert request_fingerprint("POST /recipes", {'a': 1, 'b': 2}) == request_fingerprint("POST /recipes", {'b': 2, 'a': 1})
+    
+    def test_fingerprint_includes_endpoint(self):
+        """Test that the same body on another endpoint hashes differently"""
+        assert request_fingerprint("POST /recipes", {'a': 1}) != request_fingerprint("POST /meal-plans", {'a': 1})
@@ -0,0 +1,73 @@
+"""
+Unit tests for the normalized ingredient backfill
+"""
+import pytest
+from unittest.mock import Mock, patch
+from app.database_client import DatabaseClient
+from app.backfill_ingredients import backfill
+
+
+class TestIngredientBackfill:
+    """Test the batched backfill of recipe_ingredients"""
+    
+    def test_backfill_walks_batches_until_done(self):
+        """Test that each batch resumes after the last synced id"""
+        db_client = Mock()
+        db_client.sync_recipe_ingredients_batch.side_effect = [2, 4, None]
+        
+        assert backfill(db_client, batch_size=2) == 2
+        
+        calls = [call.args for call in db_client.sync_recipe_ingredients_batch.call_args_list]
+        assert calls == [(0, 2), (2, 2), (4, 2)]
+    
+    def test_sync_batch_returns_last_id_and_commits(self):
+        """Test that a batch is synced in one statement and committed"""
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = [(3, None), (7, None)]
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            assert client.sync_recipe_ingredients_batch(0, 2) == 7
+        
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "sync_recipe_ingredients(id, main_ingredients, common_ingredients)" in sql
+        assert params == (0, 2)
+        mock_connection.commit.assert_called_once()
+    
+    def test_sync_batch_returns_none_when_done(self):
+        """Test that an empty batch signals the end of the table"""
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = []
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            assert client.sync_recipe_ingredients_batch(10, 2) is None
+    
+    def test_sync_batch_rolls_back_on_error(self):
+        """Test that a failed batch is rolled back"""
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.execute.side_effect = Exception("boom")
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            with pytest.raises(Exception, match="boom"):
+                client.sync_recipe_ingredients_batch(0, 2)
+        
+        mock_connection.rollback.assert_called_once()
+    
+    def test_sync_batch_not_connected(self):
+        """Test that the batch sync requires a connection"""
+        client = DatabaseClient()
+        
+        with patch.object(client, 'is_connected', return_value=False):
+            with pytest.raises(Exception, match="Not connected to database"):
+                client.sync_recipe_ingredients_batch(0, 2)
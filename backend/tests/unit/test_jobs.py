@@ -0,0 +1,207 @@
+"""
+Unit tests for the background job runner
+"""
+import time
+import pytest
+from datetime import datetime
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database_client import DatabaseClient
+from app.jobs import JobWorkerPool, retry_delay, run_job, RETRY_MAX_SECONDS
+
+
+# Create a test client
+client = TestClient(app)
+
+QUEUED_JOB = {
+    'id': 7,
+    'kind': 'shopping_list',
+    'params': {'plan_ids': [1, 2]},
+    'status': 'queued',
+    'attempts': 0,
+    'max_attempts': 3,
+    'run_at': datetime(2024, 1, 1, 12, 0),
+    'result': None,
+    'error': None,
+    'created_at': datetime(2024, 1, 1, 12, 0),
+    'updated_at': datetime(2024, 1, 1, 12, 0)
+}
+
+
+class TestJobEndpoints:
+    """Test POST /jobs and GET /jobs/{id}"""
+    
+    @patch('app.routes.jobs.DatabaseClient')
+    def test_create_job(self, mock_db_client_class):
+        """Test that a valid job is queued and returned with 202"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.enqueue_job.return_value = QUEUED_JOB
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.post("/jobs", json={"kind": "shopping_list", "params": {"plan_ids": [1, 2]}})
+        
+        assert response.status_code == 202
+        assert response.json()['job']['status'] == 'queued'
+        mock_db_client.enqueue_job.assert_called_once_with('shopping_list', {'plan_ids': [1, 2]}, 3)
+        mock_db_client.disconnect.assert_called_once()
+    
+    @patch('app.routes.jobs.DatabaseClient')
+    def test_create_job_fills_param_defaults(self, mock_db_client_class):
+        """Test that params are validated and stored with their defaults"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.enqueue_job.return_value = {**QUEUED_JOB, 'kind': 'meal_plan', 'params': {}}
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.post("/jobs", json={"kind": "meal_plan", "params": {"days": 28}})
+        
+        assert response.status_code == 202
+        params = mock_db_client.enqueue_job.call_args[0][1]
+        assert params['days'] == 28
+        assert params['categories'] == ['breakfast', 'lunch', 'dinner']
+    
+    def test_create_job_unknown_kind(self):
+        """Test 400 for a kind without a handler"""
+        response = client.post("/jobs", json={"kind": "mine_bitcoin"})
+        
+        assert response.status_code == 400
+    
+    def test_create_job_invalid_params(self):
+        """Test 422 when params do not match the kind"""
+        response = client.post("/jobs", json={"kind": "meal_plan", "params": {"days": 0}})
+        
+        assert response.status_code == 422
+    
+    @patch('app.routes.jobs.DatabaseClient')
+    def test_get_job_not_found(self, mock_db_client_class):
+        """Test 404 for a missing job"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_job.return_value = None
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.get("/jobs/99")
+        
+        assert response.status_code == 404
+    
+    @patch('app.routes.jobs.DatabaseClient')
+    def test_get_job_with_result(self, mock_db_client_class):
+        """Test that a finished job returns its result"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_job.return_value = {**QUEUED_JOB, 'status': 'succeeded', 'result': {'count': 3}}
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.get("/jobs/7")
+        
+        assert response.status_code == 200
+        assert response.json()['job']['result'] == {'count': 3}
+
+
+class TestRunJob:
+    """Test running a claimed job and its retry policy"""
+    
+    def test_retry_delay_backs_off_and_caps(self):
+        """Test that delays double per attempt up to the cap"""
+        assert retry_delay(1) * 2 == retry_delay(2)
+        assert retry_delay(50) == RETRY_MAX_SECONDS
+    
+    def test_success_stores_result(self):
+        """Test that a successful job is completed with its result"""
+        db_client = Mock()
+        db_client.get_meal_plan_items.return_value = []
+        
+        run_job(db_client, {**QUEUED_JOB, 'attempts': 1})
+        
+        db_client.get_meal_plan_items.assert_called_once_with([1, 2])
+        db_client.complete_job.assert_called_once_with(
+            7, {'main_ingredients': [], 'common_ingredients': [], 'missing_recipe_ids': []}
+        )
+    
+    def test_failure_is_retried_with_backoff(self):
+        """Test that a failed attempt is requeued after the backoff delay"""
+        db_client = Mock()
+        db_client.get_meal_plan_items.side_effect = Exception("database went away")
+        
+        run_job(db_client, {**QUEUED_JOB, 'attempts': 2})
+        
+        db_client.rollback.assert_called_once()
+        db_client.fail_job.assert_called_once_with(7, "Exception: database went away", retry_delay(2))
+        db_client.complete_job.assert_not_called()
+    
+    def test_last_attempt_fails_permanently(self):
+        """Test that the last attempt marks the job failed"""
+        db_client = Mock()
+        db_client.get_meal_plan_items.side_effect = Exception("still broken")
+        
+        run_job(db_client, {**QUEUED_JOB, 'attempts': 3})
+        
+        db_client.fail_job.assert_called_once_with(7, "Exception: still broken", None)
+
+
+class TestJobWorkerPool:
+    """Test the worker threads"""
+    
+    def test_workers_drain_queue(self):
+        """Test that workers run queued jobs and keep polling"""
+        db_client = Mock()
+        db_client.is_connected.return_value = True
+        db_client.dequeue_job.side_effect = [{**QUEUED_JOB, 'attempts': 1}] + [None] * 1000
+        db_client.get_meal_plan_items.return_value = []
+        pool = JobWorkerPool(workers=1, poll_interval=0.01, client_factory=lambda: db_client)
+        
+        pool.start()
+        deadline = time.monotonic() + 2
+        while not db_client.complete_job.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        pool.stop()
+        
+        db_client.complete_job.assert_called_once()
+        db_client.requeue_stale_jobs.assert_called()
+        db_client.disconnect.assert_called()
+
+
+class TestJobQueueMethods:
+    """Test the job table methods of DatabaseClient"""
+    
+    def test_dequeue_skips_locked_jobs(self):
+        """Test that dequeue claims one ready job with SKIP LOCKED and commits"""
+        db_client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = None
+        mock_connection.cursor.return_value = mock_cursor
+        db_client._connection = mock_connection
+        
+        with patch.object(db_client, 'is_connected', return_value=True):
+            assert db_client.dequeue_job() is None
+        
+        sql = mock_cursor.execute.call_args[0][0]
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "attempts = attempts + 1" in sql
+        mock_connection.commit.assert_called_once()
+    
+    def test_fail_job_requeues_with_delay(self):
+        """Test that a retry puts the job back in the queue after the delay"""
+        db_client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_connection.cursor.return_value = mock_cursor
+        db_client._connection = mock_connection
+        
+        with patch.object(db_client, 'is_connected', return_value=True):
+            db_client.fail_job(7, "boom", 4.0)
+        
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "status = 'queued'" in sql
+        assert params == ("boom", 4.0, 7)
+    
+    def test_enqueue_not_connected(self):
+        """Test that queueing a job requires a connection"""
+        db_client = DatabaseClient()
+        
+        with patch.object(db_client, 'is_connected', return_value=False):
+            with pytest.raises(Exception, match="Not connected to database"):
+                db_client.enqueue_job('meal_plan', {})
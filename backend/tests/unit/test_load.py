@@ -0,0 +1,114 @@
+"""
+Unit tests for the open-loop load generator and its latency histogram
+"""
+import asyncio
+import httpx
+import numpy as np
+import pytest
+from benchmarks.histogram import LatencyHistogram, bucket_index, bucket_value
+from benchmarks.load import parse_mix, arrival_offsets, run_load
+
+
+class TestLatencyHistogram:
+    """Test the HDR-style histogram"""
+    
+    def test_buckets_are_contiguous(self):
+        """Test that every value lands in a bucket whose upper bound is at least the value"""
+        previous = -1
+        for value in range(0, 100000, 7):
+            index = bucket_index(value)
+            assert index >= previous
+            assert value <= bucket_value(index) <= value * 1.02 + 1
+            previous = index
+    
+    def test_percentiles_match_exact_values(self):
+        """Test that percentiles stay within the histogram's relative precision"""
+        rng = np.random.default_rng(1)
+        latencies = rng.lognormal(-5, 1, size=20000)
+        histogram = LatencyHistogram()
+        for latency in latencies:
+            histogram.record(latency)
+        
+        for percent in (50, 90, 99, 99.9):
+            exact = np.percentile(latencies * 1000, percent)
+            assert histogram.percentile(percent) == pytest.approx(exact, rel=0.03)
+        assert histogram.summary()['max_ms'] == pytest.approx(latencies.max() * 1000, rel=0.001)
+    
+    def test_merge_and_empty(self):
+        """Test that merged histograms add up and empty ones report zero"""
+        first, second = LatencyHistogram(), LatencyHistogram()
+        assert first.percentile(99) == 0.0
+        first.record(0.001)
+        second.record(0.1)
+        first.merge(second)
+        
+        assert first.total == 2
+        assert first.percentile(100) == pytest.approx(100, rel=0.02)
+
+
+class TestLoadSchedule:
+    """Test the mix parser and arrival schedule"""
+    
+    def test_parse_mix(self):
+        """Test that weights are normalized"""
+        assert parse_mix("get=3,create=1") == {'get': 0.75, 'create': 0.25}
+    
+    def test_parse_mix_unknown_operation(self):
+        """Test that unknown operations are rejected"""
+        with pytest.raises(ValueError, match="Unknown operation"):
+            parse_mix("get=1,explode=1")
+    
+    def test_fixed_and_poisson_arrivals(self):
+        """Test that both schedules hold the requested rate within the duration"""
+        rng = np.random.default_rng(1)
+        fixed = arrival_offsets(100, 10, rng)
+        poisson = arrival_offsets(100, 10, rng, poisson=True)
+        
+        assert len(fixed) == 1000
+        assert np.allclose(np.diff(fixed), 0.01)
+        assert 900 < len(poisson) < 1100
+        assert poisson.max() < 10
+
+
+class TestRunLoad:
+    """Test a short run against a fake recipes API"""
+    
+    def test_run_reports_every_operation_and_cleans_up(self):
+        """Test that each operation is measured, errors are counted and the working set is deleted"""
+        recipes = set()
+        created = []
+        methods = []
+        
+        def handler(request):
+            methods.append(request.method)
+            if request.method == "POST":
+                recipe_id = len(created) + 1
+                created.append(recipe_id)
+                recipes.add(recipe_id)
+                # Same contract as POST /recipes
+                return httpx.Response(201, json={'id': recipe_id, 'status': 'success',
+                                                 'message': 'Recipe created successfully'})
+            if request.method == "DELETE":
+                recipes.discard(int(request.url.path.rsplit("/", 1)[1]))
+                return httpx.Response(200, json={'status': 'success'})
+            if request.method == "PATCH":
+                return httpx.Response(412, json={'detail': 'conflict'})
+            return httpx.Response(200, json={'status': 'success'})
+        
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://test") as client:
+                return await run_load(client, parse_mix("get=2,list=1,create=1,update=1,delete=1"),
+                                      rate=500, duration=0.2, working_set=10)
+        
+        report = asyncio.run(run())
+        by_operation = {result['operation']: result for result in report['results']}
+        
+        assert by_operation['all']['requests'] == 100
+        assert set(by_operation) == {'get', 'list', 'create', 'update', 'delete', 'all'}
+        assert by_operation['update']['error_rate'] == 1.0
+        assert by_operation['get']['errors'] == 0
+        assert by_operation['all']['p99_ms'] >= by_operation['all']['p50_ms']
+        # The working set filled, so get/update/delete were not turned into creates
+        assert methods.count("POST") == 10 + by_operation['create']['requests']
+        assert methods.count("PATCH") == by_operation['update']['requests']
+        assert recipes == set()
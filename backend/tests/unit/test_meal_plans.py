@@ -0,0 +1,204 @@
+"""
+Unit tests for the meal plan generator
+"""
+import time
+import pytest
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database_client import DatabaseClient
+from app.planner import generate_plan, MAX_CANDIDATES_PER_CATEGORY
+
+
+# Create a test client
+client = TestClient(app)
+
+PLAN_CANDIDATES = [
+    {'id': 1, 'name': 'Oatmeal', 'category': 'breakfast', 'prep_time': 5, 'portions': 2},
+    {'id': 2, 'name': 'Pancakes', 'category': 'breakfast', 'prep_time': 20, 'portions': 4},
+    {'id': 3, 'name': 'Caesar Salad', 'category': 'lunch', 'prep_time': 15, 'portions': 2},
+    {'id': 4, 'name': 'Lasagna', 'category': 'dinner', 'prep_time': 90, 'portions': 6},
+    {'id': 5, 'name': 'Test Pasta', 'category': 'dinner', 'prep_time': 15, 'portions': 2},
+    {'id': 6, 'name': 'Stew', 'category': 'dinner', 'prep_time': None, 'portions': None},
+]
+
+
+def planned_ids(plan, category):
+    """Collect the recipe ids planned for a category, day by day"""
+    return [
+        meal['recipe']['id'] if meal['recipe'] else None
+        for day in plan for meal in day['meals'] if meal['category'] == category
+    ]
+
+
+class TestGeneratePlan:
+    """Test the generate_plan engine"""
+    
+    def test_plan_shape(self):
+        """Test that every day has one meal per requested category"""
+        plan = generate_plan(PLAN_CANDIDATES, days=3, categories=['breakfast', 'dinner'], no_repeat_days=0, seed=1)
+        
+        assert [day['day'] for day in plan] == [1, 2, 3]
+        for day in plan:
+            assert [meal['category'] for meal in day['meals']] == ['breakfast', 'dinner']
+    
+    def test_no_repeat_window(self):
+        """Test that recipes are not repeated within the window"""
+        plan = generate_plan(PLAN_CANDIDATES, days=3, categories=['dinner'], no_repeat_days=3, seed=1)
+        
+        ids = planned_ids(plan, 'dinner')
+        assert sorted(ids) == [4, 5, 6]
+    
+    def test_slot_left_empty_when_candidates_run_out(self):
+        """Test that a slot is empty rather than breaking the repeat window"""
+        plan = generate_plan(PLAN_CANDIDATES, days=3, categories=['lunch'], no_repeat_days=2, seed=1)
+        
+        assert planned_ids(plan, 'lunch') == [3, None, 3]
+    
+    def test_unknown_category(self):
+        """Test that categories without candidates produce empty slots"""
+        plan = generate_plan(PLAN_CANDIDATES, days=1, categories=['brunch'], no_repeat_days=0)
+        
+        assert plan[0]['meals'] == [{'category': 'brunch', 'recipe': None}]
+    
+    def test_target_portions_preferred(self):
+        """Test that recipes matching the target portions score higher"""
+        plan = generate_plan(PLAN_CANDIDATES, days=1, categories=['breakfast'], no_repeat_days=0,
+                             target_portions=4, seed=3)
+        
+        assert planned_ids(plan, 'breakfast') == [2]
+    
+    def test_seed_is_deterministic(self):
+        """Test that the same seed yields the same plan"""
+        first = generate_plan(PLAN_CANDIDATES, days=5, categories=['dinner'], no_repeat_days=1, seed=42)
+        second = generate_plan(PLAN_CANDIDATES, days=5, categories=['dinner'], no_repeat_days=1, seed=42)
+        
+        assert first == second
+    
+    def test_week_over_full_candidate_pool_is_fast(self):
+        """Test that a 7-day plan over the capped candidate pool stays well within budget"""
+        categories = ['breakfast', 'lunch', 'dinner', 'snack']
+        candidates = [
+            {'id': i, 'name': f'Recipe {i}', 'category': categories[i % 4], 'prep_time': i % 120, 'portions': i % 6 + 1}
+            for i in range(MAX_CANDIDATES_PER_CATEGORY * len(categories))
+        ]
+        
+        start = time.perf_counter()
+        plan = generate_plan(candidates, days=7, categories=categories, no_repeat_days=7, target_portions=2)
+        elapsed = time.perf_counter() - start
+        
+        assert all(meal['recipe'] for day in plan for meal in day['meals'])
+        assert elapsed < 0.2
+
+
+class TestDatabaseClientGetPlanCandidates:
+    """Test DatabaseClient get_plan_candidates method"""
+    
+    def test_get_plan_candidates_filters(self):
+        """Test that constraints are pushed down into SQL"""
+        # Setup client with mock connection
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = [(5, 'Test Pasta', 'dinner', 15, 2)]
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            candidates = client.get_plan_candidates(['dinner'], max_prep_time=30,
+                                                    excluded_ingredients=['Peanut'], per_category_limit=100)
+        
+        # Assertions
+        assert candidates == [PLAN_CANDIDATES[4]]
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "unnest(%s::text[])" in sql
+        assert "prep_time <= %s" in sql
+        assert "FROM recipe_ingredients" in sql
+        assert "ORDER BY id LIMIT %s" in sql
+        assert "TABLESAMPLE SYSTEM" in sql
+        assert "PARTITION BY" not in sql
+        assert "instructions" not in sql
+        assert params == [['dinner'], 30, ['peanut'], 100, 30, ['peanut'], 100, 100]
+        mock_cursor.close.assert_called_once()
+    
+    def test_get_plan_candidates_not_connected(self):
+        """Test get_plan_candidates when not connected to database"""
+        client = DatabaseClient()
+        client._connection = None
+        
+        with patch.object(client, 'is_connected', return_value=False):
+            with pytest.raises(Exception, match="Not connected to database"):
+                client.get_plan_candidates(['dinner'])
+
+
+class TestGenerateMealPlanEndpoint:
+    """Test the POST /meal-plans/generate endpoint"""
+    
+    @patch('app.routes.meal_plans.DatabaseClient')
+    def test_generate_meal_plan_success(self, mock_db_client_class):
+        """Test successful plan generation"""
+        # Setup mock
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_plan_candidates.return_value = PLAN_CANDIDATES
+        
+        # Make request
+        response = client.post("/meal-plans/generate", json={
+            "days": 2,
+            "categories": ["breakfast", "dinner"],
+            "max_prep_time": 60,
+            "excluded_ingredients": ["peanut"],
+            "seed": 7
+        })
+        
+        # Assertions
+        assert response.status_code == 200
+        json_response = response.json()
+        assert json_response["status"] == "success"
+        assert len(json_response["days"]) == 2
+        assert json_response["days"][0]["meals"][0]["category"] == "breakfast"
+        
+        call_kwargs = mock_db_client.get_plan_candidates.call_args[1]
+        assert sorted(call_kwargs['categories']) == ['breakfast', 'dinner']
+        assert call_kwargs['max_prep_time'] == 60
+        assert call_kwargs['excluded_ingredients'] == ['peanut']
+        mock_db_client.disconnect.assert_called_once()
+    
+    def test_generate_meal_plan_invalid_days(self):
+        """Test that invalid constraints are rejected"""
+        response = client.post("/meal-plans/generate", json={"days": 0})
+        
+        assert response.status_code == 422
+    
+    @patch('app.routes.meal_plans.DatabaseClient')
+    def test_generate_meal_plan_connection_failure(self, mock_db_client_class):
+        """Test handling of database connection failure"""
+        # Setup mock to simulate connection failure
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = False
+        
+        # Make request
+        response = client.post("/meal-plans/generate", json={})
+        
+        # Assertions
+        assert response.status_code == 500
+        assert "Failed to connect to database" in response.json()["detail"]
+        mock_db_client.disconnect.assert_called_once()
+    
+    @patch('app.routes.meal_plans.DatabaseClient')
+    def test_generate_meal_plan_database_error(self, mock_db_client_class):
+        """Test handling of database errors during planning"""
+        # Setup mock to simulate database error
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_plan_candidates.side_effect = Exception("Database error")
+        
+        # Make request
+        response = client.post("/meal-plans/generate", json={})
+        
+        # Assertions
+        assert response.status_code == 500
+        assert "Error generating meal plan" in response.json()["detail"]
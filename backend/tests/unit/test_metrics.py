@@ -0,0 +1,125 @@
+"""
+Unit tests for the Prometheus metrics module and GET /metrics
+"""
+import pytest
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.cache import TTLCache
+from app.database_client import DatabaseClient
+from app.metrics import Counter, Histogram, register_cache, db_errors, db_query_duration, registry
+
+
+# Create a test client
+client = TestClient(app)
+
+
+def sample(text, line_prefix):
+    """Value of the first exposition line starting with line_prefix"""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+class TestMetricTypes:
+    """Test metric rendering"""
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that histogram buckets, sum and count follow the exposition format"""
+        histogram = Histogram("demo_seconds", "Demo", ("op",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.labels("read").observe(value)
+        
+        text = "\n".join(histogram.render())
+        
+        assert "# TYPE demo_seconds histogram" in text
+        assert sample(text, 'demo_seconds_bucket{op="read",le="0.1"}') == 1
+        assert sample(text, 'demo_seconds_bucket{op="read",le="1"}') == 2
+        assert sample(text, 'demo_seconds_bucket{op="read",le="+Inf"}') == 3
+        assert sample(text, 'demo_seconds_count{op="read"}') == 3
+        assert sample(text, 'demo_seconds_sum{op="read"}') == pytest.approx(5.55)
+    
+    def test_labels_reuse_children_and_escape(self):
+        """Test that a label set maps to one child and values are escaped"""
+        counter = Counter("demo_total", "Demo", ("path",))
+        assert counter.labels('a"b') is counter.labels('a"b')
+        counter.labels('a"b').inc(2)
+        
+        assert 'demo_total{path="a\\"b"} 2' in counter.render()
+    
+    def test_cache_hit_ratio(self):
+        """Test that cache counts are read at render time"""
+        cache = TTLCache(60)
+        register_cache("demo", cache)
+        cache.get()
+        cache.set({'x': 1})
+        cache.get()
+        cache.get()
+        
+        text = registry.render()
+        
+        assert sample(text, 'cache_hit_ratio{cache="demo"}') == pytest.approx(2 / 3)
+        assert sample(text, 'cache_misses_total{cache="demo"}') == 1
+
+
+class TestDatabaseInstrumentation:
+    """Test per-method DatabaseClient metrics"""
+    
+    def test_method_duration_and_errors_recorded(self):
+        """Test that calls are timed and failures counted per method"""
+        before_count = sum(db_query_duration.labels("get_recipe_by_id").counts)
+        before_errors = db_errors.labels("get_recipe_by_id").value
+        db_client = DatabaseClient()
+        
+        with pytest.raises(Exception, match="Not connected to database"):
+            db_client.get_recipe_by_id(1)
+        
+        assert sum(db_query_duration.labels("get_recipe_by_id").counts) == before_count + 1
+        assert db_errors.labels("get_recipe_by_id").value == before_errors + 1
+    
+    def test_wrapped_methods_keep_names(self):
+        """Test that instrumentation preserves method metadata"""
+        assert DatabaseClient.get_recipe_by_id.__name__ == "get_recipe_by_id"
+        assert DatabaseClient.get_recipe_by_id.__doc__
+
+
+class TestMetricsEndpoint:
+    """Test GET /metrics and request instrumentation"""
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_requests_labelled_by_route_template(self, mock_db_client_class):
+        """Test that requests are recorded under their route template, not the raw path"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_recipe_by_id.return_value = None
+        mock_db_client_class.return_value = mock_db_client
+        
+        client.get("/recipes/12345")
+        client.get("/health")
+        response = client.get("/metrics")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert sample(text, 'http_requests_total{method="GET",route="/recipes/{recipe_id}",status="4xx"}') >= 1
+        assert sample(text, 'http_request_duration_seconds_count{method="GET",route="/health"}') >= 1
+        assert "/recipes/12345" not in text
+        assert 'http_requests_in_flight 1' in text
+    
+    def test_unmatched_route(self):
+        """Test that unknown paths share one label set"""
+        client.get("/no/such/path")
+        text = client.get("/metrics").text
+        
+        assert sample(text, 'http_requests_total{method="GET",route="unmatched",status="4xx"}') >= 1
+    
+    def test_unknown_method(self):
+        """Test that non-standard request methods share the label "other" """
+        client.request("PURGE", "/recipes/1")
+        client.request("XYZZY", "/recipes/1")
+        text = client.get("/metrics").text
+        
+        assert sample(text, 'http_requests_total{method="other",route="/recipes/{recipe_id}",status="4xx"}') >= 2
+        assert 'method="PURGE"' not in text
+        assert 'method="XYZZY"' not in text
@@ -0,0 +1,174 @@
+"""
+Unit tests for If-Match / ETag optimistic concurrency on recipes
+"""
+import pytest
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database_client import DatabaseClient, VersionConflictError
+from .conftest import SAMPLE_RECIPE_1, UPDATED_RECIPE_RESPONSE, UPDATED_RECIPE_DB_ROW
+
+
+# Create a test client
+client = TestClient(app)
+
+
+class TestIfMatchEndpoints:
+    """Test ETag and If-Match handling in the recipe routes"""
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_get_recipe_returns_etag(self, mock_db_client_class):
+        """Test that a recipe is served with its version as ETag"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_recipe_by_id.return_value = {**SAMPLE_RECIPE_1, 'version': 3}
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.get("/recipes/1")
+        
+        assert response.status_code == 200
+        assert response.headers["etag"] == '"3"'
+        assert "version" not in response.json()
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_patch_with_if_match(self, mock_db_client_class):
+        """Test that If-Match is passed down and the new ETag returned"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.update_recipe.return_value = {**UPDATED_RECIPE_RESPONSE, 'version': 4}
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.patch("/recipes/1", json={"name": "Renamed"}, headers={"If-Match": '"3"'})
+        
+        assert response.status_code == 200
+        assert response.headers["etag"] == '"4"'
+        mock_db_client.update_recipe.assert_called_once_with(1, {'name': 'Renamed'}, expected_version=3)
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_patch_version_conflict(self, mock_db_client_class):
+        """Test 412 when the recipe changed since it was read"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.update_recipe.side_effect = VersionConflictError("stale")
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.patch("/recipes/1", json={"name": "Renamed"}, headers={"If-Match": '"2"'})
+        
+        assert response.status_code == 412
+        mock_db_client.disconnect.assert_called_once()
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_patch_wildcard_if_match(self, mock_db_client_class):
+        """Test that If-Match: * accepts any version"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.update_recipe.return_value = UPDATED_RECIPE_RESPONSE
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.patch("/recipes/1", json={"name": "Renamed"}, headers={"If-Match": "*"})
+        
+        assert response.status_code == 200
+        mock_db_client.update_recipe.assert_called_once_with(1, {'name': 'Renamed'}, expected_version=None)
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_patch_invalid_if_match(self, mock_db_client_class):
+        """Test 400 for an If-Match value that is not a recipe version"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.patch("/recipes/1", json={"name": "Renamed"}, headers={"If-Match": '"abc"'})
+        
+        assert response.status_code == 400
+        mock_db_client.update_recipe.assert_not_called()
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_weak_if_match_never_matches(self, mock_db_client_class):
+        """Test 412 for a weak validator, since If-Match requires strong comparison"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.patch("/recipes/1", json={"name": "Renamed"}, headers={"If-Match": 'W/"3"'})
+        
+        assert response.status_code == 412
+        mock_db_client.update_recipe.assert_not_called()
+    
+    @patch('app.routes.recipes.REQUIRE_IF_MATCH', True)
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_if_match_required(self, mock_db_client_class):
+        """Test 428 for unconditional writes when If-Match is required"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client_class.return_value = mock_db_client
+        
+        assert client.patch("/recipes/1", json={"name": "Renamed"}).status_code == 428
+        assert client.delete("/recipes/1").status_code == 428
+        mock_db_client.delete_recipe.assert_not_called()
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_delete_version_conflict(self, mock_db_client_class):
+        """Test 412 when deleting a recipe at a stale version"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.delete_recipe.side_effect = VersionConflictError("stale")
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.delete("/recipes/1", headers={"If-Match": '"2"'})
+        
+        assert response.status_code == 412
+        mock_db_client.delete_recipe.assert_called_once_with(1, expected_version=2)
+
+
+class TestConditionalWrites:
+    """Test the version-guarded statements in DatabaseClient"""
+    
+    def _client(self):
+        """Build a client with a mocked connection and cursor"""
+        db_client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_connection.cursor.return_value = mock_cursor
+        db_client._connection = mock_connection
+        return db_client, mock_connection, mock_cursor
+    
+    def test_update_checks_version_in_one_statement(self):
+        """Test that the version check is part of the UPDATE and the version is bumped"""
+        db_client, mock_connection, mock_cursor = self._client()
+        mock_cursor.fetchone.side_effect = [(1,), UPDATED_RECIPE_DB_ROW]
+        
+        with patch.object(db_client, 'is_connected', return_value=True):
+            recipe = db_client.update_recipe(1, {'name': 'Renamed'}, expected_version=1)
+        
+        sql, values = mock_cursor.execute.call_args_list[1][0]
+        assert "version = version + 1" in sql
+        assert "WHERE id = %s AND version = %s" in sql
+        assert "RETURNING" in sql
+        assert values[-2:] == [1, 1]
+        assert recipe['version'] == 1
+        mock_connection.commit.assert_called_once()
+    
+    def test_update_stale_version_raises(self):
+        """Test that a stale version rolls back and raises"""
+        db_client, mock_connection, mock_cursor = self._client()
+        mock_cursor.fetchone.side_effect = [(1,), None]
+        
+        with patch.object(db_client, 'is_connected', return_value=True):
+            with pytest.raises(VersionConflictError):
+                db_client.update_recipe(1, {'name': 'Renamed'}, expected_version=1)
+        
+        mock_connection.rollback.assert_called_once()
+        mock_connection.commit.assert_not_called()
+    
+    def test_delete_stale_version_raises(self):
+        """Test that deleting at a stale version rolls back and raises"""
+        db_client, mock_connection, mock_cursor = self._client()
+        mock_cursor.fetchone.return_value = (1,)
+        mock_cursor.rowcount = 0
+        
+        with patch.object(db_client, 'is_connected', return_value=True):
+            with pytest.raises(VersionConflictError):
+                db_client.delete_recipe(1, expected_version=5)
+        
+        mock_cursor.execute.assert_called_with("DELETE FROM recipes WHERE id = %s AND version = %s", (1, 5))
+        mock_connection.rollback.assert_called_once()
@@ -0,0 +1,165 @@
+"""
+Unit tests for on-demand request profiling
+"""
+import time
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.profiling import Profiler, _cprofile_lock
+
+# Create a test client
+client = TestClient(app)
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+def busy_recipes():
+    """Burn some CPU and allocate rows, like building a large recipe list"""
+    deadline = time.perf_counter() + 0.03
+    rows = []
+    while time.perf_counter() < deadline:
+        rows.append({'id': len(rows), 'name': f"recipe {len(rows)}"})
+    return []
+
+
+def mock_recipes_client(mock_db_client_class):
+    """Route DatabaseClient to a mock whose get_all_recipes does real work"""
+    mock_db_client = Mock()
+    mock_db_client.connect.return_value = True
+    mock_db_client.get_all_recipes.side_effect = busy_recipes
+    mock_db_client_class.return_value = mock_db_client
+
+
+@patch('app.profiling.PROFILING_TOKEN', 'secret')
+class TestProfilingAdmin:
+    """Test the admin profiling endpoints"""
+    
+    def test_requires_token(self):
+        """Test that a wrong or missing token is rejected"""
+        assert client.post("/admin/profiling", json={"route": "GET /recipes"}).status_code == 403
+        assert client.get("/admin/profiling/1", headers={"X-Admin-Token": "nope"}).status_code == 403
+    
+    def test_rejects_unknown_mode_and_route(self):
+        """Test 400 for modes and routes that cannot be profiled"""
+        response = client.post("/admin/profiling", json={"route": "GET /recipes", "mode": "perf"}, headers=ADMIN)
+        assert response.status_code == 400
+        
+        response = client.post("/admin/profiling", json={"route": "GET /nowhere"}, headers=ADMIN)
+        assert response.status_code == 400
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_sample_mode_returns_collapsed_stacks(self, mock_db_client_class):
+        """Test that an armed session samples the next requests into collapsed stacks"""
+        mock_recipes_client(mock_db_client_class)
+        response = client.post("/admin/profiling", json={"route": "GET /recipes", "mode": "sample", "requests": 2},
+                               headers=ADMIN)
+        assert response.status_code == 201
+        session_id = response.json()['session']['id']
+        
+        for _ in range(3):
+            assert client.get("/recipes").status_code == 200
+        
+        session = client.get(f"/admin/profiling/{session_id}", headers=ADMIN).json()['session']
+        assert session['captured'] == 2
+        assert session['complete'] is True
+        lines = session['output'].splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert stack.startswith("recipes.py:get_all_recipes;")
+        assert "test_profiling.py:busy_recipes" in session['output']
+        assert int(count) >= 1
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_header_cprofile(self, mock_db_client_class):
+        """Test that X-Profile profiles a single request and returns the session id"""
+        mock_recipes_client(mock_db_client_class)
+        
+        response = client.get("/recipes", headers={**ADMIN, "X-Profile": "cprofile"})
+        
+        assert response.status_code == 200
+        session = client.get(f"/admin/profiling/{response.headers['x-profile-id']}", headers=ADMIN).json()['session']
+        assert session['mode'] == 'cprofile'
+        assert session['route'] == 'GET /recipes'
+        assert "busy_recipes" in session['output']
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_overlapping_cprofile_runs_unprofiled(self, mock_db_client_class):
+        """Test that a request arriving during another cProfile capture succeeds and keeps its slot"""
+        mock_recipes_client(mock_db_client_class)
+        response = client.post("/admin/profiling", json={"route": "GET /recipes", "mode": "cprofile", "requests": 1},
+                               headers=ADMIN)
+        session_id = response.json()['session']['id']
+        
+        # Stand in for a capture already running on another thread
+        with _cprofile_lock:
+            busy = client.get("/recipes")
+            single = client.get("/recipes", headers={**ADMIN, "X-Profile": "cprofile"})
+        after = client.get("/recipes")
+        
+        assert busy.status_code == 200
+        assert single.status_code == 200
+        assert "x-profile-id" not in single.headers
+        session = client.get(f"/admin/profiling/{session_id}", headers=ADMIN).json()['session']
+        assert after.status_code == 200
+        assert session['captured'] == 1
+        assert "busy_recipes" in session['output']
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    @patch('app.profiling.cProfile.Profile')
+    def test_profiling_hook_taken(self, mock_profile_class, mock_db_client_class):
+        """Test that a request still succeeds when another tool holds the profiling hook"""
+        mock_recipes_client(mock_db_client_class)
+        mock_profile_class.return_value.enable.side_effect = ValueError("Another profiling tool is already active")
+        
+        response = client.get("/recipes", headers={**ADMIN, "X-Profile": "cprofile"})
+        
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_header_ignored_without_token(self, mock_db_client_class):
+        """Test that X-Profile without a valid token does nothing"""
+        mock_recipes_client(mock_db_client_class)
+        
+        response = client.get("/recipes", headers={"X-Profile": "cprofile"})
+        
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_tracemalloc_mode(self, mock_db_client_class):
+        """Test that tracemalloc mode reports allocation sites"""
+        mock_recipes_client(mock_db_client_class)
+        
+        response = client.get("/recipes", headers={**ADMIN, "X-Profile": "tracemalloc"})
+        
+        session = client.get(f"/admin/profiling/{response.headers['x-profile-id']}", headers=ADMIN).json()['session']
+        assert "size=" in session['output']
+
+
+def test_profiling_disabled_without_token():
+    """Test that the admin endpoints are hidden when no token is configured"""
+    assert client.post("/admin/profiling", json={"route": "GET /recipes"}, headers=ADMIN).status_code == 404
+
+
+def test_claim_disarms_after_requests():
+    """Test that a session serves exactly its requested number of captures"""
+    profiler = Profiler()
+    session = profiler.arm("GET /recipes", "sample", 2)
+    
+    assert profiler.claim("GET /recipes") is session
+    assert profiler.claim("GET /recipes") is session
+    assert profiler.claim("GET /recipes") is None
+    assert "GET /recipes" not in profiler.armed
+
+
+def test_release_returns_slot():
+    """Test that an unused claim is given back to its session"""
+    profiler = Profiler()
+    session = profiler.arm("GET /recipes", "cprofile", 1)
+    
+    assert profiler.claim("GET /recipes") is session
+    profiler.release(session)
+    
+    assert profiler.claim("GET /recipes") is session
+    assert session.remaining == 0
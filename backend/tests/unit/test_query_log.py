@@ -0,0 +1,197 @@
+"""
+Unit tests for per-statement timing, the slow-query log and Server-Timing
+"""
+import json
+import threading
+import psycopg2.extensions
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database_client import DatabaseClient
+from app.metrics import RequestQueries, current_request, current_db_method
+from app.query_log import (fingerprint, record_statement, db_statement_duration, TimedCursor, _explain,
+                           _fingerprint_label)
+
+
+# Create a test client
+client = TestClient(app)
+
+
+def mock_cursor(rowcount=3):
+    """Cursor whose connection reports an idle-in-transaction state"""
+    cursor = Mock()
+    cursor.rowcount = rowcount
+    cursor.connection.autocommit = False
+    cursor.connection.get_transaction_status.return_value = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+    return cursor
+
+
+def slow_log_entries(output):
+    """Parse the slow-query lines printed to stdout"""
+    return [json.loads(line.split("Slow query: ", 1)[1]) for line in output.splitlines() if "Slow query: " in line]
+
+
+class TestFingerprint:
+    """Test statement normalization"""
+    
+    def test_literals_and_placeholders_normalized(self):
+        """Test that literals, numbers and placeholders collapse to ?"""
+        _, text = fingerprint("SELECT * FROM recipes\n   WHERE name = 'x''y' AND id = %s LIMIT 10")
+        assert text == "SELECT * FROM recipes WHERE name = ? AND id = ? LIMIT ?"
+    
+    def test_value_lists_share_a_fingerprint(self):
+        """Test that VALUES batches of different sizes map to one fingerprint"""
+        one = fingerprint("INSERT INTO t (a, b) VALUES (1, 'x')")
+        three = fingerprint("INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y'),(3,'z')")
+        cast = fingerprint("UPDATE t SET a = v.a FROM (VALUES (1::integer, 'x'::varchar)) AS v(id, a)")
+        
+        assert one == three
+        assert one[1] == "INSERT INTO t (a, b) VALUES (...)"
+        assert "(VALUES (...))" in cast[1]
+    
+    def test_execute_values_batches_share_a_fingerprint(self):
+        """Test that rows rendered by execute_values with arrays and NULLs of any shape map to one fingerprint"""
+        insert = "INSERT INTO recipes (name, common_ingredients, prep_time, portions)\n    VALUES "
+        first = fingerprint(insert + "('a',ARRAY['salt','pepper'],NULL,2),('b',ARRAY['salt'],5,NULL) RETURNING id")
+        second = fingerprint(insert + "('c',ARRAY['salt','oil','basil'],10,4) RETURNING id")
+        third = fingerprint(insert + "('d','{}',NULL,NULL),('e',ARRAY[]::text[],1,1),('f',ARRAY['x'],2,2) RETURNING id")
+        
+        assert first == second == third
+        assert first[1].endswith("VALUES (...) RETURNING id")
+    
+    def test_null_checks_kept(self):
+        """Test that IS NULL and IS NOT NULL conditions are not mistaken for values"""
+        _, text = fingerprint("SELECT id FROM recipes WHERE portions IS NULL AND prep_time IS NOT  NULL")
+        assert text == "SELECT id FROM recipes WHERE portions IS NULL AND prep_time IS NOT NULL"
+    
+    def test_distinct_fingerprint_labels_capped(self):
+        """Test that statements beyond the cap share the label "other" """
+        with patch('app.query_log.MAX_FINGERPRINTS', 2), patch('app.query_log._labelled_fingerprints', set()):
+            record_statement(mock_cursor(), "SELECT a FROM capped", None, 0.001)
+            record_statement(mock_cursor(), "SELECT b FROM capped", None, 0.001)
+            record_statement(mock_cursor(), "SELECT c FROM capped", None, 0.001)
+            record_statement(mock_cursor(), "SELECT a FROM capped", None, 0.001)
+        
+        assert sum(db_statement_duration.labels("unknown", "other").counts) >= 1
+        assert sum(db_statement_duration.labels("unknown", fingerprint("SELECT a FROM capped")[0]).counts) == 2
+    
+    def test_fingerprint_cap_holds_across_threads(self):
+        """Test that concurrent new fingerprints never push the labelled set past the cap"""
+        labelled = set()
+        with patch('app.query_log.MAX_FINGERPRINTS', 5), patch('app.query_log._labelled_fingerprints', labelled):
+            threads = [threading.Thread(target=lambda n=n: [_fingerprint_label(f"{n}-{i}") for i in range(200)])
+                       for n in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        assert len(labelled) == 5
+    
+    def test_different_statements_differ(self):
+        """Test that structurally different statements get different ids"""
+        assert fingerprint("SELECT a FROM t")[0] != fingerprint("SELECT b FROM t")[0]
+
+
+class TestSlowQueryLog:
+    """Test statement accounting and the slow-query log"""
+    
+    def test_fast_statement_only_accounted(self, capsys):
+        """Test that statements under the threshold are timed but not logged"""
+        queries = RequestQueries(lambda: "GET /recipes")
+        token = current_request.set(queries)
+        try:
+            record_statement(mock_cursor(), "SELECT 1", None, 0.004)
+        finally:
+            current_request.reset(token)
+        
+        assert queries.count == 1
+        assert queries.seconds == 0.004
+        assert slow_log_entries(capsys.readouterr().out) == []
+    
+    @patch('app.query_log.SLOW_QUERY_MS', 100)
+    def test_slow_statement_logged_with_context(self, capsys):
+        """Test that slow statements log fingerprint, parameter and row counts, method and route"""
+        route_token = current_request.set(RequestQueries(lambda: "GET /recipes/{recipe_id}"))
+        method_token = current_db_method.set("get_recipe_by_id")
+        try:
+            record_statement(mock_cursor(rowcount=1), "SELECT * FROM recipes WHERE id = %s", (7,), 0.25)
+        finally:
+            current_db_method.reset(method_token)
+            current_request.reset(route_token)
+        
+        entry = slow_log_entries(capsys.readouterr().out)[0]
+        assert entry['statement'] == "SELECT * FROM recipes WHERE id = ?"
+        assert entry['fingerprint'] == fingerprint("SELECT * FROM recipes WHERE id = %s")[0]
+        assert entry['params'] == 1
+        assert entry['rows'] == 1
+        assert entry['method'] == "get_recipe_by_id"
+        assert entry['route'] == "GET /recipes/{recipe_id}"
+        assert entry['duration_ms'] == 250.0
+        assert 'plan' not in entry
+    
+    @patch('app.query_log.SLOW_QUERY_EXPLAIN_RATE', 1.0)
+    @patch('app.query_log.SLOW_QUERY_MS', 0)
+    @patch('app.query_log._explain', return_value="Seq Scan on recipes")
+    def test_explain_sampled_for_reads_only(self, mock_explain, capsys):
+        """Test that sampled slow reads carry a plan and writes are never re-run"""
+        record_statement(mock_cursor(), "SELECT * FROM recipes", None, 0.3)
+        record_statement(mock_cursor(), "DELETE FROM recipes WHERE id = %s", (1,), 0.3)
+        
+        select_entry, delete_entry = slow_log_entries(capsys.readouterr().out)
+        assert select_entry['plan'] == "Seq Scan on recipes"
+        assert 'plan' not in delete_entry
+        mock_explain.assert_called_once()
+    
+    @patch('app.query_log.SLOW_QUERY_EXPLAIN_RATE', 1.0)
+    @patch('app.query_log.SLOW_QUERY_MS', 0)
+    @patch('app.query_log._explain', return_value="Seq Scan on recipes")
+    def test_explain_skipped_in_autocommit(self, mock_explain, capsys):
+        """Test that statements on an autocommit connection, where nothing could be rolled back, are not re-run"""
+        cursor = mock_cursor()
+        cursor.connection.autocommit = True
+        record_statement(cursor, "SELECT sync_recipe_ingredients(%s, %s, %s)", (1, "[]", []), 0.3)
+        
+        assert 'plan' not in slow_log_entries(capsys.readouterr().out)[0]
+        mock_explain.assert_not_called()
+    
+    @patch('app.query_log.psycopg2.extensions.cursor')
+    def test_explain_always_rolled_back(self, mock_cursor_class):
+        """Test that the EXPLAIN ANALYZE run is undone even when it succeeds, since a SELECT may write"""
+        explain_cursor = mock_cursor_class.return_value
+        explain_cursor.fetchall.return_value = [("Result",)]
+        
+        plan = _explain(mock_cursor(), b"SELECT sync_recipe_ingredients(1, '[]', '{}')", None)
+        
+        assert plan == "Result"
+        statements = [call[0][0] for call in explain_cursor.execute.call_args_list]
+        assert statements[0] == "SAVEPOINT slow_query_explain"
+        assert statements[-2:] == ["ROLLBACK TO SAVEPOINT slow_query_explain", "RELEASE SAVEPOINT slow_query_explain"]
+        explain_cursor.close.assert_called_once()
+    
+    def test_statement_metric_labelled_by_method(self):
+        """Test that statement durations are attributed to the running DatabaseClient method"""
+        statement_id, _ = fingerprint("SELECT 42 FROM recipe_neighbors")
+        token = current_db_method.set("get_similar_recipes")
+        try:
+            record_statement(mock_cursor(), "SELECT 42 FROM recipe_neighbors", None, 0.001)
+        finally:
+            current_db_method.reset(token)
+        
+        assert sum(db_statement_duration.labels("get_similar_recipes", statement_id).counts) >= 1
+
+
+class TestWiring:
+    """Test that connections use the timed cursor and responses carry Server-Timing"""
+    
+    @patch('app.database_client.psycopg2.connect')
+    def test_connect_uses_timed_cursor(self, mock_connect):
+        """Test that DatabaseClient connections create TimedCursor cursors"""
+        DatabaseClient().connect()
+        assert mock_connect.call_args.kwargs['cursor_factory'] is TimedCursor
+    
+    def test_server_timing_header(self):
+        """Test that responses report database and total time"""
+        response = client.get("/health")
+        
+        assert response.headers["server-timing"].startswith('db;dur=0.0;desc="0 queries", total;dur=')
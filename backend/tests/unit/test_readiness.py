@@ -0,0 +1,237 @@
+"""
+Unit tests for the liveness and readiness probes
+"""
+import asyncio
+import time
+import pytest
+import psycopg2
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database_client import DatabaseClient
+from app.routes.health import database_probe_cache, warm_up
+
+# Create a test client
+client = TestClient(app)
+
+PRIMARY_STATS = {'in_recovery': False, 'replica_lag_seconds': None, 'connections': 10, 'max_connections': 100}
+
+
+@pytest.fixture(autouse=True)
+def fresh_probe_cache():
+    """Start every test without a cached probe result"""
+    database_probe_cache.invalidate()
+    yield
+    database_probe_cache.invalidate()
+
+
+def mock_database(mock_db_client_class, stats=PRIMARY_STATS, connects=True):
+    """Route DatabaseClient to a mock returning the given readiness stats"""
+    mock_db_client = Mock()
+    mock_db_client.connect.return_value = connects
+    mock_db_client.is_connected.return_value = True
+    mock_db_client.get_readiness_stats.return_value = stats
+    mock_db_client_class.return_value = mock_db_client
+    return mock_db_client
+
+
+class TestLiveness:
+    """Test GET /health/live"""
+    
+    @patch('app.routes.health.DatabaseClient')
+    def test_live_never_touches_database(self, mock_db_client_class):
+        """Test that liveness answers without a database client"""
+        response = client.get("/health/live")
+        
+        assert response.status_code == 200
+        assert response.json() == {"status": "alive"}
+        mock_db_client_class.assert_not_called()
+
+
+class TestReadiness:
+    """Test GET /health/ready"""
+    
+    @patch('app.routes.health.DatabaseClient')
+    def test_ready(self, mock_db_client_class):
+        """Test a healthy primary with spare workers"""
+        mock_database(mock_db_client_class)
+        
+        response = client.get("/health/ready")
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert body['status'] == "ready"
+        database = body['checks']['database']
+        assert database['ok'] is True
+        assert database['round_trip_ms'] >= 0
+        assert database['replica_lag_seconds'] is None
+        assert database['connection_utilization'] == 0.1
+        assert body['checks']['workers']['capacity'] > 0
+        assert body['checks']['workers']['in_use'] < body['checks']['workers']['capacity']
+        assert body['checks']['connection_pool']['ok'] is True
+    
+    @patch('app.routes.health.DatabaseClient')
+    def test_probe_result_is_cached(self, mock_db_client_class):
+        """Test that repeated probes within the TTL reuse one database check"""
+        mock_database(mock_db_client_class)
+        
+        first = client.get("/health/ready").json()
+        second = client.get("/health/ready").json()
+        
+        assert first['cached'] is False
+        assert second['cached'] is True
+        assert mock_db_client_class.call_count == 1
+    
+    @patch('app.routes.health.DatabaseClient')
+    def test_database_down(self, mock_db_client_class):
+        """Test 503 when the database cannot be reached"""
+        mock_db_client = mock_database(mock_db_client_class, connects=False)
+        
+        response = client.get("/health/ready")
+        
+        assert response.status_code == 503
+        assert response.json()['status'] == "not_ready"
+        assert response.json()['checks']['database']['error'] == "Failed to connect to database"
+        mock_db_client.disconnect.assert_called_once()
+    
+    @patch('app.routes.health.DatabaseClient')
+    def test_replica_lag(self, mock_db_client_class):
+        """Test 503 when a replica lags too far behind"""
+        mock_database(mock_db_client_class, stats={**PRIMARY_STATS, 'in_recovery': True, 'replica_lag_seconds': 120.0})
+        
+        response = client.get("/health/ready")
+        
+        assert response.status_code == 503
+        assert "Replica lag" in response.json()['checks']['database']['error']
+    
+    @patch('app.routes.health.DatabaseClient')
+    def test_connections_exhausted(self, mock_db_client_class):
+        """Test 503 when the server is out of connections"""
+        mock_database(mock_db_client_class, stats={**PRIMARY_STATS, 'connections': 99})
+        
+        response = client.get("/health/ready")
+        
+        assert response.status_code == 503
+        assert "connections" in response.json()['checks']['database']['error']
+    
+    @patch('app.routes.health.READY_MAX_WORKER_UTILIZATION', 0.0)
+    @patch('app.routes.health.DatabaseClient')
+    def test_workers_saturated(self, mock_db_client_class):
+        """Test 503 when the worker pool is at its limit"""
+        mock_database(mock_db_client_class)
+        
+        response = client.get("/health/ready")
+        
+        assert response.status_code == 503
+        assert response.json()['checks']['workers']['ok'] is False
+    
+    @patch('app.routes.health.pool_usage', return_value=(10, 10))
+    @patch('app.routes.health.DatabaseClient')
+    def test_connection_pool_saturated(self, mock_db_client_class, mock_pool_usage):
+        """Test 503 when every pooled connection is checked out, even though the server has spare connections"""
+        mock_database(mock_db_client_class)
+        
+        response = client.get("/health/ready")
+        
+        assert response.status_code == 503
+        assert response.json()['checks']['database']['ok'] is True
+        assert response.json()['checks']['connection_pool'] == {'ok': False, 'in_use': 10, 'size': 10, 'utilization': 1.0}
+    
+    @patch('app.routes.health.DatabaseClient')
+    def test_probe_error(self, mock_db_client_class):
+        """Test that a failing stats query is reported, not raised"""
+        mock_db_client = mock_database(mock_db_client_class)
+        mock_db_client.get_readiness_stats.side_effect = Exception("boom")
+        
+        response = client.get("/health/ready")
+        
+        assert response.status_code == 503
+        assert response.json()['checks']['database']['error'] == "Database probe failed: boom"
+
+
+class TestReadinessStats:
+    """Test DatabaseClient.get_readiness_stats"""
+    
+    def test_not_connected(self):
+        """Test that the stats query requires a connection"""
+        with pytest.raises(Exception, match="Not connected to database"):
+            DatabaseClient().get_readiness_stats()
+    
+    def test_maps_row(self):
+        """Test that the row is mapped and the read transaction ended"""
+        db_client = DatabaseClient()
+        db_client._connection = Mock()
+        cursor = db_client._connection.cursor.return_value
+        cursor.fetchone.return_value = (True, 3.5, 12, 100)
+        
+        with patch.object(db_client, 'is_connected', return_value=True):
+            stats = db_client.get_readiness_stats()
+        
+        assert stats == {'in_recovery': True, 'replica_lag_seconds': 3.5, 'connections': 12, 'max_connections': 100}
+        db_client._connection.rollback.assert_called_once()
+
+
+class TestWarmUp:
+    """Test the database warm-up run by the lifespan handler"""
+    
+    @patch('app.routes.health.DatabaseClient')
+    def test_primes_readiness_cache(self, mock_db_client_class):
+        """Test that the first readiness probe after startup is served from the warm-up result"""
+        mock_database(mock_db_client_class)
+        
+        database = asyncio.run(warm_up())
+        response = client.get("/health/ready")
+        
+        assert database['ok'] is True
+        assert response.json()['cached'] is True
+        assert mock_db_client_class.call_count == 1
+    
+    @patch('app.routes.health.open_pool')
+    @patch('app.routes.health.DatabaseClient')
+    def test_opens_connection_pool(self, mock_db_client_class, mock_open_pool):
+        """Test that startup pre-opens pooled connections before probing"""
+        mock_database(mock_db_client_class)
+        mock_open_pool.return_value = 5
+        
+        asyncio.run(warm_up())
+        
+        mock_open_pool.assert_called_once()
+    
+    @patch('app.routes.health.open_pool')
+    @patch('app.routes.health.DatabaseClient')
+    def test_pool_failure_does_not_block_startup(self, mock_db_client_class, mock_open_pool):
+        """Test that the probe still runs when the pool cannot be opened"""
+        mock_database(mock_db_client_class)
+        mock_open_pool.side_effect = psycopg2.OperationalError("connection refused")
+        
+        database = asyncio.run(warm_up())
+        
+        assert database['ok'] is True
+    
+    @patch('app.routes.health.DatabaseClient')
+    def test_database_down_does_not_block_startup(self, mock_db_client_class):
+        """Test that a failed probe is reported and startup continues"""
+        mock_database(mock_db_client_class, connects=False)
+        
+        database = asyncio.run(warm_up())
+        
+        assert database['ok'] is False
+    
+    @patch('app.routes.health.STARTUP_WARMUP_TIMEOUT', 0.05)
+    @patch('app.routes.health.probe_database')
+    def test_slow_probe_times_out(self, mock_probe):
+        """Test that startup stops waiting for a probe that hangs"""
+        mock_probe.side_effect = lambda: time.sleep(0.5) or {'ok': True}
+        
+        started = time.perf_counter()
+        database = asyncio.run(warm_up())
+        
+        assert database is None
+        assert time.perf_counter() - started < 0.4
+    
+    @patch('app.routes.health.STARTUP_WARMUP_TIMEOUT', 0)
+    @patch('app.routes.health.DatabaseClient')
+    def test_disabled(self, mock_db_client_class):
+        """Test that a zero timeout skips the warm-up"""
+        assert asyncio.run(warm_up()) is None
+        mock_db_client_class.assert_not_called()
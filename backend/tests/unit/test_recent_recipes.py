@@ -0,0 +1,156 @@
+"""
+Unit tests for the recent recipes feed
+"""
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database_client import DatabaseClient
+from .conftest import UPDATE_RECIPE_PARAMS, UPDATED_RECIPE_DB_ROW
+
+
+# Create a test client
+client = TestClient(app)
+
+UPDATED_AT = datetime(2025, 1, 15, 12, 30, tzinfo=timezone.utc)
+
+RECENT_RECIPE_DB_ROW = (7, 'Avocado Toast', 'breakfast', 10, UPDATED_AT)
+
+RECENT_RECIPE = {
+    'id': 7,
+    'name': 'Avocado Toast',
+    'category': 'breakfast',
+    'prep_time': 10,
+    'updated_at': UPDATED_AT
+}
+
+
+class TestDatabaseClientGetRecentRecipes:
+    """Test DatabaseClient get_recent_recipes method"""
+    
+    def test_get_recent_recipes_success(self):
+        """Test retrieval of the latest recipe cards"""
+        # Setup client with mock connection
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = [RECENT_RECIPE_DB_ROW]
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            recipes = client.get_recent_recipes(5)
+        
+        # Assertions
+        assert recipes == [RECENT_RECIPE]
+        
+        # Verify the query orders by the indexed columns and is limited
+        call_args = mock_cursor.execute.call_args
+        assert "ORDER BY updated_at DESC, id DESC" in call_args[0][0]
+        assert "LIMIT %s" in call_args[0][0]
+        assert "instructions" not in call_args[0][0]
+        assert call_args[0][1] == (5,)
+        mock_cursor.close.assert_called_once()
+    
+    def test_get_recent_recipes_not_connected(self):
+        """Test get_recent_recipes when not connected to database"""
+        client = DatabaseClient()
+        client._connection = None
+        
+        with patch.object(client, 'is_connected', return_value=False):
+            with pytest.raises(Exception, match="Not connected to database"):
+                client.get_recent_recipes()
+    
+    def test_update_recipe_bumps_updated_at(self):
+        """Test that update_recipe refreshes updated_at"""
+        # Setup client with mock connection
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchone.side_effect = [(1,), UPDATED_RECIPE_DB_ROW]
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            client.update_recipe(1, UPDATE_RECIPE_PARAMS)
+        
+        update_sql = mock_cursor.execute.call_args_list[1][0][0]
+        assert "updated_at = now()" in update_sql
+
+
+class TestRecentRecipesEndpoint:
+    """Test the GET /recipes/recent endpoint"""
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_get_recent_recipes_success(self, mock_db_client_class):
+        """Test successful retrieval of recent recipes"""
+        # Setup mock
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_recent_recipes.return_value = [RECENT_RECIPE]
+        
+        # Make request
+        response = client.get("/recipes/recent?limit=5")
+        
+        # Assertions
+        assert response.status_code == 200
+        json_response = response.json()
+        assert json_response["status"] == "success"
+        assert json_response["count"] == 1
+        assert json_response["recipes"][0]["name"] == "Avocado Toast"
+        assert "instructions" not in json_response["recipes"][0]
+        mock_db_client.get_recent_recipes.assert_called_once_with(5)
+        mock_db_client.disconnect.assert_called_once()
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_recipe_without_category(self, mock_db_client_class):
+        """Test that a recipe whose category was cleared is listed with a null category"""
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_recent_recipes.return_value = [{**RECENT_RECIPE, 'category': None}]
+        
+        response = client.get("/recipes/recent")
+        
+        assert response.status_code == 200
+        assert response.json()["recipes"][0]["category"] is None
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_get_recent_recipes_default_limit(self, mock_db_client_class):
+        """Test that the limit defaults to 10"""
+        # Setup mock
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_recent_recipes.return_value = []
+        
+        # Make request
+        response = client.get("/recipes/recent")
+        
+        # Assertions
+        assert response.status_code == 200
+        mock_db_client.get_recent_recipes.assert_called_once_with(10)
+    
+    def test_get_recent_recipes_invalid_limit(self):
+        """Test that out-of-range limits are rejected"""
+        assert client.get("/recipes/recent?limit=0").status_code == 422
+        assert client.get("/recipes/recent?limit=500").status_code == 422
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_get_recent_recipes_database_error(self, mock_db_client_class):
+        """Test handling of database errors"""
+        # Setup mock to simulate database error
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_recent_recipes.side_effect = Exception("Database error")
+        
+        # Make request
+        response = client.get("/recipes/recent")
+        
+        # Assertions
+        assert response.status_code == 500
+        assert "Error retrieving recent recipes" in response.json()["detail"]
+        mock_db_client.disconnect.assert_called_once()
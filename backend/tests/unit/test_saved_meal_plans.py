@@ -0,0 +1,220 @@
+"""
+Unit tests for saved meal plans
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from psycopg2 import errors
+from app.main import app
+from app.database_client import DatabaseClient
+
+
+# Create a test client
+client = TestClient(app)
+
+SAVED_PLAN = {
+    'id': 1,
+    'name': 'Week 1',
+    'start_date': None,
+    'created_at': datetime(2024, 1, 1, 12, 0),
+    'updated_at': datetime(2024, 1, 1, 12, 0),
+    'entries': [
+        {'id': 10, 'day': 1, 'category': 'dinner', 'recipe_id': 5, 'portions': 4,
+         'recipe': {'id': 5, 'name': 'Test Pasta', 'prep_time': 15, 'portions': 2}},
+    ]
+}
+
+
+class TestSavedMealPlanEndpoints:
+    """Test the meal plan CRUD endpoints"""
+    
+    @patch('app.routes.meal_plans.DatabaseClient')
+    def test_create_meal_plan(self, mock_db_client_class):
+        """Test that a plan is saved and returned with its recipes"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.create_meal_plan.return_value = SAVED_PLAN
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.post("/meal-plans", json={
+            "name": "Week 1",
+            "entries": [{"day": 1, "category": "dinner", "recipe_id": 5, "portions": 4}]
+        })
+        
+        assert response.status_code == 201
+        data = response.json()
+        assert data['plan']['entries'][0]['recipe']['name'] == 'Test Pasta'
+        kwargs = mock_db_client.create_meal_plan.call_args.kwargs
+        assert kwargs['entries'] == [{'day': 1, 'category': 'dinner', 'recipe_id': 5, 'portions': 4}]
+        mock_db_client.disconnect.assert_called_once()
+    
+    @patch('app.routes.meal_plans.DatabaseClient')
+    def test_create_meal_plan_unknown_recipe(self, mock_db_client_class):
+        """Test that entries pointing at missing recipes are rejected"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.create_meal_plan.side_effect = errors.ForeignKeyViolation()
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.post("/meal-plans", json={
+            "name": "Week 1",
+            "entries": [{"day": 1, "category": "dinner", "recipe_id": 999}]
+        })
+        
+        assert response.status_code == 400
+    
+    def test_create_meal_plan_invalid_day(self):
+        """Test that day numbers start at 1"""
+        response = client.post("/meal-plans", json={
+            "name": "Week 1",
+            "entries": [{"day": 0, "category": "dinner", "recipe_id": 5}]
+        })
+        
+        assert response.status_code == 422
+    
+    @patch('app.routes.meal_plans.DatabaseClient')
+    def test_get_meal_plan_with_shopping_list(self, mock_db_client_class):
+        """Test that the shopping list is embedded on request"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_meal_plan.return_value = {
+            **SAVED_PLAN,
+            'shopping_list': {
+                'main_ingredients': [{'name': 'pasta', 'unit': 'g', 'quantity': 400.0}],
+                'common_ingredients': ['salt']
+            }
+        }
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.get("/meal-plans/1?include_shopping_list=true")
+        
+        assert response.status_code == 200
+        assert response.json()['plan']['shopping_list']['common_ingredients'] == ['salt']
+        mock_db_client.get_meal_plan.assert_called_once_with(1, include_shopping_list=True)
+    
+    @patch('app.routes.meal_plans.DatabaseClient')
+    def test_get_meal_plan_not_found(self, mock_db_client_class):
+        """Test 404 for a missing plan"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_meal_plan.return_value = None
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.get("/meal-plans/99")
+        
+        assert response.status_code == 404
+    
+    @patch('app.routes.meal_plans.DatabaseClient')
+    def test_list_meal_plans(self, mock_db_client_class):
+        """Test that plans are listed with their entry counts"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.list_meal_plans.return_value = [
+            {'id': 1, 'name': 'Week 1', 'start_date': None, 'entry_count': 21,
+             'updated_at': datetime(2024, 1, 1, 12, 0)}
+        ]
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.get("/meal-plans?limit=10")
+        
+        assert response.status_code == 200
+        assert response.json()['count'] == 1
+        mock_db_client.list_meal_plans.assert_called_once_with(limit=10, offset=0)
+    
+    @patch('app.routes.meal_plans.DatabaseClient')
+    def test_update_meal_plan_empty_body(self, mock_db_client_class):
+        """Test that an empty update is rejected"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.patch("/meal-plans/1", json={})
+        
+        assert response.status_code == 400
+    
+    @patch('app.routes.meal_plans.DatabaseClient')
+    def test_update_meal_plan(self, mock_db_client_class):
+        """Test that an update returns the reloaded plan"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.update_meal_plan.return_value = SAVED_PLAN
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.patch("/meal-plans/1", json={"name": "Week 1"})
+        
+        assert response.status_code == 200
+        mock_db_client.update_meal_plan.assert_called_once_with(1, {'name': 'Week 1'})
+    
+    @patch('app.routes.meal_plans.DatabaseClient')
+    def test_delete_meal_plan_not_found(self, mock_db_client_class):
+        """Test 404 when deleting a missing plan"""
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.delete_meal_plan.return_value = False
+        mock_db_client_class.return_value = mock_db_client
+        
+        response = client.delete("/meal-plans/99")
+        
+        assert response.status_code == 404
+
+
+class TestGetMealPlanQueries:
+    """Test that loading a plan uses a fixed number of queries"""
+    
+    def _client_with_rows(self, entry_rows):
+        """Build a client whose cursor returns one plan row and the given entry rows"""
+        db_client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = (1, 'Week 1', None, datetime(2024, 1, 1), datetime(2024, 1, 1))
+        mock_cursor.fetchall.return_value = entry_rows
+        mock_connection.cursor.return_value = mock_cursor
+        db_client._connection = mock_connection
+        return db_client, mock_cursor
+    
+    def test_query_count_does_not_grow_with_entries(self):
+        """Test that plan, entries and recipes load in two queries however many entries exist"""
+        entry_rows = [(i, i % 7 + 1, 'dinner', i, None, f'Recipe {i}', 10, 2) for i in range(1, 50)]
+        db_client, mock_cursor = self._client_with_rows(entry_rows)
+        
+        with patch.object(db_client, 'is_connected', return_value=True):
+            plan = db_client.get_meal_plan(1)
+        
+        assert mock_cursor.execute.call_count == 2
+        assert len(plan['entries']) == 49
+        assert plan['entries'][0]['recipe'] == {'id': 1, 'name': 'Recipe 1', 'prep_time': 10, 'portions': 2}
+        assert "JOIN recipes" in mock_cursor.execute.call_args_list[1][0][0]
+    
+    def test_shopping_list_adds_one_query(self):
+        """Test that the shopping list is aggregated for all entries at once"""
+        entry_rows = [(1, 1, 'dinner', 5, 4, 'Test Pasta', 15, 2), (2, 2, 'dinner', 5, None, 'Test Pasta', 15, 2)]
+        db_client, mock_cursor = self._client_with_rows(entry_rows)
+        shopping_list = {'main_ingredients': [], 'common_ingredients': ['salt'], 'missing_recipe_ids': []}
+        
+        with patch.object(db_client, 'is_connected', return_value=True), \
+                patch.object(db_client, 'get_shopping_list', return_value=shopping_list) as mock_shopping_list:
+            plan = db_client.get_meal_plan(1, include_shopping_list=True)
+        
+        mock_shopping_list.assert_called_once_with([
+            {'recipe_id': 5, 'portions': 4}, {'recipe_id': 5, 'portions': None}
+        ])
+        assert plan['shopping_list'] == {'main_ingredients': [], 'common_ingredients': ['salt']}
+    
+    def test_missing_plan(self):
+        """Test that a missing plan returns None without loading entries"""
+        db_client, mock_cursor = self._client_with_rows([])
+        mock_cursor.fetchone.return_value = None
+        
+        with patch.object(db_client, 'is_connected', return_value=True):
+            assert db_client.get_meal_plan(1) is None
+        
+        assert mock_cursor.execute.call_count == 1
+    
+    def test_not_connected(self):
+        """Test that loading a plan requires a connection"""
+        db_client = DatabaseClient()
+        
+        with patch.object(db_client, 'is_connected', return_value=False):
+            with pytest.raises(Exception, match="Not connected to database"):
+                db_client.get_meal_plan(1)
@@ -0,0 +1,167 @@
+"""
+Unit tests for batch portion scaling
+"""
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database_client import DatabaseClient
+from app.scaling import scale_recipes
+from app.units import round_quantities
+
+
+# Create a test client
+client = TestClient(app)
+
+PASTA_RECIPE = {
+    'id': 1,
+    'name': 'Test Pasta',
+    'portions': 2,
+    'main_ingredients': [
+        {'quantity': 250, 'unit': 'g', 'name': 'pasta'},
+        {'quantity': 1, 'unit': 'pcs', 'name': 'onion'},
+    ]
+}
+
+SOUP_RECIPE = {
+    'id': 2,
+    'name': 'Test Soup',
+    'portions': 4,
+    'main_ingredients': [{'quantity': 1, 'unit': 'l', 'name': 'broth'}]
+}
+
+
+class TestRoundQuantities:
+    """Test unit-aware rounding"""
+    
+    def test_count_units_round_up(self):
+        """Test that countable units are rounded up to whole numbers"""
+        rounded = round_quantities(np.array([1.5, 2.0000000001, 0.333]), ['pcs', 'pieces', 'g'])
+        
+        np.testing.assert_allclose(rounded, [2.0, 2.0, 0.33])
+
+
+class TestScaleRecipes:
+    """Test the scale_recipes engine"""
+    
+    def test_scale_recipes(self):
+        """Test scaling several recipes in one pass"""
+        scaled = scale_recipes([PASTA_RECIPE, SOUP_RECIPE], [3, 2])
+        
+        assert scaled[0]['target_portions'] == 3
+        assert scaled[0]['main_ingredients'] == [
+            {'quantity': 375.0, 'unit': 'g', 'name': 'pasta'},
+            {'quantity': 2.0, 'unit': 'pcs', 'name': 'onion'},
+        ]
+        assert scaled[1]['main_ingredients'] == [{'quantity': 0.5, 'unit': 'l', 'name': 'broth'}]
+    
+    def test_scale_recipe_without_stored_portions(self):
+        """Test that recipes without stored portions are left unscaled"""
+        recipe = {**SOUP_RECIPE, 'portions': None}
+        
+        scaled = scale_recipes([recipe], [6])
+        
+        assert scaled[0]['main_ingredients'][0]['quantity'] == 1.0
+    
+    def test_scale_recipe_without_ingredients(self):
+        """Test recipes with no main ingredients"""
+        recipe = {**SOUP_RECIPE, 'main_ingredients': []}
+        
+        scaled = scale_recipes([recipe, PASTA_RECIPE], [2, 4])
+        
+        assert scaled[0]['main_ingredients'] == []
+        assert scaled[1]['main_ingredients'][0]['quantity'] == 500.0
+    
+    def test_scale_no_recipes(self):
+        """Test that an empty batch returns nothing"""
+        assert scale_recipes([], []) == []
+
+
+class TestDatabaseClientGetRecipeIngredients:
+    """Test DatabaseClient get_recipe_ingredients method"""
+    
+    def test_get_recipe_ingredients_success(self):
+        """Test that all recipes are fetched with a single query"""
+        # Setup client with mock connection
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = [(1, 'Test Pasta', 2, PASTA_RECIPE['main_ingredients'])]
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            recipes = client.get_recipe_ingredients([1, 2])
+        
+        # Assertions
+        assert recipes == [PASTA_RECIPE]
+        mock_cursor.execute.assert_called_once()
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "WHERE id = ANY(%s)" in sql
+        assert params == ([1, 2],)
+    
+    def test_get_recipe_ingredients_not_connected(self):
+        """Test get_recipe_ingredients when not connected to database"""
+        client = DatabaseClient()
+        client._connection = None
+        
+        with patch.object(client, 'is_connected', return_value=False):
+            with pytest.raises(Exception, match="Not connected to database"):
+                client.get_recipe_ingredients([1])
+
+
+class TestScaleEndpoint:
+    """Test the POST /recipes/scale endpoint"""
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_scale_success(self, mock_db_client_class):
+        """Test scaling a batch that includes a repeated and a missing recipe"""
+        # Setup mock
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_recipe_ingredients.return_value = [PASTA_RECIPE]
+        
+        # Make request
+        response = client.post("/recipes/scale", json={"items": [
+            {"recipe_id": 1, "target_portions": 4},
+            {"recipe_id": 1, "target_portions": 1},
+            {"recipe_id": 42, "target_portions": 2},
+        ]})
+        
+        # Assertions
+        assert response.status_code == 200
+        json_response = response.json()
+        assert json_response["status"] == "success"
+        assert [r["target_portions"] for r in json_response["recipes"]] == [4, 1]
+        assert json_response["recipes"][0]["main_ingredients"][0]["quantity"] == 500.0
+        assert json_response["recipes"][1]["main_ingredients"][1]["quantity"] == 1.0
+        assert json_response["missing_recipe_ids"] == [42]
+        
+        # One fetch for the whole batch
+        mock_db_client.get_recipe_ingredients.assert_called_once_with({1, 42})
+        mock_db_client.disconnect.assert_called_once()
+    
+    def test_scale_invalid_target(self):
+        """Test that non-positive targets are rejected"""
+        response = client.post("/recipes/scale", json={"items": [{"recipe_id": 1, "target_portions": 0}]})
+        
+        assert response.status_code == 422
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_scale_database_error(self, mock_db_client_class):
+        """Test handling of database errors during scaling"""
+        # Setup mock to simulate database error
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_recipe_ingredients.side_effect = Exception("Database error")
+        
+        # Make request
+        response = client.post("/recipes/scale", json={"items": [{"recipe_id": 1, "target_portions": 2}]})
+        
+        # Assertions
+        assert response.status_code == 500
+        assert "Error scaling recipes" in response.json()["detail"]
+        mock_db_client.disconnect.assert_called_once()
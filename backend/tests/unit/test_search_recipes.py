@@ -0,0 +1,178 @@
+"""
+Unit tests for recipe search with facet counts
+"""
+import pytest
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database_client import DatabaseClient
+from .conftest import SAMPLE_RECIPE_1, SAMPLE_RECIPE_1_DB_ROW
+
+
+# Create a test client
+client = TestClient(app)
+
+# Page row carries the window total as its last column
+SEARCH_PAGE_DB_ROW = SAMPLE_RECIPE_1_DB_ROW + (3,)
+
+# (category, prep_bucket, portions_bucket, grouping bitmask, count)
+FACET_DB_ROWS = [
+    ('dinner', None, None, 0b011, 2),
+    ('lunch', None, None, 0b011, 1),
+    (None, '15-30', None, 0b101, 2),
+    (None, None, None, 0b101, 1),  # recipes without prep_time
+    (None, None, '3-4', 0b110, 3),
+]
+
+SEARCH_RESULT = {
+    'total': 3,
+    'recipes': [SAMPLE_RECIPE_1],
+    'facets': {
+        'category': {'dinner': 2, 'lunch': 1},
+        'prep_time': {'0-15': 0, '15-30': 2, '30-60': 0, '60+': 0},
+        'portions': {'1-2': 0, '3-4': 3, '5+': 0}
+    }
+}
+
+
+def make_client(page_rows, facet_rows=None):
+    """Create a DatabaseClient whose cursor returns the given rows"""
+    client = DatabaseClient()
+    mock_connection = Mock()
+    mock_cursor = Mock()
+    mock_cursor.fetchall.side_effect = [page_rows] + ([facet_rows] if facet_rows is not None else [])
+    mock_connection.cursor.return_value = mock_cursor
+    client._connection = mock_connection
+    return client, mock_cursor
+
+
+class TestDatabaseClientSearchRecipes:
+    """Test DatabaseClient search_recipes method"""
+    
+    def test_search_recipes_with_facets(self):
+        """Test that the page and facets come back from two statements"""
+        client, mock_cursor = make_client([SEARCH_PAGE_DB_ROW], FACET_DB_ROWS)
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            result = client.search_recipes(query='pasta', category='dinner', limit=10, offset=0)
+        
+        # Assertions
+        assert result == SEARCH_RESULT
+        assert mock_cursor.execute.call_count == 2
+        
+        page_sql, page_params = mock_cursor.execute.call_args_list[0][0]
+        assert "COUNT(*) OVER ()" in page_sql
+        assert "name ILIKE %s" in page_sql
+        assert "category = %s" in page_sql
+        assert page_params == ['%pasta%', 'dinner', 10, 0]
+        
+        facet_sql, facet_params = mock_cursor.execute.call_args_list[1][0]
+        assert "GROUPING SETS" in facet_sql
+        assert facet_params == ['%pasta%', 'dinner']
+        mock_cursor.close.assert_called_once()
+    
+    def test_search_recipes_without_facets(self):
+        """Test that facets can be skipped entirely"""
+        client, mock_cursor = make_client([SEARCH_PAGE_DB_ROW])
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            result = client.search_recipes(include_facets=False)
+        
+        # Assertions
+        assert result['facets'] is None
+        assert result['total'] == 3
+        mock_cursor.execute.assert_called_once()
+        assert "WHERE" not in mock_cursor.execute.call_args[0][0]
+    
+    def test_search_recipes_numeric_filters(self):
+        """Test prep time and portions filters"""
+        client, mock_cursor = make_client([], [])
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            result = client.search_recipes(max_prep_time=30, min_portions=2)
+        
+        # Assertions
+        assert result['total'] == 0
+        assert result['recipes'] == []
+        page_sql, page_params = mock_cursor.execute.call_args_list[0][0]
+        assert "prep_time <= %s AND portions >= %s" in page_sql
+        assert page_params == [30, 2, 20, 0]
+    
+    def test_search_recipes_not_connected(self):
+        """Test search_recipes when not connected to database"""
+        client = DatabaseClient()
+        client._connection = None
+        
+        with patch.object(client, 'is_connected', return_value=False):
+            with pytest.raises(Exception, match="Not connected to database"):
+                client.search_recipes()
+
+
+class TestSearchRecipesEndpoint:
+    """Test the GET /recipes/search endpoint"""
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_search_recipes_success(self, mock_db_client_class):
+        """Test a search returning results and facets"""
+        # Setup mock
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.search_recipes.return_value = SEARCH_RESULT
+        
+        # Make request
+        response = client.get("/recipes/search?q=pasta&category=dinner&limit=5")
+        
+        # Assertions
+        assert response.status_code == 200
+        json_response = response.json()
+        assert json_response["status"] == "success"
+        assert json_response["count"] == 1
+        assert json_response["total"] == 3
+        assert json_response["recipes"][0]["name"] == "Test Recipe"
+        assert json_response["facets"] == SEARCH_RESULT["facets"]
+        
+        mock_db_client.search_recipes.assert_called_once_with(
+            query='pasta', category='dinner', max_prep_time=None, min_portions=None,
+            limit=5, offset=0, include_facets=True
+        )
+        mock_db_client.disconnect.assert_called_once()
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_search_recipes_skip_facets(self, mock_db_client_class):
+        """Test that facets=false is passed through"""
+        # Setup mock
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.search_recipes.return_value = {'total': 0, 'recipes': [], 'facets': None}
+        
+        # Make request
+        response = client.get("/recipes/search?facets=false")
+        
+        # Assertions
+        assert response.status_code == 200
+        assert response.json()["facets"] is None
+        assert mock_db_client.search_recipes.call_args[1]['include_facets'] is False
+    
+    def test_search_recipes_invalid_paging(self):
+        """Test that invalid paging parameters are rejected"""
+        assert client.get("/recipes/search?limit=0").status_code == 422
+        assert client.get("/recipes/search?offset=-1").status_code == 422
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_search_recipes_database_error(self, mock_db_client_class):
+        """Test handling of database errors during search"""
+        # Setup mock to simulate database error
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.search_recipes.side_effect = Exception("Database error")
+        
+        # Make request
+        response = client.get("/recipes/search?q=pasta")
+        
+        # Assertions
+        assert response.status_code == 500
+        assert "Error searching recipes" in response.json()["detail"]
+        mock_db_client.disconnect.assert_called_once()
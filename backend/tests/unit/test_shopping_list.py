@@ -0,0 +1,157 @@
+"""
+Unit tests for the aggregated shopping list
+"""
+import pytest
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database_client import DatabaseClient
+
+
+# Create a test client
+client = TestClient(app)
+
+SHOPPING_LIST_ITEMS = [
+    {'recipe_id': 1, 'portions': 4},
+    {'recipe_id': 2, 'portions': None},
+    {'recipe_id': 99, 'portions': 2},
+]
+
+# (kind, name, unit, quantity) rows as returned by the aggregation query
+SHOPPING_LIST_DB_ROWS = [
+    ('common', 'pepper', None, None),
+    ('common', 'salt', None, None),
+    ('main', 'pasta', 'g', 500.0),
+    ('main', 'tomato', 'g', 1000.00004),
+    ('recipe', '1', None, None),
+    ('recipe', '2', None, None),
+]
+
+SHOPPING_LIST = {
+    'main_ingredients': [
+        {'name': 'pasta', 'unit': 'g', 'quantity': 500.0},
+        {'name': 'tomato', 'unit': 'g', 'quantity': 1000.0},
+    ],
+    'common_ingredients': ['pepper', 'salt'],
+    'missing_recipe_ids': [99]
+}
+
+
+class TestDatabaseClientGetShoppingList:
+    """Test DatabaseClient get_shopping_list method"""
+    
+    def test_get_shopping_list_success(self):
+        """Test that all recipes are aggregated in a single query"""
+        # Setup client with mock connection
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = SHOPPING_LIST_DB_ROWS
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            result = client.get_shopping_list(SHOPPING_LIST_ITEMS)
+        
+        # Assertions
+        assert result == SHOPPING_LIST
+        mock_cursor.execute.assert_called_once()
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "jsonb_array_elements" in sql
+        assert "GROUP BY" in sql
+        assert params == ([1, 2, 99], [4, None, 2])
+        mock_cursor.close.assert_called_once()
+    
+    def test_missing_quantity_is_kept(self):
+        """Test that an ingredient whose stored rows have no quantity is listed without one"""
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = [('main', 'water', 'ml', None), ('recipe', '1', None, None)]
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            result = client.get_shopping_list([{'recipe_id': 1, 'portions': 2}])
+        
+        assert result['main_ingredients'] == [{'name': 'water', 'unit': 'ml', 'quantity': None}]
+        sql = mock_cursor.execute.call_args[0][0]
+        assert "ingredient->>'name' IS NOT NULL" in sql
+    
+    def test_get_shopping_list_not_connected(self):
+        """Test get_shopping_list when not connected to database"""
+        client = DatabaseClient()
+        client._connection = None
+        
+        with patch.object(client, 'is_connected', return_value=False):
+            with pytest.raises(Exception, match="Not connected to database"):
+                client.get_shopping_list(SHOPPING_LIST_ITEMS)
+
+
+class TestShoppingListEndpoint:
+    """Test the POST /shopping-list endpoint"""
+    
+    @patch('app.routes.shopping_list.DatabaseClient')
+    def test_create_shopping_list_success(self, mock_db_client_class):
+        """Test successful shopping list aggregation"""
+        # Setup mock
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_shopping_list.return_value = SHOPPING_LIST
+        
+        # Make request
+        response = client.post("/shopping-list", json={"items": SHOPPING_LIST_ITEMS})
+        
+        # Assertions
+        assert response.status_code == 200
+        json_response = response.json()
+        assert json_response["status"] == "success"
+        assert json_response["main_ingredients"] == SHOPPING_LIST["main_ingredients"]
+        assert json_response["common_ingredients"] == ['pepper', 'salt']
+        assert json_response["missing_recipe_ids"] == [99]
+        mock_db_client.get_shopping_list.assert_called_once_with(SHOPPING_LIST_ITEMS)
+        mock_db_client.disconnect.assert_called_once()
+    
+    @patch('app.routes.shopping_list.DatabaseClient')
+    def test_ingredient_without_quantity_or_unit(self, mock_db_client_class):
+        """Test that legacy ingredients without a quantity or unit are returned instead of a 500"""
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_shopping_list.return_value = {
+            **SHOPPING_LIST, 'main_ingredients': [{'name': 'water', 'unit': None, 'quantity': None}]}
+        
+        response = client.post("/shopping-list", json={"items": SHOPPING_LIST_ITEMS})
+        
+        assert response.status_code == 200
+        assert response.json()["main_ingredients"] == [{'name': 'water', 'unit': None, 'quantity': None}]
+    
+    def test_create_shopping_list_empty(self):
+        """Test that an empty item list is rejected"""
+        response = client.post("/shopping-list", json={"items": []})
+        
+        assert response.status_code == 422
+    
+    def test_create_shopping_list_invalid_portions(self):
+        """Test that non-positive portions are rejected"""
+        response = client.post("/shopping-list", json={"items": [{"recipe_id": 1, "portions": 0}]})
+        
+        assert response.status_code == 422
+    
+    @patch('app.routes.shopping_list.DatabaseClient')
+    def test_create_shopping_list_database_error(self, mock_db_client_class):
+        """Test handling of database errors during aggregation"""
+        # Setup mock to simulate database error
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_shopping_list.side_effect = Exception("Database error")
+        
+        # Make request
+        response = client.post("/shopping-list", json={"items": SHOPPING_LIST_ITEMS})
+        
+        # Assertions
+        assert response.status_code == 500
+        assert "Error building shopping list" in response.json()["detail"]
+        mock_db_client.disconnect.assert_called_once()
@@ -0,0 +1,238 @@
+"""
+Unit tests for the recipe similarity index
+"""
+import pytest
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database_client import DatabaseClient
+from app.similarity import build_feature_matrix, top_k_neighbors, affected_rows, refresh_neighbors
+
+
+# Create a test client
+client = TestClient(app)
+
+SIMILARITY_FEATURES = [
+    {'id': 1, 'category': 'dinner', 'main_ingredients': [{'name': 'pasta'}, {'name': 'tomato'}],
+     'common_ingredients': ['salt', 'basil']},
+    {'id': 2, 'category': 'dinner', 'main_ingredients': [{'name': 'Pasta'}, {'name': 'tomato'}, {'name': 'burrata'}],
+     'common_ingredients': ['salt']},
+    {'id': 3, 'category': 'breakfast', 'main_ingredients': [{'name': 'oats'}, {'name': 'milk'}],
+     'common_ingredients': ['salt']},
+    {'id': 4, 'category': 'snack', 'main_ingredients': [{'name': 'apple'}], 'common_ingredients': []},
+]
+
+SIMILAR_RECIPES = [
+    {'id': 2, 'name': 'Burrata Pasta', 'category': 'dinner', 'prep_time': 15, 'score': 0.82},
+]
+
+
+class TestSimilarityEngine:
+    """Test matrix building and neighbour computation"""
+    
+    def test_feature_matrix_rows_are_normalized(self):
+        """Test that every recipe row has unit length"""
+        matrix = build_feature_matrix(SIMILARITY_FEATURES)
+        
+        assert matrix.shape[0] == 4
+        norms = matrix.multiply(matrix).sum(axis=1)
+        assert all(abs(norm - 1.0) < 1e-5 for norm in norms.A1)
+    
+    def test_top_k_neighbors(self):
+        """Test that neighbours are ranked by similarity and exclude the recipe itself"""
+        matrix = build_feature_matrix(SIMILARITY_FEATURES)
+        ids = [r['id'] for r in SIMILARITY_FEATURES]
+        
+        neighbors = top_k_neighbors(matrix, ids, [0], k=3)
+        
+        assert [n[1] for n in neighbors] == [2, 3]
+        assert [n[2] for n in neighbors] == [1, 2]
+        assert all(n[0] == 1 for n in neighbors)
+        assert neighbors[0][3] > neighbors[1][3] > 0
+    
+    def test_top_k_neighbors_skips_unrelated(self):
+        """Test that recipes with nothing in common are not stored as neighbours"""
+        matrix = build_feature_matrix(SIMILARITY_FEATURES)
+        ids = [r['id'] for r in SIMILARITY_FEATURES]
+        
+        assert top_k_neighbors(matrix, ids, [3]) == []
+    
+    def test_affected_rows(self):
+        """Test that clean recipes are refreshed when a dirty one beats their weakest neighbour"""
+        matrix = build_feature_matrix(SIMILARITY_FEATURES)
+        ids = [r['id'] for r in SIMILARITY_FEATURES]
+        
+        # Recipe 1 already has a strong full neighbour list, recipe 3 has none
+        rows = affected_rows(matrix, ids, [2], {1: 0.99})
+        
+        assert rows == [1, 2]
+    
+    def test_affected_rows_include_referrers(self):
+        """Test that recipes listing a dirty recipe are refreshed even when it no longer beats their cutoff"""
+        matrix = build_feature_matrix(SIMILARITY_FEATURES)
+        ids = [r['id'] for r in SIMILARITY_FEATURES]
+        
+        # Recipe 4 lists recipe 3 from before an edit, though they now share nothing
+        rows = affected_rows(matrix, ids, [3], {1: 0.99, 2: 0.99, 4: 0.5}, referrer_ids=[4])
+        
+        assert rows == [2, 3]
+    
+    def test_refresh_after_edit_lowers_similarity(self):
+        """Test that a stale neighbour is dropped when an edit makes a recipe less similar"""
+        # Recipe 2 lost pasta and tomato, so recipe 1's stored neighbour 2 at 0.8 is stale
+        edited = [dict(SIMILARITY_FEATURES[0]),
+                  {**SIMILARITY_FEATURES[1], 'category': 'snack', 'main_ingredients': [{'name': 'apple'}],
+                   'common_ingredients': []},
+                  *SIMILARITY_FEATURES[2:]]
+        db_client = Mock()
+        db_client.get_dirty_similarity_markers.return_value = [(2, 'marked')]
+        db_client.get_similarity_features.return_value = edited
+        db_client.get_neighbor_thresholds.return_value = {1: 0.8, 3: 0.9, 4: 0.9}
+        db_client.get_neighbor_referrers.return_value = [1]
+        
+        refresh_neighbors(db_client)
+        
+        db_client.get_neighbor_referrers.assert_called_once_with([2])
+        recipe_ids, neighbors, _ = db_client.replace_neighbors.call_args[0]
+        assert 1 in recipe_ids
+        assert [n[1] for n in neighbors if n[0] == 1] == [3]
+    
+    def test_refresh_neighbors_incremental(self):
+        """Test that only affected recipes are recomputed and markers are cleared"""
+        db_client = Mock()
+        db_client.get_dirty_similarity_markers.return_value = [(2, 'marked')]
+        db_client.get_similarity_features.return_value = SIMILARITY_FEATURES
+        db_client.get_neighbor_thresholds.return_value = {}
+        db_client.get_neighbor_referrers.return_value = []
+        
+        refreshed = refresh_neighbors(db_client)
+        
+        assert refreshed == 3
+        recipe_ids, neighbors, markers = db_client.replace_neighbors.call_args[0]
+        assert recipe_ids == [1, 2, 3]
+        assert {n[0] for n in neighbors} == {1, 2, 3}
+        assert markers == [(2, 'marked')]
+    
+    def test_refresh_neighbors_nothing_to_do(self):
+        """Test that an incremental refresh without markers does no work"""
+        db_client = Mock()
+        db_client.get_dirty_similarity_markers.return_value = []
+        
+        assert refresh_neighbors(db_client) == 0
+        db_client.get_similarity_features.assert_not_called()
+    
+    def test_refresh_neighbors_full(self):
+        """Test that a full rebuild recomputes every recipe"""
+        db_client = Mock()
+        db_client.get_dirty_similarity_markers.return_value = []
+        db_client.get_similarity_features.return_value = SIMILARITY_FEATURES
+        
+        assert refresh_neighbors(db_client, full=True) == 4
+        db_client.get_neighbor_thresholds.assert_not_called()
+
+
+class TestDatabaseClientGetSimilarRecipes:
+    """Test DatabaseClient get_similar_recipes method"""
+    
+    def test_get_similar_recipes_success(self):
+        """Test that neighbours come from a single indexed lookup"""
+        # Setup client with mock connection
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = [(2, 'Burrata Pasta', 'dinner', 15, 0.82)]
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            recipes = client.get_similar_recipes(1, 5)
+        
+        # Assertions
+        assert recipes == SIMILAR_RECIPES
+        mock_cursor.execute.assert_called_once()
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "WHERE recipe_neighbors.recipe_id = %s" in sql
+        assert "ORDER BY recipe_neighbors.rank" in sql
+        assert params == (1, 5)
+    
+    def test_get_similar_recipes_missing_recipe(self):
+        """Test that a missing recipe returns None"""
+        # Setup client with mock connection
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = []
+        mock_cursor.fetchone.return_value = None
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            assert client.get_similar_recipes(999) is None
+    
+    def test_get_similar_recipes_not_indexed(self):
+        """Test that an existing recipe without neighbours returns an empty list"""
+        # Setup client with mock connection
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchall.return_value = []
+        mock_cursor.fetchone.return_value = (1,)
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            assert client.get_similar_recipes(1) == []
+    
+    def test_get_similar_recipes_not_connected(self):
+        """Test get_similar_recipes when not connected to database"""
+        client = DatabaseClient()
+        client._connection = None
+        
+        with patch.object(client, 'is_connected', return_value=False):
+            with pytest.raises(Exception, match="Not connected to database"):
+                client.get_similar_recipes(1)
+
+
+class TestSimilarRecipesEndpoint:
+    """Test the GET /recipes/{id}/similar endpoint"""
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_get_similar_recipes_success(self, mock_db_client_class):
+        """Test successful retrieval of similar recipes"""
+        # Setup mock
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_similar_recipes.return_value = SIMILAR_RECIPES
+        
+        # Make request
+        response = client.get("/recipes/1/similar?k=5")
+        
+        # Assertions
+        assert response.status_code == 200
+        json_response = response.json()
+        assert json_response["count"] == 1
+        assert json_response["recipes"] == SIMILAR_RECIPES
+        mock_db_client.get_similar_recipes.assert_called_once_with(1, 5)
+        mock_db_client.disconnect.assert_called_once()
+    
+    @patch('app.routes.recipes.DatabaseClient')
+    def test_get_similar_recipes_not_found(self, mock_db_client_class):
+        """Test similar recipes for a missing recipe"""
+        # Setup mock
+        mock_db_client = Mock()
+        mock_db_client_class.return_value = mock_db_client
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_similar_recipes.return_value = None
+        
+        # Make request
+        response = client.get("/recipes/999/similar")
+        
+        # Assertions
+        assert response.status_code == 404
+        assert "Recipe with ID 999 not found" in response.json()["detail"]
+    
+    def test_get_similar_recipes_invalid_k(self):
+        """Test that k is bounded by the number of stored neighbours"""
+        assert client.get("/recipes/1/similar?k=0").status_code == 422
+        assert client.get("/recipes/1/similar?k=100").status_code == 422
@@ -0,0 +1,55 @@
+"""
+Unit tests for the cold-start benchmark
+"""
+from benchmarks.startup import FORBIDDEN_AT_STARTUP, parse_importtime, package_times, check_budget, run_once
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |       5000 |     numpy._core
+import time:      1000 |       6000 |   numpy
+import time:       500 |       6620 | app.main
+"""
+
+
+class TestImportProfile:
+    """Test parsing and grouping of -X importtime output"""
+    
+    def test_parse(self):
+        """Test that self and cumulative times are read per module"""
+        timings = parse_importtime(IMPORTTIME_OUTPUT)
+        
+        assert timings['numpy._core'] == (2000, 5000)
+        assert timings['app.main'] == (500, 6620)
+        assert len(timings) == 4
+    
+    def test_package_times(self):
+        """Test that submodules are summed into their top-level package"""
+        packages = package_times(parse_importtime(IMPORTTIME_OUTPUT))
+        
+        assert packages[0] == ('numpy', 3.0)
+        assert [package for package, _ in packages] == ['numpy', 'app', '_io']
+
+
+class TestBudget:
+    """Test the regression budget"""
+    
+    def test_within_budget(self):
+        """Test that a fast import of allowed packages passes"""
+        assert check_budget({'import_ms': 400.0, 'forbidden': []}, 500) == []
+    
+    def test_over_budget_and_forbidden(self):
+        """Test that a slow import and a forbidden package are both reported"""
+        failures = check_budget({'import_ms': 900.0, 'forbidden': ['scipy']}, 500)
+        
+        assert len(failures) == 2
+        assert "900 ms" in failures[0]
+        assert "scipy" in failures[1]
+    
+    def test_app_main_skips_batch_only_packages(self):
+        """Test in a fresh interpreter that importing the API does not pull in batch-job dependencies"""
+        result, _ = run_once()
+        
+        assert result['import_ms'] > 0
+        assert result['lifespan_ms'] is None
+        assert not set(FORBIDDEN_AT_STARTUP) & set(result['modules'])
+        assert 'app' in result['modules']
@@ -0,0 +1,207 @@
+"""
+Unit tests for request tracing and span export
+"""
+import json
+import pytest
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database_client import DatabaseClient
+from app.query_log import record_statement
+from app.tracing import (ForcedSampleLimit, Span, SpanExporter, Trace, current_span, exporter, parse_traceparent,
+                         should_sample)
+from .conftest import SAMPLE_RECIPE_1
+
+# Create a test client
+client = TestClient(app)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+def traceparent(sampled=True):
+    """A traceparent header from an upstream caller"""
+    return f"00-{TRACE_ID}-{PARENT_ID}-{'01' if sampled else '00'}"
+
+
+@pytest.fixture(autouse=True)
+def fresh_forced_samples():
+    """Give each test an empty forced-sample window"""
+    with patch('app.tracing.forced_samples', ForcedSampleLimit()):
+        yield
+
+
+@pytest.fixture
+def mock_recipe_client():
+    """Route DatabaseClient in the recipe routes to a mock returning one recipe"""
+    with patch('app.routes.recipes.DatabaseClient') as mock_db_client_class:
+        mock_db_client = Mock()
+        mock_db_client.connect.return_value = True
+        mock_db_client.get_recipe_by_id.return_value = {**SAMPLE_RECIPE_1, 'version': 1}
+        mock_db_client_class.return_value = mock_db_client
+        yield mock_db_client
+
+
+class TestPropagation:
+    """Test traceparent parsing and the sampler"""
+    
+    def test_parse_valid(self):
+        """Test that ids and the sampled flag are extracted"""
+        assert parse_traceparent(traceparent()) == (TRACE_ID, PARENT_ID, True)
+        assert parse_traceparent(traceparent(sampled=False)) == (TRACE_ID, PARENT_ID, False)
+    
+    @pytest.mark.parametrize("header", [
+        None, "", "garbage", f"ff-{TRACE_ID}-{PARENT_ID}-01", f"00-{'0' * 32}-{PARENT_ID}-01",
+        f"00-{TRACE_ID}-{'0' * 16}-01", f"00-{TRACE_ID}-{PARENT_ID}",
+    ])
+    def test_parse_invalid(self, header):
+        """Test that malformed headers are ignored"""
+        assert parse_traceparent(header) is None
+    
+    def test_sampler_follows_parent(self):
+        """Test that a parent's decision wins over the rate"""
+        with patch('app.tracing.TRACE_SAMPLE_RATE', 0.0):
+            assert should_sample((TRACE_ID, PARENT_ID, True)) is True
+            assert should_sample(None) is False
+        with patch('app.tracing.TRACE_SAMPLE_RATE', 1.0):
+            assert should_sample((TRACE_ID, PARENT_ID, False)) is False
+            assert should_sample(None) is True
+    
+    @patch('app.tracing.TRACE_SAMPLE_RATE', 0.0)
+    @patch('app.tracing.TRACE_MAX_FORCED_PER_SECOND', 2)
+    def test_forced_samples_are_capped(self):
+        """Test that inbound sampled flags beyond the per-second cap fall back to the rate"""
+        with patch('app.tracing.time.monotonic', return_value=100.0):
+            assert [should_sample((TRACE_ID, PARENT_ID, True)) for _ in range(3)] == [True, True, False]
+        with patch('app.tracing.time.monotonic', return_value=101.0):
+            assert should_sample((TRACE_ID, PARENT_ID, True)) is True
+    
+    @patch('app.tracing.TRACE_SAMPLE_RATE', 0.0)
+    @patch('app.tracing.TRACE_MAX_FORCED_PER_SECOND', 0)
+    def test_inbound_flag_ignored_when_cap_is_zero(self):
+        """Test that a zero cap leaves sampling to the rate alone"""
+        assert should_sample((TRACE_ID, PARENT_ID, True)) is False
+
+
+class TestRequestTracing:
+    """Test traced requests end to end"""
+    
+    def test_sampled_request_spans(self, mock_recipe_client):
+        """Test that a sampled request continues the caller's trace and records its phases"""
+        response = client.get("/recipes/1", headers={"traceparent": traceparent()})
+        
+        assert response.status_code == 200
+        returned = parse_traceparent(response.headers["traceparent"])
+        assert returned[0] == TRACE_ID and returned[2] is True
+        
+        spans = {span['name']: span for span in exporter.get(TRACE_ID)}
+        root = spans["GET /recipes/{recipe_id}"]
+        assert root['parent_id'] == PARENT_ID
+        assert root['span_id'] == returned[1]
+        assert root['attributes']['http.status_code'] == 200
+        assert root['attributes']['http.target'] == "/recipes/1"
+        for phase in ("request.validation", "endpoint", "response.serialization"):
+            assert spans[phase]['parent_id'] == root['span_id']
+            assert 0 <= spans[phase]['duration_ms'] <= root['duration_ms']
+    
+    def test_unsampled_request(self, mock_recipe_client):
+        """Test that unsampled requests create no spans and no response header"""
+        with patch('app.tracing.TRACE_SAMPLE_RATE', 0.0):
+            response = client.get("/recipes/1")
+        
+        assert response.status_code == 200
+        assert "traceparent" not in response.headers
+    
+    def test_parent_not_sampled(self, mock_recipe_client):
+        """Test that an upstream decision not to sample is respected"""
+        response = client.get("/recipes/1", headers={"traceparent": traceparent(sampled=False)})
+        
+        assert "traceparent" not in response.headers
+
+
+class TestDatabaseSpans:
+    """Test spans recorded by DatabaseClient methods and statements"""
+    
+    def test_method_and_statement_spans(self):
+        """Test that client methods and SQL statements nest under the current span"""
+        trace = Trace(TRACE_ID)
+        root = Span(trace, "test")
+        token = current_span.set(root)
+        try:
+            db_client = DatabaseClient()
+            db_client._connection = Mock()
+            db_client._connection.cursor.return_value.fetchone.return_value = None
+            with patch.object(db_client, 'is_connected', return_value=True):
+                db_client.get_recipe_by_id(1)
+            record_statement(Mock(rowcount=2), "SELECT * FROM recipes WHERE id = %s", (1,), 0.002)
+        finally:
+            current_span.reset(token)
+        
+        method_span = next(span for span in trace.spans if span.name == "db.get_recipe_by_id")
+        sql_span = next(span for span in trace.spans if span.name == "sql")
+        assert method_span.parent_id == root.span_id
+        assert method_span.end is not None
+        assert sql_span.attributes == {'statement': "SELECT * FROM recipes WHERE id = ?", 'rows': 2}
+        assert sql_span.end - sql_span.start == pytest.approx(0.002, abs=1e-4)
+
+
+class TestExport:
+    """Test the ring buffer, file export and admin endpoints"""
+    
+    def test_ring_buffer_and_file(self, tmp_path):
+        """Test that the buffer keeps the newest traces and the file gets every span"""
+        path = tmp_path / "spans.jsonl"
+        local = SpanExporter(2, str(path))
+        for number in range(3):
+            trace = Trace(f"{number:032x}")
+            Span(trace, "root").finish()
+            local.export(trace)
+        local.close()
+        
+        assert [spans[0]['trace_id'] for spans in local.traces()] == [f"{2:032x}", f"{1:032x}"]
+        assert local.get(f"{0:032x}") is None
+        assert len([json.loads(line) for line in path.read_text().splitlines()]) == 3
+    
+    def test_file_written_off_the_caller_thread(self, tmp_path):
+        """Test that export only queues spans and the writer thread appends them"""
+        path = tmp_path / "spans.jsonl"
+        local = SpanExporter(2, str(path))
+        trace = Trace(TRACE_ID)
+        Span(trace, "root").finish()
+        with patch('app.tracing.open', side_effect=AssertionError("opened on the caller thread")) as mock_open:
+            local._thread = Mock()
+            local.export(trace)
+        
+        mock_open.assert_not_called()
+        assert local._queue.qsize() == 1
+        local._thread = None
+        local.export(trace)
+        local.close()
+        assert len(path.read_text().splitlines()) == 2
+    
+    def test_full_queue_drops_traces(self, tmp_path):
+        """Test that traces are dropped, not blocked on, when the writer falls behind"""
+        local = SpanExporter(2, str(tmp_path / "spans.jsonl"), queue_size=1)
+        local._thread = Mock()
+        for _ in range(3):
+            trace = Trace(TRACE_ID)
+            Span(trace, "root").finish()
+            local.export(trace)
+        
+        assert local.dropped == 2
+        assert len(local.traces()) == 2
+    
+    @patch('app.profiling.PROFILING_TOKEN', 'secret')
+    def test_admin_endpoints(self, mock_recipe_client):
+        """Test listing and fetching buffered traces"""
+        client.get("/recipes/1", headers={"traceparent": traceparent()})
+        headers = {"X-Admin-Token": "secret"}
+        
+        listing = client.get("/admin/traces?limit=5", headers=headers).json()
+        single = client.get(f"/admin/traces/{TRACE_ID}", headers=headers)
+        
+        assert listing['count'] >= 1
+        assert single.status_code == 200
+        assert single.json()['trace']['spans'][0]['trace_id'] == TRACE_ID
+        assert client.get(f"/admin/traces/{'1' * 32}", headers=headers).status_code == 404
+        assert client.get("/admin/traces").status_code == 403
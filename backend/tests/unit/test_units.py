@@ -0,0 +1,149 @@
+"""
+Unit tests for the ingredient unit registry
+"""
+import os
+import re
+import numpy as np
+from unittest.mock import Mock, patch
+from app.database_client import DatabaseClient
+from app.units import (
+    UNIT_REGISTRY, canonical_unit, normalize, convert_batch, normalize_ingredients, strip_canonical
+)
+from .conftest import (
+    ADD_RECIPE_PARAMS, SAMPLE_RECIPE_1, SAMPLE_RECIPE_1_DB_ROW, SAMPLE_RECIPE_2_DB_ROW, UPDATED_RECIPE_DB_ROW
+)
+
+BACKFILL_MIGRATION = os.path.join(os.path.dirname(__file__), '..', '..', 'migrations', '009_canonical_quantities.sql')
+
+
+class TestUnitRegistry:
+    """Test unit lookups and conversions"""
+    
+    def test_canonical_unit_known(self):
+        """Test that known units map to their dimension's base unit"""
+        assert canonical_unit('kg') == ('g', 1000.0)
+        assert canonical_unit(' TBSP ') == ('ml', 15.0)
+        assert canonical_unit('pieces') == ('pcs', 1.0)
+    
+    def test_canonical_unit_unknown(self):
+        """Test that unknown units are kept as-is"""
+        assert canonical_unit('Clove') == ('clove', 1.0)
+    
+    def test_normalize(self):
+        """Test that 0.5 kg and 500 g normalize to the same quantity"""
+        assert normalize(0.5, 'kg') == normalize(500, 'g') == (500.0, 'g')
+    
+    def test_convert_batch(self):
+        """Test vectorized conversion over mixed units"""
+        quantities, units = convert_batch([1, 2, 250, 3], ['kg', 'l', 'g', 'pinch'])
+        
+        assert isinstance(quantities, np.ndarray)
+        np.testing.assert_allclose(quantities, [1000.0, 2000.0, 250.0, 3.0])
+        assert units == ['g', 'ml', 'g', 'pinch']
+    
+    def test_normalize_ingredients(self):
+        """Test that canonical values are stored next to the originals"""
+        ingredients = [{'quantity': 0.5, 'unit': 'kg', 'name': 'tomato'}]
+        
+        assert normalize_ingredients(ingredients) == [{
+            'quantity': 0.5, 'unit': 'kg', 'name': 'tomato',
+            'canonical_quantity': 500.0, 'canonical_unit': 'g'
+        }]
+    
+    def test_normalize_ingredients_empty(self):
+        """Test that an empty ingredient list stays empty"""
+        assert normalize_ingredients([]) == []
+    
+    def test_normalize_ingredients_none(self):
+        """Test that None is passed through so a PATCH to null does not store []"""
+        assert normalize_ingredients(None) is None
+    
+    def test_strip_canonical(self):
+        """Test that stripping undoes normalize_ingredients"""
+        ingredients = [{'quantity': 0.5, 'unit': 'kg', 'name': 'tomato'}]
+        
+        assert strip_canonical(normalize_ingredients(ingredients)) == ingredients
+        assert strip_canonical(None) is None
+    
+    def test_backfill_migration_matches_registry(self):
+        """Test that the canonical backfill migration uses the registry's factors"""
+        with open(BACKFILL_MIGRATION) as migration:
+            rows = re.findall(r"\('([^']+)', '([^']+)', ([0-9.]+)\)", migration.read())
+        
+        assert {unit: (base_unit, float(factor)) for unit, base_unit, factor in rows} == {
+            unit: canonical_unit(unit) for unit in UNIT_REGISTRY
+        }
+
+
+class TestWriteTimeNormalization:
+    """Test that DatabaseClient writes canonical quantities"""
+    
+    def test_add_recipe_stores_canonical_quantities(self):
+        """Test that add_recipe normalizes main_ingredients"""
+        # Setup client with mock connection
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = SAMPLE_RECIPE_2_DB_ROW
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            client.add_recipe(**ADD_RECIPE_PARAMS)
+        
+        main_ingredients_json = mock_cursor.execute.call_args[0][1][2]
+        assert '"canonical_quantity": 200.0' in main_ingredients_json
+        assert '"canonical_unit": "g"' in main_ingredients_json
+    
+    def test_update_recipe_stores_canonical_quantities(self):
+        """Test that update_recipe normalizes main_ingredients"""
+        # Setup client with mock connection
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchone.side_effect = [(1,), UPDATED_RECIPE_DB_ROW]
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            client.update_recipe(1, {'main_ingredients': [{'quantity': 1.5, 'unit': 'l', 'name': 'milk'}]})
+        
+        update_values = mock_cursor.execute.call_args_list[1][0][1]
+        assert '"canonical_quantity": 1500.0' in update_values[0]
+        assert '"canonical_unit": "ml"' in update_values[0]
+    
+    def test_update_recipe_keeps_null_main_ingredients(self):
+        """Test that an explicit null is stored as null rather than an empty list"""
+        # Setup client with mock connection
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        mock_cursor.fetchone.side_effect = [(1,), UPDATED_RECIPE_DB_ROW]
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            client.update_recipe(1, {'main_ingredients': None})
+        
+        update_values = mock_cursor.execute.call_args_list[1][0][1]
+        assert update_values[0] == 'null'
+
+
+class TestReadTimeStripping:
+    """Test that DatabaseClient reads return ingredients without canonical quantities"""
+    
+    def test_get_all_recipes_hides_canonical_quantities(self):
+        """Test that get_all_recipes returns main ingredients as clients sent them"""
+        # Setup client with mock connection
+        client = DatabaseClient()
+        mock_connection = Mock()
+        mock_cursor = Mock()
+        stored = normalize_ingredients(SAMPLE_RECIPE_1['main_ingredients'])
+        mock_cursor.fetchall.return_value = [SAMPLE_RECIPE_1_DB_ROW[:3] + (stored,) + SAMPLE_RECIPE_1_DB_ROW[4:]]
+        mock_connection.cursor.return_value = mock_cursor
+        client._connection = mock_connection
+        
+        with patch.object(client, 'is_connected', return_value=True):
+            recipes = client.get_all_recipes()
+        
+        assert recipes[0]['main_ingredients'] == SAMPLE_RECIPE_1['main_ingredients']
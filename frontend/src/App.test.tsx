@@ -2,6 +2,24 @@ import React from 'react';
 import { render, screen, fireEvent } from '@testing-library/react';
 import App from './App';
 
+const mockRecentRecipes = [
+  { id: 4, name: 'Açaí bowl', category: 'breakfast', prep_time: 10 },
+  { id: 3, name: 'Grilled Salmon', category: 'dinner', prep_time: 25 },
+  { id: 2, name: 'Avocado Toast', category: 'breakfast', prep_time: 5 },
+  { id: 1, name: 'Chicken Salad', category: 'lunch', prep_time: 15 },
+];
+
+const mockFetch = (url: string) =>
+  Promise.resolve({
+    ok: true,
+    json: () =>
+      Promise.resolve(
+        url.includes('/recipes/recent')
+          ? { status: 'success', recipes: mockRecentRecipes }
+          : { status: 'success', categories: [] }
+      ),
+  });
+
 // Mock console.log to avoid noise in tests
 const originalConsoleLog = console.log;
 beforeAll(() => {
@@ -15,6 +33,7 @@ afterAll(() => {
 describe('App Component', () => {
   beforeEach(() => {
     jest.clearAllMocks();
+    global.fetch = jest.fn(mockFetch) as jest.Mock;
   });
 
   it('renders without crashing', () => {
@@ -130,8 +149,9 @@ describe('App Component', () => {
     expect(quickActions).not.toHaveClass('mobile-open');
   });
 
-  it('handles recipe clicks and closes mobile menu', () => {
+  it('handles recipe clicks and closes mobile menu', async () => {
     const { container } = render(<App />);
+    await screen.findAllByText('Açaí bowl');
 
     // Open mobile menu first
     const mobileMenuButton = container.querySelector('.mobile-menu-btn');
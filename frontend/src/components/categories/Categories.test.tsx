@@ -2,11 +2,23 @@ import React from 'react';
 import { render, screen, fireEvent } from '@testing-library/react';
 import Categories from './Categories';
 
+const mockCategoryStats = [
+  { category: 'breakfast', count: 6, avg_prep_time: 10 },
+  { category: 'dinner', count: 1, avg_prep_time: 45 },
+  { category: 'lunch', count: 1, avg_prep_time: 20 },
+  { category: 'snack', count: 2, avg_prep_time: 5 },
+];
+
 describe('Categories Component', () => {
   const mockOnCategoryClick = jest.fn();
 
   beforeEach(() => {
     jest.clearAllMocks();
+    global.fetch = jest.fn().mockResolvedValue({
+      ok: true,
+      json: () =>
+        Promise.resolve({ status: 'success', categories: mockCategoryStats }),
+    }) as jest.Mock;
   });
 
   it('renders the Categories component with title', () => {
@@ -36,11 +48,31 @@ describe('Categories Component', () => {
     expect(container.textContent).toContain('🌙'); // Dinner
   });
 
-  it('renders category counts with correct values', () => {
+  it('requests category stats from the API', () => {
+    render(<Categories />);
+
+    expect(global.fetch).toHaveBeenCalledTimes(1);
+    expect(global.fetch).toHaveBeenCalledWith(
+      expect.stringContaining('/recipes/stats/categories')
+    );
+  });
+
+  it('renders zero counts when the API is unavailable', async () => {
+    global.fetch = jest.fn().mockResolvedValue({ ok: false, status: 500 });
+    const { container } = render(<Categories />);
+
+    await screen.findAllByText('0');
+    const counts = container.querySelectorAll('.category-count');
+    counts.forEach(count => {
+      expect(count.textContent).toBe('0');
+    });
+  });
+
+  it('renders category counts with correct values', async () => {
     render(<Categories />);
 
     // Check for count badges
-    expect(screen.getByText('6')).toBeInTheDocument(); // Breakfast
+    expect(await screen.findByText('6')).toBeInTheDocument(); // Breakfast
     expect(screen.getByText('2')).toBeInTheDocument(); // Snack
 
     // Get all elements with text '1' to check both Lunch and Dinner
@@ -169,8 +201,9 @@ describe('Categories Component', () => {
     });
   });
 
-  it('has correct category data structure', () => {
+  it('has correct category data structure', async () => {
     render(<Categories />);
+    await screen.findByText('6');
 
     // Test that each category has the expected structure
     const breakfastCategory = screen
@@ -1,5 +1,6 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import './Categories.css';
+import { fetchCategoryStats } from '../../services/api';
 
 interface Category {
   id: string;
@@ -14,33 +15,55 @@ interface CategoriesProps {
 }
 
 const Categories: React.FC<CategoriesProps> = ({ onCategoryClick }) => {
+  const [counts, setCounts] = useState<Record<string, number>>({});
+
+  useEffect(() => {
+    let cancelled = false;
+    fetchCategoryStats()
+      .then(stats => {
+        if (!cancelled) {
+          const loaded: Record<string, number> = {};
+          stats.forEach(stat => {
+            loaded[stat.category] = stat.count;
+          });
+          setCounts(loaded);
+        }
+      })
+      .catch(() => {
+        // Keep showing zero counts when the API is unreachable
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, []);
+
   const categories: Category[] = [
     {
       id: 'breakfast',
       name: 'Breakfast',
       icon: '☕️',
-      count: 6,
+      count: counts['breakfast'] ?? 0,
       color: '#5b8266', // Viridian
     },
     {
       id: 'snack',
       name: 'Snack',
       icon: '🍎',
-      count: 2,
+      count: counts['snack'] ?? 0,
       color: '#294936', // Brunswick green
     },
     {
       id: 'lunch',
       name: 'Lunch',
       icon: '☀️',
-      count: 1,
+      count: counts['lunch'] ?? 0,
       color: '#3e6259', // Feldgrau
     },
     {
       id: 'dinner',
       name: 'Dinner',
       icon: '🌙',
-      count: 1,
+      count: counts['dinner'] ?? 0,
       color: '#212922', // Black olive
     },
   ];
@@ -2,12 +2,31 @@ import React from 'react';
 import { render, screen, fireEvent } from '@testing-library/react';
 import QuickActions from './QuickActions';
 
+const mockRecentRecipes = [
+  { id: 4, name: 'Açaí bowl', category: 'breakfast', prep_time: 10 },
+  { id: 3, name: 'Grilled Salmon', category: 'dinner', prep_time: 25 },
+  { id: 2, name: 'Avocado Toast', category: 'breakfast', prep_time: 5 },
+  { id: 1, name: 'Chicken Salad', category: 'lunch', prep_time: 15 },
+];
+
+const mockFetch = (url: string) =>
+  Promise.resolve({
+    ok: true,
+    json: () =>
+      Promise.resolve(
+        url.includes('/recipes/recent')
+          ? { status: 'success', recipes: mockRecentRecipes }
+          : { status: 'success', categories: [] }
+      ),
+  });
+
 describe('QuickActions Component', () => {
   const mockOnActionClick = jest.fn();
   const mockOnCategoryClick = jest.fn();
 
   beforeEach(() => {
     jest.clearAllMocks();
+    global.fetch = jest.fn(mockFetch) as jest.Mock;
   });
 
   it('renders the QuickActions component with title', () => {
@@ -85,8 +104,9 @@ describe('QuickActions Component', () => {
     expect(quickActionsAside).not.toHaveClass('mobile-open');
   });
 
-  it('renders Categories component within QuickActions', () => {
+  it('renders Categories component within QuickActions', async () => {
     render(<QuickActions />);
+    await screen.findByText('Açaí bowl');
 
     // Check that Categories component is rendered
     expect(screen.getByText('Categories')).toBeInTheDocument();
@@ -1,5 +1,6 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import './RecentRecipes.css';
+import { fetchRecentRecipes } from '../../services/api';
 
 interface Recipe {
   id: string;
@@ -12,33 +13,40 @@ interface RecentRecipesProps {
   onRecipeClick?: (_recipe: Recipe) => void;
 }
 
+const categoryImages: Record<string, string> = {
+  breakfast: '🥑',
+  lunch: '🥗',
+  dinner: '🍝',
+  snack: '🍎',
+};
+
 const RecentRecipes: React.FC<RecentRecipesProps> = ({ onRecipeClick }) => {
-  const recentRecipes: Recipe[] = [
-    {
-      id: 'acai-bowl',
-      name: 'Açaí bowl',
-      category: 'Breakfast',
-      image: '🍓',
-    },
-    {
-      id: 'grilled-salmon',
-      name: 'Grilled Salmon',
-      category: 'Dinner',
-      image: '🍣',
-    },
-    {
-      id: 'avocado-toast',
-      name: 'Avocado Toast',
-      category: 'Breakfast',
-      image: '🥑',
-    },
-    {
-      id: 'chicken-salad',
-      name: 'Chicken Salad',
-      category: 'Lunch',
-      image: '🥗',
-    },
-  ];
+  const [recentRecipes, setRecentRecipes] = useState<Recipe[]>([]);
+
+  useEffect(() => {
+    let cancelled = false;
+    fetchRecentRecipes()
+      .then(recipes => {
+        if (!cancelled) {
+          setRecentRecipes(
+            recipes.map(recipe => ({
+              id: String(recipe.id),
+              name: recipe.name,
+              category:
+                recipe.category.charAt(0).toUpperCase() +
+                recipe.category.slice(1),
+              image: categoryImages[recipe.category] ?? '🍽️',
+            }))
+          );
+        }
+      })
+      .catch(() => {
+        // Leave the list empty when the API is unreachable
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, []);
 
   const handleRecipeClick = (recipe: Recipe) => {
     onRecipeClick?.(recipe);
@@ -0,0 +1,35 @@
+export const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+
+export interface CategoryStats {
+  category: string;
+  count: number;
+  avg_prep_time: number | null;
+}
+
+export const fetchCategoryStats = async (): Promise<CategoryStats[]> => {
+  const response = await fetch(`${API_URL}/recipes/stats/categories`);
+  if (!response.ok) {
+    throw new Error(`Failed to load category stats: ${response.status}`);
+  }
+  const data = await response.json();
+  return data.categories;
+};
+
+export interface RecentRecipe {
+  id: number;
+  name: string;
+  category: string;
+  prep_time: number | null;
+  updated_at: string;
+}
+
+export const fetchRecentRecipes = async (
+  limit: number = 4
+): Promise<RecentRecipe[]> => {
+  const response = await fetch(`${API_URL}/recipes/recent?limit=${limit}`);
+  if (!response.ok) {
+    throw new Error(`Failed to load recent recipes: ${response.status}`);
+  }
+  const data = await response.json();
+  return data.recipes;
+};